@@ -0,0 +1,44 @@
+import hashlib
+import json
+import os
+from typing import Any, Dict, Optional
+
+from sqlite_cache import SQLiteCache
+from turn_table import json_default
+
+DEFAULT_ANALYSIS_CACHE_PATH = os.path.join('.cache', 'analyses.sqlite3')
+
+
+class AnalysisCache(SQLiteCache):
+    """Serialized analysis results keyed by (content hash, analyzer version, pattern fingerprint).
+
+    A change to the transcript, the analyzer version or any pattern
+    dictionary produces a new key, so stale results are never served; they
+    simply age out through the LRU cap.
+    """
+
+    table = 'analyses'
+
+    def __init__(self, path: str = DEFAULT_ANALYSIS_CACHE_PATH, max_entries: Optional[int] = 10000,
+                 max_bytes: Optional[int] = 1024 * 1024 * 1024, max_age_seconds: Optional[float] = None):
+        super().__init__(path, max_bytes=max_bytes, max_entries=max_entries, max_age_seconds=max_age_seconds)
+
+    @staticmethod
+    def make_key(content_hash: str, analyzer_version: str, pattern_fingerprint: str) -> str:
+        return hashlib.sha256(f'{content_hash}:{analyzer_version}:{pattern_fingerprint}'.encode('utf-8')).hexdigest()
+
+    def get_analysis(self, key: str) -> Optional[Dict[str, Any]]:
+        value = self.get(key)
+        return json.loads(value) if value is not None else None
+
+    def put_analysis(self, key: str, analysis: Dict[str, Any], label: str = None):
+        self.put(key, json.dumps(analysis, ensure_ascii=False, default=json_default), label)
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def pattern_fingerprint(*pattern_sets: Dict[str, Any]) -> str:
+    """Stable hash of pattern dictionaries; any added, removed or reordered phrase changes it."""
+    return hashlib.sha256(json.dumps(pattern_sets, ensure_ascii=False).encode('utf-8')).hexdigest()
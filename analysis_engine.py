@@ -0,0 +1,534 @@
+import copy
+import re
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from phrase_matcher import JoinedPhraseScan
+from turn_parser import HEADER, TurnParser
+
+DURATION = re.compile(r'Duration:\s*(\d+)\s*minutes', re.IGNORECASE)
+DURATION_TAIL = re.compile(r'Duration:\s*(?:\d+\s*)?$', re.IGNORECASE)
+
+ScannedTurn = Tuple[Dict[str, Any], FrozenSet[str]]
+
+WINDOW_SECONDS = 300
+# Conversational speaking rate (150 words per minute); headers only give when a turn starts.
+WORDS_PER_SECOND = 2.5
+SILENCE_SECONDS = 10
+
+SECTIONS = (
+    'session_metadata',
+    'subject_analysis',
+    'learning_patterns',
+    'teaching_strategies',
+    'student_condition',
+    'action_items',
+    'performance_indicators',
+    'educational_insights',
+    'timeline',
+    'parsed_conversations'
+)
+# Sections a line-only pass can build without parsing turns.
+LINE_SECTIONS = frozenset({'session_metadata', 'subject_analysis', 'action_items'})
+# Sections derived from other sections rather than from the transcript.
+SECTION_DEPENDENCIES = {
+    'educational_insights': ('subject_analysis', 'learning_patterns', 'student_condition')
+}
+
+
+class TurnScanner:
+    """Feeds lines through a TurnParser, matching the phrases of each line once.
+
+    A line's phrases serve the whole-text scan and, for speech lines, the
+    scan of the turn the line belongs to.
+    """
+
+    def __init__(self, analyzer, text_scan: JoinedPhraseScan = None):
+        self.analyzer = analyzer
+        self.matcher = analyzer.matcher
+        self.text_scan = text_scan
+        self.parser = TurnParser()
+        self.line_lower = ''
+        self.line_phrases: FrozenSet[str] = frozenset()
+        self._content_scan: Optional[JoinedPhraseScan] = None
+
+    def feed(self, line: str) -> Optional[ScannedTurn]:
+        """Consume one line; return the (conversation, phrases) it completed, if any."""
+        line_lower = line.rstrip('\r\n').lower()
+        line_phrases = self.matcher.phrases(line_lower)
+        self.line_lower = line_lower
+        self.line_phrases = line_phrases
+        if self.text_scan is not None:
+            self.text_scan.add(line_lower, line_phrases)
+
+        turn = self.parser.feed(line)
+        completed = self._build(turn) if turn is not None else None
+
+        if self.parser.line_kind == HEADER:
+            self._content_scan = JoinedPhraseScan(self.matcher)
+        if self.parser.line_content is not None:
+            content_lower = self.parser.line_content.lower()
+            if content_lower != line_lower:
+                line_phrases = frozenset(phrase for phrase in line_phrases if phrase in content_lower)
+            self._content_scan.add(content_lower, line_phrases)
+
+        return completed
+
+    def close(self) -> Optional[ScannedTurn]:
+        """Return the (conversation, phrases) still in progress, if any."""
+        turn = self.parser.close()
+        return self._build(turn) if turn is not None else None
+
+    def _build(self, turn: Dict[str, str]) -> ScannedTurn:
+        phrases = frozenset(self._content_scan.phrases)
+        return self.analyzer._build_conversation(turn, phrases), phrases
+
+
+class SessionMetadata:
+
+    def __init__(self, analyzer):
+        self.analyzer = analyzer
+        self.duration_minutes: Optional[int] = None
+        self.action_items_count = 0
+        self._duration_tail: Optional[str] = None
+
+    def add_line(self, line: str, line_lower: str = None):
+        line = line.rstrip('\n')
+        self.action_items_count += line.count('ACTION ITEM:')
+
+        if self.duration_minutes is not None:
+            return
+        # Cheap guard; 'durat' avoids the 'i', which IGNORECASE also matches as 'ı' and 'İ'.
+        if self._duration_tail is None and 'durat' not in (line_lower if line_lower is not None else line.lower()):
+            return
+        # "Duration: 63 minutes" may be broken across lines; carry an
+        # unfinished match forward so the result equals searching the whole text.
+        text = line if self._duration_tail is None else f'{self._duration_tail}\n{line}'
+        match = DURATION.search(text)
+        if match:
+            self.duration_minutes = int(match.group(1))
+            self._duration_tail = None
+        else:
+            tail = DURATION_TAIL.search(text)
+            self._duration_tail = tail.group() if tail else None
+
+    def result(self, text_phrases: FrozenSet[str]) -> Dict[str, Any]:
+        metadata = {}
+        found = self.analyzer.matcher.categorize(text_phrases)
+
+        if self.duration_minutes is not None:
+            metadata['duration_minutes'] = self.duration_minutes
+
+        if found.get('session_context.test_preparation'):
+            metadata['session_type'] = 'Test Preparation'
+            metadata['urgency_level'] = 'High'
+
+        if found.get('session_context.final_preparation'):
+            metadata['timing_context'] = 'Final preparation session'
+            metadata['pressure_level'] = 'High'
+
+        metadata['action_items_count'] = self.action_items_count
+        return metadata
+
+
+class ActionItems:
+
+    def __init__(self, analyzer):
+        self.analyzer = analyzer
+        self.items: List[Dict[str, Any]] = []
+
+    def add_line(self, line: str, line_phrases: FrozenSet[str] = None):
+        if 'ACTION ITEM:' not in line:
+            return
+
+        analyzer = self.analyzer
+        description = line.split('ACTION ITEM:')[1].strip()
+        description_lower = description.lower()
+        if line_phrases is None:
+            phrases = analyzer.matcher.phrases(description_lower)
+        else:
+            phrases = frozenset(phrase for phrase in line_phrases if phrase in description_lower)
+        found = analyzer.matcher.categorize(phrases)
+
+        self.items.append({
+            'description': description,
+            'category': analyzer._categorize_action_item(description, phrases),
+            'priority': analyzer._assess_action_priority(description, phrases),
+            'type': 'Academic' if found.get('action_type.Academic') else 'Logistical'
+        })
+
+    def result(self) -> List[Dict[str, Any]]:
+        return self.items
+
+
+class LearningPatterns:
+
+    indicator_keys = {
+        'understanding': 'understanding_moments',
+        'confusion': 'confusion_moments',
+        'effort': 'effort_indicators',
+        'confidence': 'confidence_markers'
+    }
+
+    def __init__(self, analyzer):
+        self.indicator_types = list(analyzer.educational_patterns['learning_indicators'])
+        self.learning_indicators = {key: 0 for key in self.indicator_keys.values()}
+        self.specific_moments: List[Dict[str, Any]] = []
+        self.total_words = 0
+        self.responses = 0
+
+    def add(self, conversation: Dict[str, Any], found: Dict[str, List[str]], turn: int):
+        self.responses += 1
+        self.total_words += conversation['word_count']
+
+        for indicator_type in self.indicator_types:
+            keywords = found.get(f'learning_indicators.{indicator_type}')
+            if not keywords:
+                continue
+            content = conversation['content']
+            context = content[:80] + "..." if len(content) > 80 else content
+            self.learning_indicators[self.indicator_keys[indicator_type]] += len(keywords)
+            for _ in keywords:
+                self.specific_moments.append({
+                    'timestamp': conversation['timestamp'],
+                    'type': indicator_type,
+                    'context': context,
+                    'turn': turn
+                })
+
+    def average_response_length(self) -> float:
+        return self.total_words / self.responses if self.responses else 0
+
+    def engagement_level(self) -> str:
+        avg_response_length = self.average_response_length()
+        return 'high' if avg_response_length > 12 else 'medium' if avg_response_length > 6 else 'low'
+
+    def result(self) -> Dict[str, Any]:
+        return {
+            'learning_indicators': dict(self.learning_indicators),
+            'specific_moments': list(self.specific_moments),
+            'engagement_level': self.engagement_level(),
+            'average_response_length': self.average_response_length(),
+            'total_student_responses': self.responses
+        }
+
+
+class TeachingStrategies:
+
+    moment_approaches = {
+        'Error Correction': 'Guided redirection',
+        'Socratic Questioning': 'Concept exploration'
+    }
+
+    def __init__(self, analyzer):
+        self.strategies = list(analyzer.educational_patterns['teaching_strategies'])
+        self.strategy_usage = {strategy: 0 for strategy in self.strategies}
+        self.teaching_moments: List[Dict[str, Any]] = []
+
+    def add(self, conversation: Dict[str, Any], found: Dict[str, List[str]], turn: int):
+        for strategy in self.strategies:
+            self.strategy_usage[strategy] += len(found.get(f'teaching_strategies.{strategy}', ()))
+
+        for strategy, approach in self.moment_approaches.items():
+            if found.get(f'teaching_moments.{strategy}'):
+                self.teaching_moments.append({
+                    'timestamp': conversation['timestamp'],
+                    'strategy': strategy,
+                    'approach': approach,
+                    'turn': turn
+                })
+
+    def result(self) -> Dict[str, Any]:
+        strategy_usage = dict(self.strategy_usage)
+        return {
+            'strategy_distribution': strategy_usage,
+            'teaching_moments': list(self.teaching_moments),
+            'dominant_approach': max(strategy_usage.keys(), key=lambda x: strategy_usage[x]) if any(strategy_usage.values()) else 'balanced',
+            'total_teaching_interventions': len(self.teaching_moments)
+        }
+
+
+class StudentCondition:
+
+    def __init__(self, analyzer):
+        self.matcher = analyzer.matcher
+        self.student_content = JoinedPhraseScan(self.matcher)
+        self.responses = 0
+
+    def add(self, content_lower: str, phrases: FrozenSet[str]):
+        self.responses += 1
+        self.student_content.add(content_lower, phrases)
+
+    def result(self) -> Dict[str, Any]:
+        found = self.matcher.categorize(frozenset(self.student_content.phrases))
+
+        condition = {
+            'health_status': 'normal',
+            'emotional_state': 'stable',
+            'engagement_level': 'moderate',
+            'confidence_level': 'developing',
+            'stress_indicators': []
+        }
+
+        if found.get('student_condition.illness'):
+            condition['health_status'] = 'recently_ill_but_attending'
+
+        if self.responses > 25:
+            condition['engagement_level'] = 'high'
+        elif self.responses > 15:
+            condition['engagement_level'] = 'medium'
+        else:
+            condition['engagement_level'] = 'low'
+
+        if found.get('student_condition.understanding'):
+            condition['confidence_level'] = 'building'
+
+        if found.get('student_condition.self_doubt'):
+            condition['stress_indicators'].append('self_doubt')
+
+        if found.get('student_condition.exercise') and condition['health_status'] == 'recently_ill_but_attending':
+            condition['resilience_level'] = 'high'
+
+        return condition
+
+
+class AcademicPerformance:
+
+    def __init__(self, analyzer):
+        self.matcher = analyzer.matcher
+        self.all_content = JoinedPhraseScan(self.matcher)
+
+    def add(self, content_lower: str, phrases: FrozenSet[str]):
+        self.all_content.add(content_lower, phrases)
+
+    def result(self) -> Dict[str, Any]:
+        found = self.matcher.categorize(frozenset(self.all_content.phrases))
+
+        performance = {
+            'error_patterns': [],
+            'strength_areas': [],
+            'improvement_opportunities': [],
+            'conceptual_understanding': 'developing'
+        }
+
+        if found.get('performance.calculator_use') and found.get('performance.mistakes'):
+            performance['error_patterns'].append('Calculator input errors')
+
+        if found.get('performance.time') and found.get('performance.time_pressure'):
+            performance['error_patterns'].append('Time management challenges')
+
+        if found.get('performance.accuracy'):
+            performance['strength_areas'].append('Problem-solving accuracy')
+
+        if found.get('performance.comprehension'):
+            performance['strength_areas'].append('Conceptual understanding')
+
+        if len(performance['error_patterns']) > 0:
+            performance['improvement_opportunities'].append('Strategic execution refinement')
+
+        return performance
+
+
+class Timeline:
+    """Talk time, response latency, silences and 5-minute windows from turn timestamps.
+
+    A turn's talk time is its word count at WORDS_PER_SECOND, cut off where
+    the next turn starts; the rest of that interval is silence. A turn's
+    end is only known once the next turn arrives, so the last turn is held
+    back and result() finishes a copy of it. Window arrays (one entry per
+    WINDOW_SECONDS from 0:00, talk counted in the window a turn starts in)
+    are filled as turns arrive.
+    """
+
+    def __init__(self, analyzer):
+        self.indicator_types = list(analyzer.educational_patterns['learning_indicators'])
+        self._indicator_keys = [(name, f'learning_indicators.{name}') for name in self.indicator_types]
+        self.talk_seconds = {'student': 0.0, 'tutor': 0.0}
+        self.first_seconds: Optional[int] = None
+        self.end_seconds = 0.0
+        self.latencies: List[float] = []
+        self.silences: List[Dict[str, Any]] = []
+        self.windows: Dict[str, List[float]] = {
+            name: [] for name in ['turns', 'student_talk_seconds', 'tutor_talk_seconds'] + self.indicator_types
+        }
+        # (seconds, speaker, word count, window) of the turn whose end is not known yet.
+        self._pending: Optional[Tuple[int, str, int, int]] = None
+
+    def add(self, conversation: Dict[str, Any], found: Dict[str, List[str]]):
+        seconds, speaker = conversation['seconds'], conversation['speaker']
+        if self.first_seconds is None:
+            self.first_seconds = seconds
+        windows = self.windows
+        window = max(0, seconds) // WINDOW_SECONDS
+        if window >= len(windows['turns']):
+            for values in windows.values():
+                values.extend([0] * (window + 1 - len(values)))
+        windows['turns'][window] += 1
+        if speaker == 'student' and found:
+            for name, key in self._indicator_keys:
+                keywords = found.get(key)
+                if keywords:
+                    windows[name][window] += len(keywords)
+
+        if self._pending is not None:
+            self._finish_turn(self._pending, conversation)
+        self._pending = (seconds, speaker, conversation['word_count'], window)
+
+    def _finish_turn(self, turn: Tuple[int, str, int, int], following: Optional[Dict[str, Any]] = None):
+        seconds, speaker, word_count, window = turn
+        talk = word_count / WORDS_PER_SECOND
+        if following is not None:
+            talk = min(talk, max(0, following['seconds'] - seconds))
+        self.talk_seconds[speaker] += talk
+        self.windows[speaker + '_talk_seconds'][window] += talk
+        self.end_seconds = max(self.end_seconds, seconds + talk)
+        if following is None:
+            return
+
+        silence = max(0, following['seconds'] - seconds - talk)
+        if speaker == 'tutor' and following['speaker'] == 'student':
+            self.latencies.append(silence)
+        if silence >= SILENCE_SECONDS:
+            self.silences.append({'timestamp': following['timestamp'], 'seconds': round(silence, 1),
+                                  'before': following['speaker']})
+
+    def result(self) -> Dict[str, Any]:
+        # Finishing the held-back turn must not change this accumulator, which may still grow.
+        timeline = copy.copy(self)
+        timeline.talk_seconds = dict(self.talk_seconds)
+        timeline.latencies = list(self.latencies)
+        timeline.silences = list(self.silences)
+        timeline.windows = {name: list(values) for name, values in self.windows.items()}
+        if timeline._pending is not None:
+            timeline._finish_turn(timeline._pending)
+        return timeline._summary()
+
+    def _summary(self) -> Dict[str, Any]:
+        total_talk = sum(self.talk_seconds.values())
+        latencies = self.latencies
+        windows = dict(self.windows)
+        for name in ('student_talk_seconds', 'tutor_talk_seconds'):
+            windows[name] = [round(value, 1) for value in windows[name]]
+        return {
+            'duration_seconds': round(self.end_seconds - self.first_seconds, 1) if self.first_seconds is not None else 0,
+            'talk_seconds': {speaker: round(talk, 1) for speaker, talk in self.talk_seconds.items()},
+            'talk_share': {speaker: round(talk / total_talk, 3) if total_talk else 0.0
+                           for speaker, talk in self.talk_seconds.items()},
+            'response_latency': {
+                'responses': len(latencies),
+                'mean_seconds': round(sum(latencies) / len(latencies), 1) if latencies else None,
+                'median_seconds': round(_median(latencies), 1) if latencies else None,
+                'max_seconds': round(max(latencies), 1) if latencies else None
+            },
+            'silences': list(self.silences),
+            'silence_seconds': round(sum(silence['seconds'] for silence in self.silences), 1),
+            'windows': {'window_seconds': WINDOW_SECONDS,
+                        'start_seconds': [index * WINDOW_SECONDS for index in range(len(self.windows['turns']))],
+                        **windows}
+        }
+
+
+def _median(values: List[float]) -> float:
+    # statistics.median would add ~20 ms of imports to every CLI start.
+    ordered = sorted(values)
+    middle = len(ordered) // 2
+    return ordered[middle] if len(ordered) % 2 else (ordered[middle - 1] + ordered[middle]) / 2
+
+
+class AnalysisEngine:
+    """Computes every analysis section in a single traversal of a transcript.
+
+    Each line is matched once and each completed turn is lowercased and
+    categorized once; all sections update their accumulators from that
+    shared per-turn state. With ``turns=False`` only the line-level
+    sections (LINE_SECTIONS) are built and turn parsing is skipped.
+    """
+
+    def __init__(self, analyzer, turns: bool = True):
+        self.analyzer = analyzer
+        self.matcher = analyzer.matcher
+        self.turns = turns
+        self.text_scan = JoinedPhraseScan(self.matcher, '\n')
+        self.scanner = TurnScanner(analyzer, self.text_scan) if turns else None
+        self.conversations = analyzer.new_turn_table() if analyzer.compact_turns else []
+
+        self.session_metadata = SessionMetadata(analyzer)
+        self.action_items = ActionItems(analyzer)
+        self.learning_patterns = LearningPatterns(analyzer)
+        self.teaching_strategies = TeachingStrategies(analyzer)
+        self.student_condition = StudentCondition(analyzer)
+        self.performance_indicators = AcademicPerformance(analyzer)
+        self.timeline = Timeline(analyzer)
+        self.lines_read = 0
+        self.keyword_hits = 0
+
+    def feed(self, line: str):
+        self.lines_read += 1
+        if self.scanner is not None:
+            completed = self.scanner.feed(line)
+            if completed is not None:
+                self.add_turn(*completed)
+            line_lower, line_phrases = self.scanner.line_lower, self.scanner.line_phrases
+        else:
+            line_lower = line.rstrip('\r\n').lower()
+            line_phrases = self.matcher.phrases(line_lower)
+            self.text_scan.add(line_lower, line_phrases)
+        self.session_metadata.add_line(line, line_lower)
+        self.action_items.add_line(line, line_phrases)
+
+    def feed_lines(self, lines: Iterable[str]) -> 'AnalysisEngine':
+        for line in lines:
+            self.feed(line)
+        return self
+
+    def close(self) -> 'AnalysisEngine':
+        if self.scanner is not None:
+            completed = self.scanner.close()
+            if completed is not None:
+                self.add_turn(*completed)
+        return self
+
+    def add_turn(self, conversation: Dict[str, Any], phrases: FrozenSet[str]):
+        # Moments record the position of their turn in parsed_conversations.
+        turn = len(self.conversations)
+        self.conversations.append(conversation)
+        self.keyword_hits += len(phrases)
+        content_lower = conversation['content'].lower()
+        found = self.matcher.categorize(phrases)
+
+        self.performance_indicators.add(content_lower, phrases)
+        self.timeline.add(conversation, found)
+        if conversation['speaker'] == 'student':
+            self.learning_patterns.add(conversation, found, turn)
+            self.student_condition.add(content_lower, phrases)
+        elif conversation['speaker'] == 'tutor':
+            self.teaching_strategies.add(conversation, found, turn)
+
+    def copy(self) -> 'AnalysisEngine':
+        """Independent copy of the traversal state; the analyzer and matcher are shared."""
+        return copy.deepcopy(self, {id(self.analyzer): self.analyzer, id(self.matcher): self.matcher})
+
+    def sections(self) -> Dict[str, Any]:
+        """Every section this engine built, except educational_insights."""
+        text_phrases = frozenset(self.text_scan.phrases)
+        sections = {
+            'session_metadata': self.session_metadata.result(text_phrases),
+            'subject_analysis': self.analyzer._analyze_subjects(None, text_phrases),
+            'action_items': list(self.action_items.result())
+        }
+        if self.turns:
+            sections.update({
+                'learning_patterns': self.learning_patterns.result(),
+                'teaching_strategies': self.teaching_strategies.result(),
+                'student_condition': self.student_condition.result(),
+                'performance_indicators': self.performance_indicators.result(),
+                'timeline': self.timeline.result(),
+                'parsed_conversations': self.conversations.copy()
+            })
+        return sections
+
+    def result(self) -> Dict[str, Any]:
+        sections = self.sections()
+        sections['educational_insights'] = self.analyzer._generate_educational_insights(
+            *(sections[name] for name in SECTION_DEPENDENCIES['educational_insights'])
+        )
+        return {name: sections[name] for name in SECTIONS}
@@ -0,0 +1,65 @@
+import io
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, Tuple
+
+from analysis_engine import LINE_SECTIONS, SECTION_DEPENDENCIES, SECTIONS, AnalysisEngine
+
+
+class AnalysisResult(Mapping):
+    """Analysis of one transcript whose sections are computed on first access.
+
+    Line-level sections (session_metadata, subject_analysis, action_items)
+    come from a pass that skips turn parsing; any other section triggers
+    one full pass that fills in every transcript-derived section at once.
+    Derived sections are computed from their SECTION_DEPENDENCIES. Values
+    are memoized, and the mapping equals and serializes to the dict that
+    analyze_transcript returns.
+    """
+
+    def __init__(self, analyzer, transcript_text: str):
+        self.analyzer = analyzer
+        self._text = transcript_text
+        self._sections: Dict[str, Any] = {}
+
+    def __getitem__(self, section: str) -> Any:
+        if section not in self._sections:
+            if section not in SECTIONS:
+                raise KeyError(section)
+            self._compute(section)
+        return self._sections[section]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(SECTIONS)
+
+    def __len__(self) -> int:
+        return len(SECTIONS)
+
+    @property
+    def computed(self) -> Tuple[str, ...]:
+        """Sections computed so far, in result order."""
+        return tuple(section for section in SECTIONS if section in self._sections)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {section: self[section] for section in SECTIONS}
+
+    def _compute(self, section: str):
+        dependencies = SECTION_DEPENDENCIES.get(section)
+        if dependencies:
+            self._sections[section] = self.analyzer._generate_educational_insights(
+                *(self[name] for name in dependencies)
+            )
+            return
+
+        engine = AnalysisEngine(self.analyzer, turns=section not in LINE_SECTIONS)
+        with self.analyzer.instrumentation.stage('analysis.lazy_pass'):
+            engine.feed_lines(io.StringIO(self._text)).close()
+        self.analyzer._record_engine(engine)
+        for name, value in engine.sections().items():
+            self._sections.setdefault(name, value)
+
+        if engine.turns:
+            # Nothing left needs the transcript itself.
+            self._text = None
+
+    def __repr__(self) -> str:
+        return f'AnalysisResult(computed={list(self.computed)!r})'
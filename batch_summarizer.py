@@ -0,0 +1,250 @@
+import json
+import os
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterator, Optional
+
+from corpus_analyzer import CorpusSource, find_transcripts
+from summary_generator import EducationalSummaryGenerator
+
+BATCH_ENDPOINT = '/v1/chat/completions'
+# The Batch API takes at most 50,000 requests and 200 MB per input file.
+MAX_BATCH_REQUESTS = 50000
+MAX_BATCH_BYTES = 190 * 1024 * 1024
+TERMINAL_STATUSES = ('completed', 'failed', 'expired', 'cancelled')
+MANIFEST_NAME = 'manifest.json'
+
+
+def default_batch_directory() -> str:
+    return os.path.join('.cache', 'batches', datetime.now().strftime("batch_%Y%m%d_%H%M%S"))
+
+
+class BatchSummarizer:
+    """Parent summaries for a whole corpus through the OpenAI Batch API.
+
+    ``prepare`` renders every transcript's prompt into JSONL request files
+    plus a manifest that maps each custom_id to its transcript, ``submit``
+    uploads the files and creates one batch per file, ``wait`` polls until
+    every batch has finished and ``collect`` yields one summary record per
+    transcript. The manifest is rewritten after every step, so an
+    interrupted run continues from ``load_manifest(directory)``. Prompts
+    whose response is already cached are not sent again.
+    """
+
+    def __init__(self, generator: Optional[EducationalSummaryGenerator] = None, poll_interval: float = 30.0,
+                 max_requests_per_batch: int = MAX_BATCH_REQUESTS):
+        self.generator = generator or EducationalSummaryGenerator(use_ai=True)
+        self.instrumentation = self.generator.instrumentation
+        self.poll_interval = poll_interval
+        self.max_requests_per_batch = min(max_requests_per_batch, MAX_BATCH_REQUESTS)
+
+    def run(self, paths_or_dir: CorpusSource, directory: Optional[str] = None, pattern: str = '*.txt') -> Iterator[Dict[str, Any]]:
+        manifest = self.prepare(paths_or_dir, directory, pattern)
+        self.submit(manifest)
+        self.wait(manifest)
+        return self.collect(manifest)
+
+    def prepare(self, paths_or_dir: CorpusSource, directory: Optional[str] = None, pattern: str = '*.txt') -> Dict[str, Any]:
+        """Write the batch request files and manifest for every transcript into ``directory``."""
+        directory = directory or default_batch_directory()
+        os.makedirs(directory, exist_ok=True)
+        if os.path.exists(os.path.join(directory, MANIFEST_NAME)):
+            raise FileExistsError(f"{directory} already holds a batch run; resume it or choose another directory")
+
+        manifest = {'directory': directory, 'transcripts': {}, 'batches': []}
+        writer = None
+        with self.instrumentation.stage('batch.prepare'):
+            for index, path in enumerate(find_transcripts(paths_or_dir, pattern)):
+                custom_id = f'transcript-{index}'
+                entry = manifest['transcripts'][custom_id] = {'path': path}
+                try:
+                    prompt = self._render_prompt(path)
+                except (OSError, UnicodeDecodeError) as e:
+                    entry['error'] = f'{type(e).__name__}: {e}'
+                    continue
+
+                entry['cache_key'] = self.generator._response_cache_key(prompt)
+                if self._cached(entry['cache_key']) is not None:
+                    entry['cached'] = True
+                    self.instrumentation.count('llm_cache_hits')
+                    continue
+
+                line = json.dumps({'custom_id': custom_id, 'method': 'POST', 'url': BATCH_ENDPOINT,
+                                   'body': self.generator._chat_request(prompt)}, ensure_ascii=False) + '\n'
+                size = len(line.encode('utf-8'))
+                batch = manifest['batches'][-1] if manifest['batches'] else None
+                if batch is None or batch['requests'] >= self.max_requests_per_batch or batch['bytes'] + size > MAX_BATCH_BYTES:
+                    if writer is not None:
+                        writer.close()
+                    batch = {'request_file': os.path.join(directory, f"requests_{len(manifest['batches']) + 1:03d}.jsonl"),
+                             'requests': 0, 'bytes': 0}
+                    manifest['batches'].append(batch)
+                    writer = open(batch['request_file'], 'w', encoding='utf-8')
+                writer.write(line)
+                batch['requests'] += 1
+                batch['bytes'] += size
+        if writer is not None:
+            writer.close()
+
+        self.save_manifest(manifest)
+        requests = sum(batch['requests'] for batch in manifest['batches'])
+        cached = sum(1 for entry in manifest['transcripts'].values() if entry.get('cached'))
+        self.instrumentation.log(f" Prepared {requests} batch requests for {len(manifest['transcripts'])} transcripts "
+                                 f"({cached} cached) in {len(manifest['batches'])} file(s): {directory}")
+        return manifest
+
+    def submit(self, manifest: Dict[str, Any]) -> Dict[str, Any]:
+        """Upload each request file and create its batch; batches already created are skipped."""
+        client = self._client()
+        for batch in manifest['batches']:
+            if batch.get('batch_id'):
+                continue
+            if not batch.get('input_file_id'):
+                with open(batch['request_file'], 'rb') as handle:
+                    batch['input_file_id'] = client.files.create(file=handle, purpose='batch').id
+                self.save_manifest(manifest)
+            created = client.batches.create(input_file_id=batch['input_file_id'], endpoint=BATCH_ENDPOINT,
+                                            completion_window='24h',
+                                            metadata={'request_file': os.path.basename(batch['request_file'])})
+            batch['batch_id'] = created.id
+            batch['status'] = created.status
+            self.save_manifest(manifest)
+            self.instrumentation.count('batches_submitted')
+            self.instrumentation.log(f" Submitted batch {created.id} ({batch['requests']} requests)")
+        return manifest
+
+    def wait(self, manifest: Dict[str, Any]) -> Dict[str, Any]:
+        """Poll every unfinished batch until all reach a terminal status."""
+        client = self._client()
+        with self.instrumentation.stage('batch.wait'):
+            while True:
+                pending = [batch for batch in manifest['batches']
+                           if batch.get('batch_id') and batch.get('status') not in TERMINAL_STATUSES]
+                for batch in pending:
+                    self._update(batch, client.batches.retrieve(batch['batch_id']))
+                self.save_manifest(manifest)
+
+                pending = [batch for batch in pending if batch['status'] not in TERMINAL_STATUSES]
+                if not pending:
+                    return manifest
+                done = sum(batch.get('request_counts', {}).get('completed', 0) for batch in manifest['batches'])
+                total = sum(batch['requests'] for batch in manifest['batches'])
+                self.instrumentation.log(f" Waiting on {len(pending)} batch(es) - {done}/{total} requests completed")
+                time.sleep(self.poll_interval)
+
+    def collect(self, manifest: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """Yield one record per transcript, matching batch results by custom_id.
+
+        Failed, missing and unreadable requests fall back to the template
+        summary and carry an ``error``; successful responses are stored in
+        the response cache.
+        """
+        client = self._client()
+        transcripts = manifest['transcripts']
+        returned = set()
+        for batch in manifest['batches']:
+            for file_key in ('output_file_id', 'error_file_id'):
+                if not batch.get(file_key):
+                    continue
+                for line in self._download(client, batch[file_key], manifest['directory']):
+                    record = json.loads(line)
+                    custom_id = record.get('custom_id')
+                    if custom_id not in transcripts or custom_id in returned:
+                        continue
+                    returned.add(custom_id)
+                    yield self._result(custom_id, transcripts[custom_id], record)
+
+        for custom_id, entry in transcripts.items():
+            if custom_id in returned:
+                continue
+            if entry.get('cached'):
+                cached = self._cached(entry['cache_key'])
+                if cached is not None:
+                    yield self._record(custom_id, entry, cached, 'AI-Enhanced (cached)')
+                    continue
+            yield self._fallback(custom_id, entry, entry.get('error') or 'no result returned by the batch')
+
+    def save_manifest(self, manifest: Dict[str, Any]):
+        path = os.path.join(manifest['directory'], MANIFEST_NAME)
+        with open(path + '.tmp', 'w', encoding='utf-8') as handle:
+            json.dump(manifest, handle, indent=1)
+        os.replace(path + '.tmp', path)
+
+    @staticmethod
+    def load_manifest(directory: str) -> Dict[str, Any]:
+        with open(os.path.join(directory, MANIFEST_NAME), encoding='utf-8') as handle:
+            manifest = json.load(handle)
+        manifest['directory'] = directory
+        return manifest
+
+    def _render_prompt(self, path: str) -> str:
+        return self.generator._create_advanced_prompt(self._analyze(path))
+
+    def _analyze(self, path: str, lazy: bool = False) -> Dict[str, Any]:
+        with open(path, encoding='utf-8-sig') as handle:
+            return self.generator.analyzer.analyze_transcript(handle.read(), lazy=lazy)
+
+    def _cached(self, cache_key: str) -> Optional[str]:
+        cache = self.generator.response_cache
+        if cache is None or self.generator.bypass_cache:
+            return None
+        return cache.get(cache_key)
+
+    def _client(self):
+        if not self.generator.use_ai:
+            raise RuntimeError("batch mode needs the openai package and OPENAI_API_KEY")
+        client = self.generator._openai_client()
+        if client is None:
+            raise RuntimeError("batch mode needs openai v1.x or later")
+        return client
+
+    @staticmethod
+    def _update(batch: Dict[str, Any], remote):
+        batch['status'] = remote.status
+        batch['output_file_id'] = remote.output_file_id
+        batch['error_file_id'] = remote.error_file_id
+        if remote.request_counts is not None:
+            batch['request_counts'] = {'total': remote.request_counts.total, 'completed': remote.request_counts.completed,
+                                       'failed': remote.request_counts.failed}
+
+    @staticmethod
+    def _download(client, file_id: str, directory: str) -> Iterator[str]:
+        # Kept on disk so a resumed collect does not download again.
+        path = os.path.join(directory, f'{file_id}.jsonl')
+        if not os.path.exists(path):
+            client.files.content(file_id).write_to_file(path + '.tmp')
+            os.replace(path + '.tmp', path)
+        with open(path, encoding='utf-8') as handle:
+            for line in handle:
+                if line.strip():
+                    yield line
+
+    def _result(self, custom_id: str, entry: Dict[str, Any], record: Dict[str, Any]) -> Dict[str, Any]:
+        response = record.get('response') or {}
+        body = response.get('body') or {}
+        if record.get('error') or response.get('status_code') != 200:
+            error = record.get('error') or body.get('error') or {}
+            self.instrumentation.count('llm_errors')
+            return self._fallback(custom_id, entry, error.get('message') or f"status {response.get('status_code')}")
+
+        usage = body.get('usage') or {}
+        self.instrumentation.count('llm_tokens_in', usage.get('prompt_tokens') or 0)
+        self.instrumentation.count('llm_tokens_out', usage.get('completion_tokens') or 0)
+        content = body['choices'][0]['message']['content'].strip()
+        self.generator._store_response(entry['cache_key'], content)
+        return self._record(custom_id, entry, content, 'AI-Batch')
+
+    def _fallback(self, custom_id: str, entry: Dict[str, Any], error: str) -> Dict[str, Any]:
+        self.instrumentation.count('llm_fallbacks')
+        # The manifest keeps no analyses, so the transcript is analyzed again; the template only needs the line pass.
+        try:
+            analysis = self._analyze(entry['path'], lazy=True)
+        except (OSError, UnicodeDecodeError):
+            analysis = {}
+        record = self._record(custom_id, entry, self.generator._generate_template_summary(analysis), 'Template-Based')
+        record['error'] = error
+        return record
+
+    @staticmethod
+    def _record(custom_id: str, entry: Dict[str, Any], summary_content: str, method: str) -> Dict[str, Any]:
+        return {'custom_id': custom_id, 'path': entry['path'], 'summary_content': summary_content, 'method': method}
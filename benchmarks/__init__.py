@@ -0,0 +1,4 @@
+"""Benchmarks for the transcript analyzer and summary generator.
+
+Run ``python -m benchmarks.run --help`` from the repository root.
+"""
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""Per-request API latency with and without connection reuse.
+
+    python -m benchmarks.client_reuse --requests 100 --latency 0.01
+
+Simulates multi-tenant code that builds an EducationalSummaryGenerator for
+every request, against the local fake model server. ``fresh`` gives each
+generator its own ClientRegistry (a new client, connection pool and TCP
+connection per request, as before the registry existed); ``shared`` hands
+every generator the same registry, so connections are kept alive and
+reused. Nothing leaves the machine.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from typing import Any, Dict, List
+
+from benchmarks.synthetic import SyntheticTranscriptGenerator, parse_size
+from fake_llm_server import FakeLLMServer
+
+
+def run_mode(mode: str, requests: int, prompt: str, analyzer, instrumentation) -> List[float]:
+    from client_registry import ClientRegistry
+    from summary_generator import EducationalSummaryGenerator
+
+    shared = ClientRegistry()
+    latencies = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        clients = shared if mode == 'shared' else ClientRegistry()
+        generator = EducationalSummaryGenerator(cache_path=None, instrumentation=instrumentation,
+                                                clients=clients, analyzer=analyzer)
+        generator._generate_ai_summary(prompt)
+        if mode == 'fresh':
+            clients.close()
+        latencies.append(time.perf_counter() - started)
+    shared.close()
+    return latencies
+
+
+def summarize(mode: str, latencies: List[float], connections: int) -> Dict[str, Any]:
+    ordered = sorted(latencies)
+    record = {
+        'mode': mode,
+        'requests': len(latencies),
+        'connections_opened': connections,
+        'latency_mean_s': statistics.mean(latencies),
+        'latency_p50_s': ordered[len(ordered) // 2],
+        'latency_p95_s': ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))]
+    }
+    print(f"   {mode:<8} mean {record['latency_mean_s'] * 1000:7.2f} ms, p50 {record['latency_p50_s'] * 1000:7.2f} ms, "
+          f"p95 {record['latency_p95_s'] * 1000:7.2f} ms, {connections} connections")
+    return record
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Connection reuse benchmark against the fake model server")
+    parser.add_argument('--requests', type=int, default=100)
+    parser.add_argument('--latency', type=float, default=0.01, help="fake model latency in seconds")
+    parser.add_argument('--size', default='8KB', help="size of the transcript behind the prompt")
+    parser.add_argument('--output', default=None, help="also write the results as JSON")
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+
+    with FakeLLMServer(latency=args.latency) as fake:
+        os.environ['OPENAI_BASE_URL'] = fake.base_url
+        from instrumentation import Instrumentation
+        from transcript_analyzer import EducationalTranscriptAnalyzer
+        from summary_generator import EducationalSummaryGenerator
+
+        instrumentation = Instrumentation(silent=True)
+        analyzer = EducationalTranscriptAnalyzer(instrumentation=instrumentation)
+        text = SyntheticTranscriptGenerator(seed=0).generate(parse_size(args.size))
+        prompt = EducationalSummaryGenerator(cache_path=None, instrumentation=instrumentation, analyzer=analyzer,
+                                             use_ai=False)._create_advanced_prompt(analyzer.analyze_transcript(text))
+
+        print(f" {args.requests} requests per mode, a new generator for each, model latency {args.latency * 1000:.0f} ms:")
+        results = []
+        for mode in ('fresh', 'shared'):
+            # One unmeasured request first, so imports and the first TLS setup count for neither mode.
+            run_mode(mode, 1, prompt, analyzer, instrumentation)
+            before = fake.stats['connections']
+            latencies = run_mode(mode, args.requests, prompt, analyzer, instrumentation)
+            results.append(summarize(mode, latencies, fake.stats['connections'] - before))
+
+    saved = results[0]['latency_mean_s'] - results[1]['latency_mean_s']
+    print(f" Connection reuse saves {saved * 1000:.2f} ms per request "
+          f"({results[0]['latency_mean_s'] / results[1]['latency_mean_s']:.2f}x)")
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as handle:
+            json.dump({'latency_s': args.latency, 'results': results}, handle, indent=2)
+        print(f" Results written to: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
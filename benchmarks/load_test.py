@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""Load-test the HTTP service against the local fake model server.
+
+    python -m benchmarks.load_test --requests 500 --concurrency 64 --endpoint summarize
+
+Without ``--url`` it starts a FakeLLMServer in this process and
+``main.py serve --ai`` as a subprocess pointed at it, so no request leaves
+the machine. Clients keep their connections open, like a platform posting
+sessions at peak. Reports throughput, latency percentiles and how many
+requests were turned away with 429.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from benchmarks.synthetic import SyntheticTranscriptGenerator, parse_size
+from fake_llm_server import FakeLLMServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MAIN = os.path.join(ROOT, 'main.py')
+
+
+async def post(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, host: str, path: str,
+               body: bytes) -> Tuple[int, bytes]:
+    writer.write(f'POST {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n'
+                 f'Content-Length: {len(body)}\r\n\r\n'.encode('latin-1') + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        if name.strip().lower() == 'content-length':
+            length = int(value)
+    return status, await reader.readexactly(length)
+
+
+async def client(url: str, jobs: asyncio.Queue, results: List[Dict[str, Any]]):
+    parts = urlsplit(url)
+    reader, writer = await asyncio.open_connection(parts.hostname, parts.port)
+    try:
+        while True:
+            try:
+                path, body = jobs.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            started = time.perf_counter()
+            try:
+                status, response = await post(reader, writer, parts.netloc, path, body)
+            except (ConnectionError, asyncio.IncompleteReadError, ValueError, IndexError):
+                results.append({'status': 'connection error', 'latency': time.perf_counter() - started})
+                writer.close()
+                reader, writer = await asyncio.open_connection(parts.hostname, parts.port)
+                continue
+            record = {'status': status, 'latency': time.perf_counter() - started}
+            if status == 200 and path == '/summarize':
+                record['method'] = json.loads(response)['method']
+            results.append(record)
+    finally:
+        writer.close()
+
+
+async def load(url: str, requests: int, concurrency: int, endpoint: str, transcripts: List[str],
+               deadline: Optional[float]) -> Dict[str, Any]:
+    jobs = asyncio.Queue()
+    for index in range(requests):
+        path = endpoint if endpoint != 'mixed' else ('analyze', 'summarize')[index % 2]
+        request = {'transcript': transcripts[index % len(transcripts)]}
+        if deadline is not None:
+            request['deadline'] = deadline
+        jobs.put_nowait((f'/{path}', json.dumps(request).encode('utf-8')))
+
+    results = []
+    started = time.perf_counter()
+    await asyncio.gather(*(client(url, jobs, results) for _ in range(concurrency)))
+    wall = time.perf_counter() - started
+
+    ok = sorted(record['latency'] for record in results if record['status'] == 200)
+
+    def percentile(fraction: float) -> Optional[float]:
+        return ok[min(len(ok) - 1, int(fraction * len(ok)))] if ok else None
+
+    return {
+        'requests': requests,
+        'concurrency': concurrency,
+        'endpoint': endpoint,
+        'wall_s': wall,
+        'throughput_rps': len(ok) / wall,
+        'status': dict(Counter(str(record['status']) for record in results)),
+        'methods': dict(Counter(record['method'] for record in results if 'method' in record)),
+        'latency_p50_s': percentile(0.50),
+        'latency_p95_s': percentile(0.95),
+        'latency_p99_s': percentile(0.99),
+        'latency_max_s': ok[-1] if ok else None
+    }
+
+
+def start_service(fake: FakeLLMServer, args: argparse.Namespace) -> Tuple[subprocess.Popen, str]:
+    env = dict(os.environ, OPENAI_BASE_URL=fake.base_url)
+    # The fake server has no rate limits of its own.
+    command = [sys.executable, MAIN, 'serve', '--ai', '--port', '0', '--no-response-cache', '--tokens-per-minute', '0',
+               '--queue-size', str(args.queue_size), '--max-concurrency', str(args.max_concurrency)]
+    if args.workers:
+        command += ['--workers', str(args.workers)]
+    process = subprocess.Popen(command, cwd=ROOT, env=env, stdout=subprocess.PIPE, text=True)
+    line = process.stdout.readline()
+    if 'Serving on' not in line:
+        process.kill()
+        raise RuntimeError(f"service did not start: {line!r}")
+    return process, line.split('Serving on ', 1)[1].split()[0]
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Load test for the analysis/summary HTTP service")
+    parser.add_argument('--url', default=None, help="test a running service instead of starting one")
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=32, help="client connections")
+    parser.add_argument('--endpoint', choices=('analyze', 'summarize', 'mixed'), default='summarize')
+    parser.add_argument('--size', default='8KB', help="transcript size, e.g. 8KB")
+    parser.add_argument('--transcripts', type=int, default=16, help="distinct transcripts to cycle through")
+    parser.add_argument('--deadline', type=float, default=None, help="per-request deadline in seconds")
+    parser.add_argument('--workers', type=int, default=None, help="service analysis workers")
+    parser.add_argument('--queue-size', type=int, default=64, help="service queue size per endpoint")
+    parser.add_argument('--max-concurrency', type=int, default=8, help="service OpenAI concurrency")
+    parser.add_argument('--latency', type=float, default=0.2, help="fake model latency in seconds")
+    parser.add_argument('--rate-limit-every', type=int, default=0, help="fake model answers every Nth request with 429")
+    parser.add_argument('--output', default=None, help="also write the report as JSON")
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    synthetic = SyntheticTranscriptGenerator(seed=0)
+    transcripts = [synthetic.generate(parse_size(args.size)) for _ in range(args.transcripts)]
+
+    fake = process = None
+    url = args.url
+    if url is None:
+        fake = FakeLLMServer(latency=args.latency, rate_limit_every=args.rate_limit_every).start()
+        process, url = start_service(fake, args)
+    try:
+        print(f" Sending {args.requests} {args.endpoint} requests over {args.concurrency} connections to {url}")
+        report = asyncio.run(load(url, args.requests, args.concurrency, args.endpoint, transcripts, args.deadline))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait(timeout=30)
+        if fake is not None:
+            report_fake = dict(fake.stats)
+            fake.stop()
+
+    if fake is not None:
+        report['model_server'] = report_fake
+    print(f"   {report['throughput_rps']:.1f} req/s over {report['wall_s']:.2f}s, status {report['status']}")
+    if report['latency_p50_s'] is not None:
+        print(f"   latency p50 {report['latency_p50_s'] * 1000:.0f} ms, p95 {report['latency_p95_s'] * 1000:.0f} ms, "
+              f"p99 {report['latency_p99_s'] * 1000:.0f} ms, max {report['latency_max_s'] * 1000:.0f} ms")
+    if report['methods']:
+        print(f"   summary methods {report['methods']}")
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as handle:
+            json.dump(report, handle, indent=2)
+        print(f" Report written to: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
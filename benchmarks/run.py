@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""Time the analyzer and summary stages on seeded synthetic transcripts.
+
+    python -m benchmarks.run --sizes 1KB,100KB,1MB --repeat 5 --output benchmark_results.json
+    python -m benchmarks.run --corpus-files 1000 --corpus-size 8KB --workers 8
+    python -m benchmarks.run --compare old_results.json
+
+Results are written as JSON so runs from different commits can be compared.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List
+
+from benchmarks.synthetic import SyntheticTranscriptGenerator, parse_size
+from transcript_analyzer import EducationalTranscriptAnalyzer
+
+
+def measure(name: str, fn: Callable[[], Any], repeat: int, **info) -> Dict[str, Any]:
+    walls, cpus = [], []
+    for _ in range(repeat):
+        wall, cpu = time.perf_counter(), time.process_time()
+        fn()
+        walls.append(time.perf_counter() - wall)
+        cpus.append(time.process_time() - cpu)
+
+    record = {
+        'name': name,
+        **info,
+        'repeat': repeat,
+        'wall_best_s': min(walls),
+        'wall_median_s': statistics.median(walls),
+        'cpu_best_s': min(cpus)
+    }
+    if info.get('size_bytes'):
+        record['mb_per_s'] = info['size_bytes'] / (1024 * 1024) / record['wall_best_s'] if record['wall_best_s'] else None
+    print(f"   {name:<42} {record['wall_best_s'] * 1000:10.2f} ms")
+    return record
+
+
+def staged_analysis(analyzer: EducationalTranscriptAnalyzer, text: str) -> Dict[str, Any]:
+    """The analysis assembled from the separate _analyze_* stages, for comparison with the fused engine."""
+    conversations = analyzer._parse_conversations(text)
+    subject_analysis = analyzer._analyze_subjects(text)
+    learning_patterns = analyzer._analyze_learning_patterns(conversations)
+    student_condition = analyzer._assess_student_condition(conversations, text)
+    return {
+        'session_metadata': analyzer._extract_session_metadata(text),
+        'subject_analysis': subject_analysis,
+        'learning_patterns': learning_patterns,
+        'teaching_strategies': analyzer._analyze_teaching_strategies(conversations),
+        'student_condition': student_condition,
+        'action_items': analyzer._extract_action_items(text),
+        'performance_indicators': analyzer._analyze_academic_performance(conversations),
+        'educational_insights': analyzer._generate_educational_insights(subject_analysis, learning_patterns, student_condition),
+        'timeline': analyzer._analyze_timeline(conversations),
+        'parsed_conversations': conversations
+    }
+
+
+def check_matches_golden(analyzer: EducationalTranscriptAnalyzer) -> bool:
+    # The staged _analyze_* methods share the engine's section classes, so
+    # only output recorded before the engine can catch a change in them.
+    from tests.test_analysis_engine import GOLDEN_DIR, comparable, transcripts
+
+    for name, path in transcripts():
+        with open(path, encoding='utf-8-sig', newline='') as handle:
+            text = handle.read()
+        with open(os.path.join(GOLDEN_DIR, f'{name}.json'), encoding='utf-8') as handle:
+            if comparable(analyzer.analyze_transcript(text)) != handle.read():
+                return False
+    return True
+
+
+def bench_transcript(analyzer: EducationalTranscriptAnalyzer, generator, text: str, repeat: int) -> List[Dict[str, Any]]:
+    info = {'size_bytes': len(text.encode('utf-8'))}
+    conversations = analyzer._parse_conversations(text)
+    info['turns'] = len(conversations)
+    analysis = analyzer.analyze_transcript(text)
+    subject_analysis = analysis['subject_analysis']
+    learning_patterns = analysis['learning_patterns']
+    student_condition = analysis['student_condition']
+    compact = EducationalTranscriptAnalyzer(quiet=True, compact_turns=True)
+
+    def lazy_prompt():
+        lazy = analyzer.analyze_transcript(text, lazy=True)
+        generator._create_advanced_prompt(lazy)
+
+    stages = [
+        ('parse_conversations', lambda: analyzer._parse_conversations(text)),
+        ('stage.session_metadata', lambda: analyzer._extract_session_metadata(text)),
+        ('stage.subjects', lambda: analyzer._analyze_subjects(text)),
+        ('stage.learning_patterns', lambda: analyzer._analyze_learning_patterns(conversations)),
+        ('stage.teaching_strategies', lambda: analyzer._analyze_teaching_strategies(conversations)),
+        ('stage.student_condition', lambda: analyzer._assess_student_condition(conversations, text)),
+        ('stage.action_items', lambda: analyzer._extract_action_items(text)),
+        ('stage.academic_performance', lambda: analyzer._analyze_academic_performance(conversations)),
+        ('stage.educational_insights', lambda: analyzer._generate_educational_insights(subject_analysis, learning_patterns, student_condition)),
+        ('stage.timeline', lambda: analyzer._analyze_timeline(conversations)),
+        ('analyze_transcript', lambda: analyzer.analyze_transcript(text)),
+        ('analyze_transcript.compact_turns', lambda: compact.analyze_transcript(text)),
+        ('analyze_transcript.staged', lambda: staged_analysis(analyzer, text)),
+        ('summary.lazy_analysis_and_prompt', lazy_prompt),
+        ('summary.prompt', lambda: generator._create_advanced_prompt(analysis)),
+        ('summary.template', lambda: generator._generate_template_summary(analysis)),
+    ]
+    return [measure(name, fn, repeat, **info) for name, fn in stages]
+
+
+def bench_corpus(synthetic: SyntheticTranscriptGenerator, files: int, size: int, workers: int, repeat: int) -> List[Dict[str, Any]]:
+    from corpus_analyzer import analyze_corpus
+
+    with tempfile.TemporaryDirectory() as directory:
+        print(f" Writing {files} synthetic transcripts of {size} bytes...")
+        synthetic.write_corpus(directory, files, size)
+        info = {'files': files, 'size_bytes': files * size, 'workers': workers}
+        return [
+            measure('analyze_corpus', lambda: sum(1 for _ in analyze_corpus(directory, workers=workers)), repeat, **info),
+            measure('analyze_corpus.unordered', lambda: sum(1 for _ in analyze_corpus(directory, workers=workers, ordered=False)), repeat, **info)
+        ]
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def compare(current: Dict[str, Any], baseline_path: str):
+    with open(baseline_path, encoding='utf-8') as handle:
+        baseline = json.load(handle)
+    previous = {(r['name'], r.get('size_bytes'), r.get('files')): r for r in baseline['results']}
+
+    print(f"\n Comparison with {baseline_path} ({baseline['meta'].get('commit')}):")
+    for record in current['results']:
+        old = previous.get((record['name'], record.get('size_bytes'), record.get('files')))
+        if old and record['wall_best_s']:
+            print(f"   {record['name']:<42} {old['wall_best_s'] / record['wall_best_s']:6.2f}x")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Analyzer benchmark suite")
+    parser.add_argument('--sizes', default='1KB,64KB,1MB', help="comma-separated transcript sizes, e.g. 1KB,1MB,50MB")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--student-ratio', type=float, default=0.5)
+    parser.add_argument('--keyword-density', type=float, default=0.05)
+    parser.add_argument('--action-item-rate', type=float, default=0.02)
+    parser.add_argument('--inline', action='store_true', help="write speech on the header line")
+    parser.add_argument('--corpus-files', type=int, default=0, help="also time analyze_corpus over this many files")
+    parser.add_argument('--corpus-size', default='8KB')
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--output', default='benchmark_results.json')
+    parser.add_argument('--compare', metavar='BASELINE_JSON', help="print speedups against an earlier results file")
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+
+    synthetic = SyntheticTranscriptGenerator(seed=args.seed, student_ratio=args.student_ratio,
+                                             keyword_density=args.keyword_density,
+                                             action_item_rate=args.action_item_rate, inline=args.inline)
+    analyzer = EducationalTranscriptAnalyzer(quiet=True)
+    with contextlib.redirect_stdout(io.StringIO()):
+        from summary_generator import EducationalSummaryGenerator
+        generator = EducationalSummaryGenerator(cache_path=None, instrumentation=analyzer.instrumentation)
+    generator.analyzer = analyzer
+
+    results = []
+    for size in (parse_size(size) for size in args.sizes.split(',')):
+        print(f" Transcript of {size} bytes:")
+        results.extend(bench_transcript(analyzer, generator, synthetic.generate(size), args.repeat))
+
+    if args.corpus_files:
+        results.extend(bench_corpus(synthetic, args.corpus_files, parse_size(args.corpus_size), args.workers, args.repeat))
+
+    checks = {'matches_golden': check_matches_golden(analyzer)}
+    print(f" Analysis matches the golden output: {checks['matches_golden']}")
+
+    report = {
+        'meta': {
+            'commit': git_commit(),
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'args': vars(args)
+        },
+        'results': results,
+        'checks': checks
+    }
+    with open(args.output, 'w', encoding='utf-8') as handle:
+        json.dump(report, handle, indent=2)
+    print(f" Results written to: {args.output}")
+
+    if args.compare:
+        compare(report, args.compare)
+
+    return 0 if all(checks.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""Check CLI startup against a time budget.
+
+    python -m benchmarks.startup --budget-ms 150 --repeat 5
+
+Each command runs as a fresh interpreter, the way cron jobs and hooks call
+it. A command fails the check when its best wall time exceeds the budget
+or when it imports a module it should not need (openai for analysis and
+template runs). Exits non-zero if any check fails.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List
+
+from benchmarks.synthetic import SyntheticTranscriptGenerator
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MAIN = os.path.join(ROOT, 'main.py')
+FORBIDDEN_MODULES = ('openai', 'httpx', 'pydantic', 'dotenv')
+
+
+def imported_modules(importtime_output: str) -> List[str]:
+    """Top-level package names from ``python -X importtime`` stderr."""
+    modules = set()
+    for line in importtime_output.splitlines():
+        if line.startswith('import time:') and '|' in line:
+            name = line.rsplit('|', 1)[1].strip()
+            modules.add(name.split('.')[0])
+    return sorted(modules)
+
+
+def time_command(label: str, args: List[str], repeat: int, cwd: str) -> Dict[str, Any]:
+    walls = []
+    for _ in range(repeat):
+        wall = time.perf_counter()
+        subprocess.run([sys.executable, MAIN, *args], cwd=cwd, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        walls.append(time.perf_counter() - wall)
+
+    trace = subprocess.run([sys.executable, '-X', 'importtime', MAIN, *args], cwd=cwd, check=True,
+                           stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    modules = imported_modules(trace.stderr)
+    return {
+        'command': label,
+        'wall_best_s': min(walls),
+        'forbidden_imports': [name for name in FORBIDDEN_MODULES if name in modules]
+    }
+
+
+def interpreter_baseline(repeat: int) -> float:
+    walls = []
+    for _ in range(repeat):
+        wall = time.perf_counter()
+        subprocess.run([sys.executable, '-c', 'pass'], check=True)
+        walls.append(time.perf_counter() - wall)
+    return min(walls)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="CLI startup-time budget check")
+    parser.add_argument('--budget-ms', type=float, default=150.0,
+                        help="allowed wall time per command, over a bare interpreter start")
+    parser.add_argument('--repeat', type=int, default=5)
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        transcript = os.path.join(directory, 'transcript.txt')
+        with open(transcript, 'w', encoding='utf-8') as handle:
+            handle.write(SyntheticTranscriptGenerator(seed=0).generate(8 * 1024))
+
+        commands = [
+            ('--help', ['--help']),
+            ('analyze', ['analyze', '--quiet', transcript]),
+            ('summarize --template', ['summarize', '--template', '--quiet', transcript,
+                                      '-o', os.path.join(directory, 'summary.txt')])
+        ]
+        baseline = interpreter_baseline(args.repeat)
+        print(f" Interpreter startup: {baseline * 1000:.1f} ms (budget {args.budget_ms:.0f} ms on top)")
+
+        failed = False
+        for label, command in commands:
+            record = time_command(label, command, args.repeat, directory)
+            overhead_ms = (record['wall_best_s'] - baseline) * 1000
+            ok = overhead_ms <= args.budget_ms and not record['forbidden_imports']
+            failed = failed or not ok
+            note = f" imports {', '.join(record['forbidden_imports'])}" if record['forbidden_imports'] else ''
+            print(f"   {'ok  ' if ok else 'FAIL'} {record['command']:<24} {overhead_ms:8.1f} ms{note}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,119 @@
+import os
+import random
+from typing import Iterable, Iterator, List, Optional
+
+FILLER_WORDS = (
+    'so', 'okay', 'the', 'a', 'and', 'then', 'we', 'you', 'it', 'is', 'this', 'that', 'for', 'on',
+    'just', 'like', 'yeah', 'now', 'let', 'me', 'see', 'number', 'question', 'answer', 'problem',
+    'one', 'two', 'three', 'next', 'page', 'here', 'there', 'do', 'did', 'get', 'go', 'look', 'at',
+    'because', 'if', 'when', 'how', 'about', 'with', 'your', 'my', 'our', 'all', 'right', 'well'
+)
+
+ACTION_ITEMS = (
+    'Complete 1 Kaplan reading section on computer (30 min)',
+    'Review math formulas and English document',
+    'Wake up at 6:00 AM for test',
+    'Leave house at 6:50 AM for test',
+    'Charge computer for test tomorrow',
+    'Practice ratio and median problems',
+    'Lay out calculator, pencils and water for test tomorrow morning'
+)
+
+
+def analyzer_keywords() -> List[str]:
+    """Every phrase the analyzer looks for, so generated text exercises all patterns."""
+    from transcript_analyzer import EducationalTranscriptAnalyzer
+
+    analyzer = EducationalTranscriptAnalyzer(quiet=True)
+    keywords = []
+    for patterns in (analyzer.educational_patterns, analyzer.stage_phrases):
+        for phrase_sets in patterns.values():
+            for phrases in phrase_sets.values():
+                keywords.extend(phrase for phrase in phrases if phrase not in keywords)
+    return keywords
+
+
+class SyntheticTranscriptGenerator:
+    """Seeded generator of transcripts in the same format as Tutoring_Transcript_File.txt.
+
+    ``student_ratio`` is the share of student turns, ``keyword_density`` the
+    share of words drawn from the analyzer's phrase lists, and
+    ``action_item_rate`` the chance of an ``ACTION ITEM:`` line after a turn.
+    ``inline`` writes speech on the header line (``0:05 - tutor - ...``).
+    """
+
+    def __init__(self, seed: int = 0, student_ratio: float = 0.5, keyword_density: float = 0.05,
+                 action_item_rate: float = 0.02, words_per_turn: tuple = (3, 30), inline: bool = False,
+                 keywords: Optional[Iterable[str]] = None):
+        self.seed = seed
+        self.student_ratio = student_ratio
+        self.keyword_density = keyword_density
+        self.action_item_rate = action_item_rate
+        self.words_per_turn = words_per_turn
+        self.inline = inline
+        self.keywords = list(keywords) if keywords is not None else analyzer_keywords()
+
+    def lines(self, target_bytes: int, seed: Optional[int] = None) -> Iterator[str]:
+        """Yield transcript lines (with newlines) until about ``target_bytes`` have been produced."""
+        rng = random.Random(self.seed if seed is None else seed)
+        header = [
+            'Tutoring Session Transcript\n',
+            'SESSION DETAILS:\n',
+            f'* Duration: {rng.randint(30, 90)} minutes\n',
+            '* Date: Day before test\n',
+            '* Type: Test preparation review session\n',
+            '________________\n',
+            '\n'
+        ]
+        produced = 0
+        for line in header:
+            produced += len(line)
+            yield line
+
+        seconds = 0
+        low, high = self.words_per_turn
+        while produced < target_bytes:
+            speaker = 'student' if rng.random() < self.student_ratio else 'tutor'
+            count = rng.randint(low, high)
+            words = rng.choices(FILLER_WORDS, k=count)
+            for _ in range(int(count * self.keyword_density + rng.random())):
+                words[rng.randrange(count)] = rng.choice(self.keywords)
+            words[0] = words[0].capitalize()
+            content = ' '.join(words) + rng.choice('.?.')
+
+            timestamp = f'{seconds // 3600}:{seconds // 60 % 60:02d}:{seconds % 60:02d}' if seconds >= 3600 else f'{seconds // 60}:{seconds % 60:02d}'
+            if self.inline:
+                turn = [f'{timestamp} - {speaker} - {content}\n']
+            else:
+                turn = [f'{timestamp} - {speaker}\n', f'{content}\n']
+            if rng.random() < self.action_item_rate:
+                turn.append(f'ACTION ITEM: {rng.choice(ACTION_ITEMS)}\n')
+
+            for line in turn:
+                produced += len(line)
+                yield line
+            seconds += rng.randint(1, 20)
+
+    def generate(self, target_bytes: int, seed: Optional[int] = None) -> str:
+        return ''.join(self.lines(target_bytes, seed))
+
+    def write(self, path: str, target_bytes: int, seed: Optional[int] = None) -> str:
+        with open(path, 'w', encoding='utf-8') as handle:
+            handle.writelines(self.lines(target_bytes, seed))
+        return path
+
+    def write_corpus(self, directory: str, files: int, target_bytes: int) -> List[str]:
+        """Write ``files`` transcripts of about ``target_bytes`` each, seeded per file."""
+        os.makedirs(directory, exist_ok=True)
+        width = len(str(files))
+        return [self.write(os.path.join(directory, f'session_{index:0{width}d}.txt'), target_bytes, self.seed + index)
+                for index in range(files)]
+
+
+def parse_size(text: str) -> int:
+    """Parse sizes such as ``512``, ``1KB``, ``4MB`` into bytes."""
+    text = text.strip().upper()
+    for suffix, factor in (('KB', 1024), ('MB', 1024 ** 2), ('GB', 1024 ** 3), ('B', 1)):
+        if text.endswith(suffix):
+            return int(float(text[:-len(suffix)]) * factor)
+    return int(text)
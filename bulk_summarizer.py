@@ -0,0 +1,144 @@
+import asyncio
+import hashlib
+import os
+from typing import Any, Dict, Optional
+
+from corpus_analyzer import CorpusSource, find_transcripts
+from job_ledger import ANALYZED, FAILED, GENERATED, PROMPT_RENDERED, WRITTEN, JobLedger
+from summary_generator import EducationalSummaryGenerator
+
+LEDGER_NAME = 'ledger.sqlite3'
+DEFAULT_MAX_ATTEMPTS = 3
+
+
+class BulkSummarizer:
+    """Parent summaries for many transcripts, one file each, with a crash-safe ledger.
+
+    Every transcript is a job in a JobLedger next to the summaries. A job
+    that stopped part-way (crash, kill, API outage) continues from the
+    furthest stage the ledger committed: its rendered prompt or generated
+    summary is reused, so a restart neither analyzes again nor pays for a
+    summary it already has. Written jobs are skipped, and failed jobs are
+    retried until they have failed ``max_attempts`` times. With AI
+    summaries a template fallback counts as a failure, so a later run
+    retries the model instead of keeping the fallback. A generator with a
+    near-duplicate index reuses the analysis and AI summary of transcripts
+    it has summarized before.
+    """
+
+    def __init__(self, output_dir: str, generator: Optional[EducationalSummaryGenerator] = None,
+                 ledger: Optional[JobLedger] = None, max_attempts: int = DEFAULT_MAX_ATTEMPTS):
+        self.output_dir = output_dir
+        os.makedirs(output_dir, exist_ok=True)
+        self.generator = generator or EducationalSummaryGenerator()
+        self.instrumentation = self.generator.instrumentation
+        self.ledger = ledger or JobLedger(os.path.join(output_dir, LEDGER_NAME))
+        self.max_attempts = max_attempts
+
+    def add(self, paths_or_dir: CorpusSource, pattern: str = '*.txt') -> int:
+        """Queue transcripts not yet in the ledger; returns how many were added."""
+        taken = set(self.ledger.outputs())
+        jobs = []
+        for path in find_transcripts(paths_or_dir, pattern):
+            path = os.path.abspath(path)
+            stem = os.path.splitext(os.path.basename(path))[0]
+            output, number = f'{stem}_summary.txt', 1
+            # Transcripts with the same name in different directories get numbered files.
+            while output in taken:
+                number += 1
+                output = f'{stem}_{number}_summary.txt'
+            taken.add(output)
+            jobs.append((path, output))
+        return self.ledger.enqueue(jobs)
+
+    def run(self) -> Dict[str, int]:
+        return asyncio.run(self.arun())
+
+    async def arun(self) -> Dict[str, int]:
+        """Process every unfinished job; returns the ledger's job count per state."""
+        jobs = [job for job in self.ledger.jobs()
+                if self._needs_work(job) and (job['state'] != FAILED or job['attempts'] < self.max_attempts)]
+        self.instrumentation.log(f" {len(jobs)} summaries to write (concurrency {self.generator.max_concurrency})...")
+
+        queue = asyncio.Queue()
+        for job in jobs:
+            queue.put_nowait(job)
+
+        async def worker():
+            while not queue.empty():
+                await self._process(queue.get_nowait())
+
+        try:
+            await asyncio.gather(*(worker() for _ in range(min(len(jobs), self.generator.max_concurrency))))
+        finally:
+            await self.generator.aclose()
+            if self.generator.use_ai:
+                await self.generator.clients.aclose()
+            self.ledger.flush()
+        return self.ledger.counts()
+
+    def close(self):
+        self.ledger.close()
+
+    def _needs_work(self, job: Dict[str, Any]) -> bool:
+        if job['state'] != WRITTEN:
+            return True
+        # Written earlier, but the file has since been deleted: write it again from the ledger.
+        return not os.path.exists(os.path.join(self.output_dir, job['output']))
+
+    async def _process(self, job: Dict[str, Any]):
+        path = job['path']
+        generator = self.generator
+        try:
+            analysis = duplicate = None
+            prompt, summary, method = job['prompt'], job['summary'], job['method']
+            with open(path, 'rb') as handle:
+                data = handle.read()
+            content_hash = hashlib.sha256(data).hexdigest()
+            if content_hash != job['content_hash']:
+                # New, or edited since the ledger last saw it: nothing stored for it is valid.
+                prompt = summary = method = None
+
+            if summary is None:
+                if prompt is None:
+                    # With a near-duplicate index this may come back with an earlier transcript's summary.
+                    analysis, duplicate = generator._load_deduplicated(path, data.decode('utf-8-sig'))
+                    summary, method = generator._reused_summary(duplicate)
+                    self.ledger.update(path, ANALYZED, content_hash=content_hash, prompt=None, summary=None, method=None)
+                    if generator.use_ai and summary is None:
+                        with self.instrumentation.stage('summary.prompt'):
+                            prompt = generator._create_advanced_prompt(analysis)
+                        self.ledger.update(path, PROMPT_RENDERED, prompt=prompt)
+
+                if summary is None:
+                    if generator.use_ai:
+                        with self.instrumentation.stage('summary.llm'):
+                            summary, method = await generator._aai_summary(prompt)
+                        if summary is None:
+                            raise RuntimeError("AI summary unavailable; the job will be retried")
+                    else:
+                        if analysis is None:
+                            # Resumed from a prompt an AI run stored; the template needs the analysis itself.
+                            analysis, duplicate = generator._load_deduplicated(path, data.decode('utf-8-sig'))
+                        with self.instrumentation.stage('summary.template'):
+                            summary, method = generator._generate_template_summary(analysis), 'Template-Based'
+                    generator._remember_summary(duplicate, analysis, summary, method)
+                self.ledger.update(path, GENERATED, summary=summary, method=method)
+                self.instrumentation.count('summaries_generated')
+
+            self._write(job['output'], summary)
+            self.ledger.update(path, WRITTEN, error=None)
+            self.instrumentation.count('jobs_written')
+            self.instrumentation.log(f" Written: {job['output']} ({method})")
+        except Exception as e:
+            error = f'{type(e).__name__}: {e}'
+            self.ledger.update(path, FAILED, error=error, attempts=job['attempts'] + 1)
+            self.instrumentation.count('jobs_failed')
+            self.instrumentation.log(f" Failed: {path} - {error}")
+
+    def _write(self, output: str, summary: str):
+        # Written to a temporary name first, so a crash never leaves half a summary behind.
+        path = os.path.join(self.output_dir, output)
+        with open(path + '.tmp', 'w', encoding='utf-8') as handle:
+            handle.write(summary)
+        os.replace(path + '.tmp', path)
@@ -0,0 +1,165 @@
+import importlib.util
+import os
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+# HTTP/2 needs the optional h2 package; without it the pools speak HTTP/1.1.
+H2_AVAILABLE = importlib.util.find_spec('h2') is not None
+
+DEFAULT_MAX_CONNECTIONS = 100
+DEFAULT_MAX_KEEPALIVE_CONNECTIONS = 20
+DEFAULT_KEEPALIVE_EXPIRY = 30.0
+
+
+class ClientRegistry:
+    """Pooled OpenAI clients shared by every generator in the process.
+
+    Building an OpenAI client sets up a TLS context and a connection pool;
+    a generator per request would pay for both and lose keep-alive on every
+    call. The registry keeps one HTTP connection pool for sync clients and
+    one per event loop for async clients (async connections are bound to
+    their loop). OpenAI clients for each API key, base URL and retry
+    setting are thin wrappers over those pools. ``timeout=None`` keeps the
+    SDK's default timeouts; openai is imported on first use.
+
+    A generator's ``aclose()`` closes the loop's pool if that generator
+    opened it; otherwise call ``await aclose()`` here. A pool still open
+    when ``asyncio.run`` finishes is closed while the loop shuts down.
+    """
+
+    _default: Optional['ClientRegistry'] = None
+    _default_lock = threading.Lock()
+
+    def __init__(self, max_connections: int = DEFAULT_MAX_CONNECTIONS,
+                 max_keepalive_connections: int = DEFAULT_MAX_KEEPALIVE_CONNECTIONS,
+                 keepalive_expiry: float = DEFAULT_KEEPALIVE_EXPIRY, http2: bool = True,
+                 timeout: Optional[float] = None):
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self.keepalive_expiry = keepalive_expiry
+        self.http2 = http2 and H2_AVAILABLE
+        self.timeout = timeout
+        self._http_client = None
+        self._async_http_clients: Dict[Any, Any] = {}
+        self._loop_watchers: Dict[Any, Any] = {}
+        self._clients: Dict[Tuple, Any] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def default(cls) -> 'ClientRegistry':
+        """The process-wide registry, created with default limits on first use."""
+        with cls._default_lock:
+            if cls._default is None:
+                cls._default = cls()
+            return cls._default
+
+    @classmethod
+    def set_default(cls, registry: Optional['ClientRegistry']):
+        with cls._default_lock:
+            cls._default = registry
+
+    def client(self, api_key: Optional[str] = None, base_url: Optional[str] = None, max_retries: int = 2):
+        """An ``openai.OpenAI`` client on the shared sync connection pool."""
+        import openai
+
+        base_url = base_url or os.getenv('OPENAI_BASE_URL')
+        with self._lock:
+            if self._http_client is None:
+                self._http_client = openai.DefaultHttpxClient(**self._pool_options(openai))
+            key = ('sync', api_key, base_url, max_retries)
+            if key not in self._clients:
+                self._clients[key] = openai.OpenAI(api_key=api_key, base_url=base_url, max_retries=max_retries,
+                                                   http_client=self._http_client)
+            return self._clients[key]
+
+    def async_client(self, api_key: Optional[str] = None, base_url: Optional[str] = None, max_retries: int = 2):
+        """An ``openai.AsyncOpenAI`` client on the running event loop's connection pool."""
+        import asyncio
+
+        import openai
+
+        loop = asyncio.get_running_loop()
+        base_url = base_url or os.getenv('OPENAI_BASE_URL')
+        with self._lock:
+            # Only loops closed without finalizing their async generators get
+            # here with a pool open; its transports died with the loop.
+            for closed in [other for other in self._async_http_clients if other.is_closed()]:
+                self._forget_pool(closed)
+
+            if loop not in self._async_http_clients:
+                http_client = openai.DefaultAsyncHttpxClient(**self._pool_options(openai))
+                self._async_http_clients[loop] = http_client
+                self._watch_loop(loop, http_client)
+            key = (loop, api_key, base_url, max_retries)
+            if key not in self._clients:
+                self._clients[key] = openai.AsyncOpenAI(api_key=api_key, base_url=base_url, max_retries=max_retries,
+                                                        http_client=self._async_http_clients[loop])
+            return self._clients[key]
+
+    def close(self):
+        """Close the sync connection pool; the next client() call opens a new one."""
+        with self._lock:
+            http_client, self._http_client = self._http_client, None
+            self._clients = {key: client for key, client in self._clients.items() if key[0] != 'sync'}
+        if http_client is not None:
+            http_client.close()
+
+    async def aclose(self):
+        """Close the running event loop's connection pool."""
+        import asyncio
+
+        with self._lock:
+            watcher = self._loop_watchers.get(asyncio.get_running_loop())
+        if watcher is not None:
+            await watcher.aclose()
+
+    def async_pool_open(self) -> bool:
+        """Whether the running event loop already has a connection pool."""
+        import asyncio
+
+        with self._lock:
+            return asyncio.get_running_loop() in self._async_http_clients
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'clients': len(self._clients),
+                'sync_pool': self._http_client is not None,
+                'async_pools': len(self._async_http_clients),
+                'max_connections': self.max_connections,
+                'max_keepalive_connections': self.max_keepalive_connections,
+                'keepalive_expiry': self.keepalive_expiry,
+                'http2': self.http2
+            }
+
+    def _watch_loop(self, loop, http_client):
+        # asyncio.run finalizes async generators before it closes the loop,
+        # the last point at which the pool's connections can still be closed.
+        import asyncio
+
+        async def close_with_loop():
+            try:
+                yield
+            finally:
+                with self._lock:
+                    if self._async_http_clients.get(loop) is http_client:
+                        self._forget_pool(loop)
+                await http_client.aclose()
+
+        watcher = self._loop_watchers[loop] = close_with_loop()
+        asyncio.ensure_future(watcher.__anext__())
+
+    def _forget_pool(self, loop):
+        self._async_http_clients.pop(loop, None)
+        self._loop_watchers.pop(loop, None)
+        self._clients = {key: client for key, client in self._clients.items() if key[0] is not loop}
+
+    def _pool_options(self, openai) -> Dict[str, Any]:
+        # The Limits class of whichever httpx build this openai release uses.
+        limits = type(openai.DEFAULT_CONNECTION_LIMITS)(max_connections=self.max_connections,
+                                                       max_keepalive_connections=self.max_keepalive_connections,
+                                                       keepalive_expiry=self.keepalive_expiry)
+        options = {'limits': limits, 'http2': self.http2}
+        if self.timeout is not None:
+            options['timeout'] = self.timeout
+        return options
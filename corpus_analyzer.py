@@ -0,0 +1,120 @@
+import json
+import multiprocessing
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO, Union
+
+from analysis_cache import AnalysisCache
+from pattern_registry import load_registry
+from transcript_analyzer import EducationalTranscriptAnalyzer
+from turn_table import json_default
+
+CorpusSource = Union[str, os.PathLike, Iterable[Union[str, os.PathLike]]]
+
+_worker_analyzer: Optional[EducationalTranscriptAnalyzer] = None
+
+
+def find_transcripts(paths_or_dir: CorpusSource, pattern: str = '*.txt') -> List[str]:
+    """Expand files and directories (searched recursively for ``pattern``) into a sorted path list."""
+    if isinstance(paths_or_dir, (str, os.PathLike)):
+        paths_or_dir = [paths_or_dir]
+
+    paths = []
+    for entry in paths_or_dir:
+        entry = Path(entry)
+        if entry.is_dir():
+            paths.extend(str(path) for path in sorted(entry.rglob(pattern)) if path.is_file())
+        else:
+            paths.append(str(entry))
+    return paths
+
+
+class JsonlSink:
+    """Appends one JSON record per line, flushed as each record arrives."""
+
+    def __init__(self, target: Union[str, os.PathLike, TextIO]):
+        if isinstance(target, (str, os.PathLike)):
+            self.handle = open(target, 'w', encoding='utf-8')
+            self.owns_handle = True
+        else:
+            self.handle = target
+            self.owns_handle = False
+        self.records_written = 0
+
+    def write(self, record: Dict[str, Any]):
+        self.handle.write(json.dumps(record, ensure_ascii=False, default=json_default) + '\n')
+        self.handle.flush()
+        self.records_written += 1
+
+    def close(self):
+        if self.owns_handle:
+            self.handle.close()
+
+    def __enter__(self) -> 'JsonlSink':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _init_worker(cache_path: Optional[str] = None):
+    global _worker_analyzer
+    cache = AnalysisCache(cache_path) if cache_path else None
+    _worker_analyzer = EducationalTranscriptAnalyzer(quiet=True, cache=cache)
+
+
+def _analyze_path(path: str) -> Dict[str, Any]:
+    if _worker_analyzer is None:
+        _init_worker()
+    try:
+        return {'path': path, 'analysis': _worker_analyzer.analyze_file(path)}
+    except Exception as e:
+        return {'path': path, 'error': f'{type(e).__name__}: {e}'}
+
+
+def analyze_corpus(paths_or_dir: CorpusSource,
+                   workers: Optional[int] = None,
+                   chunksize: Optional[int] = None,
+                   ordered: bool = True,
+                   sink: Union[str, os.PathLike, TextIO, JsonlSink, None] = None,
+                   pattern: str = '*.txt',
+                   cache_path: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """Analyze many transcripts across a process pool, yielding results as they complete.
+
+    Each record is ``{'path', 'analysis'}``, or ``{'path', 'error'}`` when a
+    transcript could not be analyzed. Paths are handed to the pool in chunks
+    of ``chunksize``; with ``ordered=False`` records are yielded in completion
+    order. Every record is also written to ``sink`` (a JSONL path, text file
+    or JsonlSink) before it is yielded. With ``cache_path`` every worker
+    shares one AnalysisCache. Nothing runs until the iterator is consumed.
+    """
+    paths = find_transcripts(paths_or_dir, pattern)
+    workers = max(1, min(workers or os.cpu_count() or 1, len(paths) or 1))
+    if chunksize is None:
+        chunksize = max(1, min(64, len(paths) // (workers * 4)))
+
+    opened_sink = sink is not None and not isinstance(sink, JsonlSink)
+    if opened_sink:
+        sink = JsonlSink(sink)
+
+    try:
+        if workers == 1:
+            _init_worker(cache_path)
+            yield from _emit(map(_analyze_path, paths), sink)
+            return
+
+        # Compiled before the pool starts, so forked workers inherit the patterns instead of loading them.
+        load_registry()
+        with multiprocessing.Pool(workers, initializer=_init_worker, initargs=(cache_path,)) as pool:
+            imap = pool.imap if ordered else pool.imap_unordered
+            yield from _emit(imap(_analyze_path, paths, chunksize), sink)
+    finally:
+        if opened_sink:
+            sink.close()
+
+
+def _emit(records: Iterable[Dict[str, Any]], sink: Optional[JsonlSink]) -> Iterator[Dict[str, Any]]:
+    for record in records:
+        if sink is not None:
+            sink.write(record)
+        yield record
@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+"""Local stand-in for the OpenAI chat completions, files and batches endpoints.
+
+Point the client at it with ``OPENAI_BASE_URL=http://127.0.0.1:8089/v1``.
+It answers every request after a configurable latency and can inject
+429 and 5xx failures to exercise retries. ``"stream": true`` requests get
+server-sent events, one chunk per word ``token_latency`` seconds apart;
+``stream_break_after`` drops the connection after that many words, and
+``reply`` replaces the text of every completion (``''`` for empty ones).
+Batches run in a background
+thread and finish ``batch_delay`` seconds after they are created; every
+``batch_error_every``-th request in a batch lands in the error file.
+Nothing leaves the machine.
+"""
+
+import argparse
+import itertools
+import json
+import re
+import sys
+import threading
+import time
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256
+
+    def handle_error(self, request, client_address):
+        # Clients hang up on purpose (cancelled or timed-out calls); only report real failures.
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+class FakeLLMServer:
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, latency: float = 0.05,
+                 rate_limit_every: int = 0, error_every: int = 0, retry_after: Optional[float] = None,
+                 batch_delay: float = 0.5, batch_error_every: int = 0, token_latency: float = 0.0,
+                 stream_break_after: Optional[int] = None, reply: Optional[str] = None):
+        self.latency = latency
+        self.rate_limit_every = rate_limit_every
+        self.error_every = error_every
+        self.retry_after = retry_after
+        self.batch_delay = batch_delay
+        self.batch_error_every = batch_error_every
+        self.token_latency = token_latency
+        self.stream_break_after = stream_break_after
+        self.reply = reply
+        self.stats = {'requests': 0, 'completed': 0, 'rate_limited': 0, 'errors': 0, 'in_flight': 0, 'max_in_flight': 0,
+                      'batches': 0, 'batch_requests': 0, 'connections': 0}
+        self.files: Dict[str, Dict[str, Any]] = {}
+        self.batches: Dict[str, Dict[str, Any]] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._thread = None
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def setup(self):
+                super().setup()
+                server._count('connections')
+
+            def do_POST(self):
+                server._handle(self)
+
+            def do_GET(self):
+                server._handle(self)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = _Server((host, port), Handler)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f'http://{host}:{port}/v1'
+
+    def start(self) -> 'FakeLLMServer':
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self) -> 'FakeLLMServer':
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _handle(self, handler: BaseHTTPRequestHandler):
+        body = handler.rfile.read(int(handler.headers.get('Content-Length', 0)))
+
+        with self._lock:
+            self.stats['requests'] += 1
+            count = self.stats['requests']
+            self.stats['in_flight'] += 1
+            self.stats['max_in_flight'] = max(self.stats['max_in_flight'], self.stats['in_flight'])
+
+        try:
+            time.sleep(self.latency)
+
+            if self.rate_limit_every and count % self.rate_limit_every == 0:
+                self._count('rate_limited')
+                headers = {'retry-after': str(self.retry_after)} if self.retry_after is not None else {}
+                return self._send(handler, 429, self._error('Rate limit reached', 'rate_limit_exceeded'), headers)
+            if self.error_every and count % self.error_every == 0:
+                self._count('errors')
+                return self._send(handler, 503, self._error('The server is overloaded', 'server_error'))
+
+            path = handler.path.split('?', 1)[0].rstrip('/')
+            # Padded so short paths can be indexed from the end.
+            parts = ['', '', ''] + path.split('/')
+            if handler.command == 'POST' and path.endswith('/chat/completions'):
+                request = json.loads(body or b'{}')
+                if request.get('stream'):
+                    self._stream_completion(handler, request, count)
+                    return self._count('completed')
+                response = self._chat_completion(request, count)
+            elif handler.command == 'POST' and parts[-1] == 'files':
+                response = self._create_file(handler.headers.get('Content-Type', ''), body)
+            elif handler.command == 'GET' and parts[-3] == 'files' and parts[-1] == 'content' and parts[-2] in self.files:
+                self._count('completed')
+                return self._send_bytes(handler, 200, self.files[parts[-2]]['content'], 'application/octet-stream')
+            elif handler.command == 'GET' and parts[-2] == 'files' and parts[-1] in self.files:
+                response = self._file_object(self.files[parts[-1]])
+            elif handler.command == 'POST' and parts[-1] == 'batches' and json.loads(body or b'{}').get('input_file_id') in self.files:
+                response = self._create_batch(json.loads(body))
+            elif handler.command == 'GET' and parts[-2] == 'batches' and parts[-1] in self.batches:
+                response = self._batch_object(parts[-1])
+            elif handler.command == 'POST' and parts[-3] == 'batches' and parts[-1] == 'cancel' and parts[-2] in self.batches:
+                response = self._cancel_batch(parts[-2])
+            else:
+                return self._send(handler, 404, self._error(f'Unknown path {handler.path}', 'not_found'))
+
+            self._count('completed')
+            self._send(handler, 200, response)
+        finally:
+            with self._lock:
+                self.stats['in_flight'] -= 1
+
+    def _chat_completion(self, request: Dict[str, Any], count: int) -> Dict[str, Any]:
+        prompt_tokens = sum(len(str(message.get('content', ''))) for message in request.get('messages', [])) // 4
+        content = f"Subject: Session Summary\n\nDear Parents,\n\nThis is fake summary #{count}." if self.reply is None else self.reply
+        completion_tokens = len(content) // 4
+        return {
+            'id': f'chatcmpl-fake-{count}',
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': request.get('model', 'fake'),
+            'choices': [{
+                'index': 0,
+                'message': {'role': 'assistant', 'content': content},
+                'finish_reason': 'stop'
+            }],
+            'usage': {
+                'prompt_tokens': prompt_tokens,
+                'completion_tokens': completion_tokens,
+                'total_tokens': prompt_tokens + completion_tokens
+            }
+        }
+
+    def _stream_completion(self, handler: BaseHTTPRequestHandler, request: Dict[str, Any], count: int):
+        completion = self._chat_completion(request, count)
+        content = completion['choices'][0]['message']['content']
+        base = {'id': completion['id'], 'object': 'chat.completion.chunk', 'created': completion['created'],
+                'model': completion['model']}
+
+        def choice(delta: Dict[str, Any], finish_reason: Optional[str] = None) -> Dict[str, Any]:
+            return {**base, 'choices': [{'index': 0, 'delta': delta, 'finish_reason': finish_reason}]}
+
+        handler.send_response(200)
+        handler.send_header('Content-Type', 'text/event-stream')
+        handler.send_header('Transfer-Encoding', 'chunked')
+        handler.end_headers()
+
+        def event(payload: Any):
+            data = f"data: {payload if isinstance(payload, str) else json.dumps(payload)}\n\n".encode('utf-8')
+            handler.wfile.write(f'{len(data):x}\r\n'.encode('ascii') + data + b'\r\n')
+            handler.wfile.flush()
+
+        event(choice({'role': 'assistant', 'content': ''}))
+        for number, token in enumerate(re.findall(r'\S+\s*|\s+', content)):
+            if number == self.stream_break_after:
+                # Ends the response without its final chunk, as a dropped connection would.
+                handler.close_connection = True
+                return
+            if number and self.token_latency:
+                time.sleep(self.token_latency)
+            event(choice({'content': token}))
+        event(choice({}, 'stop'))
+        if (request.get('stream_options') or {}).get('include_usage'):
+            event({**base, 'choices': [], 'usage': completion['usage']})
+        event('[DONE]')
+        handler.wfile.write(b'0\r\n\r\n')
+
+    def _create_file(self, content_type: str, body: bytes) -> Dict[str, Any]:
+        message = BytesParser(policy=HTTP).parsebytes(f'Content-Type: {content_type}\r\n\r\n'.encode('latin-1') + body)
+        fields = {}
+        for part in message.iter_parts():
+            fields[part.get_param('name', header='content-disposition')] = part
+        upload = fields['file']
+        return self._file_object(self._store_file(upload.get_content(), upload.get_filename() or 'upload.jsonl',
+                                                  fields['purpose'].get_content().strip()))
+
+    def _store_file(self, content: Any, filename: str, purpose: str) -> Dict[str, Any]:
+        if isinstance(content, str):
+            content = content.encode('utf-8')
+        record = {'id': f'file-fake-{next(self._ids)}', 'content': content, 'filename': filename,
+                  'purpose': purpose, 'created_at': int(time.time())}
+        with self._lock:
+            self.files[record['id']] = record
+        return record
+
+    @staticmethod
+    def _file_object(record: Dict[str, Any]) -> Dict[str, Any]:
+        return {'id': record['id'], 'object': 'file', 'bytes': len(record['content']), 'created_at': record['created_at'],
+                'filename': record['filename'], 'purpose': record['purpose'], 'status': 'processed'}
+
+    def _create_batch(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        batch = {
+            'id': f'batch_fake_{next(self._ids)}',
+            'object': 'batch',
+            'endpoint': request.get('endpoint', '/v1/chat/completions'),
+            'input_file_id': request['input_file_id'],
+            'completion_window': request.get('completion_window', '24h'),
+            'status': 'validating',
+            'created_at': int(time.time()),
+            'metadata': request.get('metadata'),
+            'output_file_id': None,
+            'error_file_id': None,
+            'request_counts': {'total': 0, 'completed': 0, 'failed': 0}
+        }
+        with self._lock:
+            self.batches[batch['id']] = batch
+            self.stats['batches'] += 1
+        threading.Thread(target=self._run_batch, args=(batch['id'],), daemon=True).start()
+        return self._batch_object(batch['id'])
+
+    def _batch_object(self, batch_id: str) -> Dict[str, Any]:
+        with self._lock:
+            return json.loads(json.dumps(self.batches[batch_id]))
+
+    def _cancel_batch(self, batch_id: str) -> Dict[str, Any]:
+        with self._lock:
+            batch = self.batches[batch_id]
+            if batch['status'] in ('validating', 'in_progress'):
+                batch.update(status='cancelled', cancelled_at=int(time.time()))
+        return self._batch_object(batch_id)
+
+    def _run_batch(self, batch_id: str):
+        time.sleep(self.batch_delay)
+        with self._lock:
+            batch = self.batches[batch_id]
+            if batch['status'] == 'cancelled':
+                return
+            batch.update(status='in_progress', in_progress_at=int(time.time()))
+            lines = [line for line in self.files[batch['input_file_id']]['content'].decode('utf-8').splitlines() if line.strip()]
+
+        outputs, errors = [], []
+        for number, line in enumerate(lines, 1):
+            request = json.loads(line)
+            record = {'id': f'batch_req_{batch_id}_{number}', 'custom_id': request.get('custom_id'), 'error': None}
+            if self.batch_error_every and number % self.batch_error_every == 0:
+                record['response'] = {'status_code': 500, 'request_id': f'req_{number}',
+                                      'body': self._error('The server had an error', 'server_error')}
+                errors.append(record)
+            else:
+                self._count('batch_requests')
+                record['response'] = {'status_code': 200, 'request_id': f'req_{number}',
+                                      'body': self._chat_completion(request.get('body', {}), number)}
+                outputs.append(record)
+
+        output_file = self._store_file(''.join(json.dumps(record) + '\n' for record in outputs), f'{batch_id}_output.jsonl', 'batch_output')
+        error_file = self._store_file(''.join(json.dumps(record) + '\n' for record in errors), f'{batch_id}_error.jsonl', 'batch_output') if errors else None
+        with self._lock:
+            batch.update(status='completed', completed_at=int(time.time()), output_file_id=output_file['id'],
+                         error_file_id=error_file['id'] if error_file else None,
+                         request_counts={'total': len(lines), 'completed': len(outputs), 'failed': len(errors)})
+
+    def _count(self, key: str):
+        with self._lock:
+            self.stats[key] += 1
+
+    @staticmethod
+    def _error(message: str, code: str) -> Dict[str, Any]:
+        return {'error': {'message': message, 'type': code, 'code': code}}
+
+    @staticmethod
+    def _send(handler: BaseHTTPRequestHandler, status: int, payload: Dict[str, Any], headers: Dict[str, str] = None):
+        FakeLLMServer._send_bytes(handler, status, json.dumps(payload).encode('utf-8'), 'application/json', headers)
+
+    @staticmethod
+    def _send_bytes(handler: BaseHTTPRequestHandler, status: int, data: bytes, content_type: str, headers: Dict[str, str] = None):
+        handler.send_response(status)
+        handler.send_header('Content-Type', content_type)
+        handler.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            handler.send_header(name, value)
+        handler.end_headers()
+        handler.wfile.write(data)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake OpenAI-compatible server for local testing")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8089)
+    parser.add_argument('--latency', type=float, default=0.05, help="seconds to wait before answering")
+    parser.add_argument('--rate-limit-every', type=int, default=0, help="answer every Nth request with 429")
+    parser.add_argument('--error-every', type=int, default=0, help="answer every Nth request with 503")
+    parser.add_argument('--retry-after', type=float, default=None, help="Retry-After seconds sent with 429s")
+    parser.add_argument('--batch-delay', type=float, default=0.5, help="seconds before a batch starts processing")
+    parser.add_argument('--batch-error-every', type=int, default=0, help="fail every Nth request inside a batch")
+    parser.add_argument('--token-latency', type=float, default=0.0, help="seconds between streamed tokens")
+    parser.add_argument('--stream-break-after', type=int, default=None, help="drop streams after N words")
+    parser.add_argument('--reply', default=None, help="text of every completion")
+    args = parser.parse_args()
+
+    server = FakeLLMServer(args.host, args.port, args.latency, args.rate_limit_every, args.error_every, args.retry_after,
+                           args.batch_delay, args.batch_error_every, args.token_latency, args.stream_break_after,
+                           args.reply)
+    print(f" Fake LLM server listening on {server.base_url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+from typing import Any, Dict, Optional, Union
+
+from analysis_engine import AnalysisEngine
+from transcript_analyzer import EducationalTranscriptAnalyzer
+
+
+class IncrementalAnalyzer:
+    """Analyzes a live session as its transcript arrives.
+
+    Text chunks (split anywhere, even mid-line) or whole turns are pushed
+    through one AnalysisEngine, so each new line costs the same no matter
+    how long the session already is. ``indicators()`` reads the running
+    counters in constant time; ``snapshot()`` returns exactly what
+    ``analyze_transcript`` would for all text received so far.
+    """
+
+    def __init__(self, analyzer: Optional[EducationalTranscriptAnalyzer] = None):
+        self.analyzer = analyzer or EducationalTranscriptAnalyzer(quiet=True)
+        self.engine = AnalysisEngine(self.analyzer)
+        self._partial = ''
+        self._closed = False
+
+    def feed(self, chunk: str):
+        """Add raw transcript text; an unfinished last line is held until its newline arrives."""
+        if self._closed:
+            raise ValueError("analyzer is closed")
+        lines = (self._partial + chunk).split('\n')
+        self._partial = lines.pop()
+        for line in lines:
+            self.engine.feed(line + '\n')
+
+    def add_turn(self, turn: Union[Dict[str, Any], str], speaker: str = None, content: str = ''):
+        """Add one turn, given as a {'timestamp', 'speaker', 'content'} dict or as arguments.
+
+        The turn is written as a ``timestamp - speaker`` header followed by its
+        content, exactly as it would appear in a transcript file.
+        """
+        if isinstance(turn, dict):
+            timestamp, speaker, content = turn['timestamp'], turn['speaker'], turn.get('content', '')
+        else:
+            timestamp = turn
+        if self._partial:
+            self.feed('\n')
+        self.feed(f'{timestamp} - {speaker}\n{content}\n')
+
+    def indicators(self) -> Dict[str, Any]:
+        """Live counters over completed turns, computed in constant time."""
+        engine = self.engine
+        learning = engine.learning_patterns
+        return {
+            'learning_indicators': dict(learning.learning_indicators),
+            'strategy_distribution': dict(engine.teaching_strategies.strategy_usage),
+            'total_student_responses': learning.responses,
+            'engagement_level': learning.engagement_level(),
+            'average_response_length': learning.average_response_length(),
+            'action_items_count': len(engine.action_items.items),
+            'turns_analyzed': len(engine.conversations)
+        }
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Full analysis of everything received so far, without ending the session."""
+        if self._closed:
+            return self._final
+        return self._finish(self.engine.copy())
+
+    def close(self) -> Dict[str, Any]:
+        """End the session and return its final analysis."""
+        if not self._closed:
+            self._final = self._finish(self.engine)
+            self._closed = True
+        return self._final
+
+    def _finish(self, engine: AnalysisEngine) -> Dict[str, Any]:
+        if self._partial:
+            engine.feed(self._partial)
+        return engine.close().result()
@@ -0,0 +1,133 @@
+import json
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List
+
+# hook(kind, name, value) with kind one of 'timing', 'counter', 'observation';
+# timings report wall seconds.
+Hook = Callable[[str, str, float], None]
+
+
+class Instrumentation:
+    """Stage timers, counters and observations shared by the analyzer and summary generator.
+
+    Hooks receive every measurement as it is recorded. ``silent=True``
+    suppresses all console progress output; measurements are still kept.
+    """
+
+    def __init__(self, silent: bool = False):
+        self.silent = silent
+        self.timings: Dict[str, Dict[str, float]] = {}
+        self.counters: Dict[str, float] = {}
+        self.observations: Dict[str, Dict[str, float]] = {}
+        self._hooks: List[Hook] = []
+        self._lock = threading.Lock()
+
+    def add_hook(self, hook: Hook) -> Hook:
+        self._hooks.append(hook)
+        return hook
+
+    def remove_hook(self, hook: Hook):
+        self._hooks.remove(hook)
+
+    def log(self, message: str):
+        if not self.silent:
+            print(message)
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Time the enclosed block as one run of stage ``name`` (wall and CPU seconds)."""
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            self.record_timing(name, time.perf_counter() - wall, time.process_time() - cpu)
+
+    def record_timing(self, name: str, wall_seconds: float, cpu_seconds: float):
+        with self._lock:
+            timing = self.timings.get(name)
+            if timing is None:
+                timing = self.timings[name] = {'count': 0, 'wall_seconds': 0.0, 'cpu_seconds': 0.0, 'wall_max_seconds': 0.0}
+            timing['count'] += 1
+            timing['wall_seconds'] += wall_seconds
+            timing['cpu_seconds'] += cpu_seconds
+            timing['wall_max_seconds'] = max(timing['wall_max_seconds'], wall_seconds)
+        self._emit('timing', name, wall_seconds)
+
+    def count(self, name: str, value: float = 1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+        self._emit('counter', name, value)
+
+    def observe(self, name: str, value: float):
+        """Record one sample of a distribution, such as an LLM call's latency."""
+        with self._lock:
+            observation = self.observations.get(name)
+            if observation is None:
+                observation = self.observations[name] = {'count': 0, 'sum': 0.0, 'max': value}
+            observation['count'] += 1
+            observation['sum'] += value
+            observation['max'] = max(observation['max'], value)
+        self._emit('observation', name, value)
+
+    def reset(self):
+        with self._lock:
+            self.timings.clear()
+            self.counters.clear()
+            self.observations.clear()
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'timings': {name: dict(timing) for name, timing in self.timings.items()},
+                'counters': dict(self.counters),
+                'observations': {name: dict(observation) for name, observation in self.observations.items()}
+            }
+
+    def to_json(self, **kwargs) -> str:
+        return json.dumps(self.to_dict(), **kwargs)
+
+    def to_prometheus(self, prefix: str = 'prime') -> str:
+        """Render all measurements in the Prometheus text exposition format."""
+        snapshot = self.to_dict()
+        lines = []
+
+        if snapshot['timings']:
+            for metric, key in (('stage_wall_seconds', 'wall_seconds'), ('stage_cpu_seconds', 'cpu_seconds')):
+                lines.append(f'# TYPE {prefix}_{metric} summary')
+                for stage, timing in sorted(snapshot['timings'].items()):
+                    label = f'{{stage="{_escape(stage)}"}}'
+                    lines.append(f'{prefix}_{metric}_sum{label} {timing[key]!r}')
+                    lines.append(f'{prefix}_{metric}_count{label} {timing["count"]}')
+            lines.append(f'# TYPE {prefix}_stage_wall_max_seconds gauge')
+            for stage, timing in sorted(snapshot['timings'].items()):
+                lines.append(f'{prefix}_stage_wall_max_seconds{{stage="{_escape(stage)}"}} {timing["wall_max_seconds"]!r}')
+
+        for name, value in sorted(snapshot['counters'].items()):
+            metric = f'{prefix}_{_metric_name(name)}_total'
+            lines.append(f'# TYPE {metric} counter')
+            lines.append(f'{metric} {value!r}')
+
+        for name, observation in sorted(snapshot['observations'].items()):
+            metric = f'{prefix}_{_metric_name(name)}'
+            lines.append(f'# TYPE {metric} summary')
+            lines.append(f'{metric}_sum {observation["sum"]!r}')
+            lines.append(f'{metric}_count {observation["count"]}')
+            lines.append(f'# TYPE {metric}_max gauge')
+            lines.append(f'{metric}_max {observation["max"]!r}')
+
+        return '\n'.join(lines) + '\n' if lines else ''
+
+    def _emit(self, kind: str, name: str, value: float):
+        for hook in self._hooks:
+            hook(kind, name, value)
+
+
+def _metric_name(name: str) -> str:
+    return re.sub(r'[^a-zA-Z0-9_]', '_', name)
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
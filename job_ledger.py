@@ -0,0 +1,136 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+QUEUED = 'queued'
+ANALYZED = 'analyzed'
+PROMPT_RENDERED = 'prompt_rendered'
+GENERATED = 'generated'
+WRITTEN = 'written'
+FAILED = 'failed'
+STATES = (QUEUED, ANALYZED, PROMPT_RENDERED, GENERATED, WRITTEN, FAILED)
+
+JOB_FIELDS = ('path', 'output', 'state', 'content_hash', 'attempts', 'error', 'prompt', 'summary', 'method', 'updated_at')
+
+
+class JobLedger:
+    """Durable per-transcript progress of a bulk summary run, in SQLite (WAL).
+
+    Each job moves through queued, analyzed, prompt_rendered, generated and
+    written, or ends up failed; the rendered prompt and the generated
+    summary are kept with the job so a restart continues from the furthest
+    stage instead of analyzing or paying for the API call again. Updates are
+    buffered and committed together every ``commit_every`` updates or
+    ``commit_interval`` seconds, whichever comes first, so a crash loses at
+    most one batch of progress.
+    """
+
+    def __init__(self, path: str, commit_every: int = 50, commit_interval: float = 5.0):
+        self.path = path
+        self.commit_every = commit_every
+        self.commit_interval = commit_interval
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._last_commit = time.monotonic()
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        # WAL with synchronous=NORMAL survives a killed process; only power loss can drop the last commits.
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS jobs (
+                path TEXT PRIMARY KEY,
+                output TEXT NOT NULL,
+                state TEXT NOT NULL,
+                content_hash TEXT,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                error TEXT,
+                prompt TEXT,
+                summary TEXT,
+                method TEXT,
+                updated_at REAL NOT NULL
+            )''')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state)')
+
+    def enqueue(self, jobs: Iterable[Tuple[str, str]]) -> int:
+        """Add (transcript path, output path) jobs; paths already in the ledger are left as they are."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute('BEGIN')
+            try:
+                added = self._conn.executemany(
+                    'INSERT OR IGNORE INTO jobs (path, output, state, updated_at) VALUES (?, ?, ?, ?)',
+                    ((path, output, QUEUED, now) for path, output in jobs)).rowcount
+                self._conn.execute('COMMIT')
+            except BaseException:
+                self._conn.execute('ROLLBACK')
+                raise
+        return added
+
+    def jobs(self, states: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+        self.flush()
+        sql = f"SELECT {', '.join(JOB_FIELDS)} FROM jobs"
+        params: List[str] = []
+        if states is not None:
+            params = list(states)
+            sql += f" WHERE state IN ({', '.join('?' for _ in params)})"
+        with self._lock:
+            return [dict(row) for row in self._conn.execute(sql + ' ORDER BY rowid', params)]
+
+    def outputs(self) -> List[str]:
+        with self._lock:
+            return [row[0] for row in self._conn.execute('SELECT output FROM jobs')]
+
+    def update(self, path: str, state: str, **fields):
+        """Record a job's new state (and prompt, summary, error, ...); committed with the next batch."""
+        if state not in STATES:
+            raise ValueError(f"unknown job state {state!r}")
+        with self._lock:
+            job = self._pending.setdefault(path, {})
+            job.update(fields, state=state, updated_at=time.time())
+            due = (len(self._pending) >= self.commit_every
+                   or time.monotonic() - self._last_commit >= self.commit_interval)
+        if due:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._last_commit = time.monotonic()
+            if not pending:
+                return
+            self._conn.execute('BEGIN')
+            try:
+                for path, fields in pending.items():
+                    columns = ', '.join(f'{name} = ?' for name in fields)
+                    self._conn.execute(f'UPDATE jobs SET {columns} WHERE path = ?', (*fields.values(), path))
+                self._conn.execute('COMMIT')
+            except BaseException:
+                self._conn.execute('ROLLBACK')
+                self._pending = {**pending, **self._pending}
+                raise
+
+    def counts(self) -> Dict[str, int]:
+        self.flush()
+        with self._lock:
+            rows = self._conn.execute('SELECT state, COUNT(*) FROM jobs GROUP BY state').fetchall()
+        counts = {state: 0 for state in STATES}
+        counts.update((state, count) for state, count in rows)
+        return counts
+
+    def close(self):
+        self.flush()
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self) -> 'JobLedger':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
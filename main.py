@@ -1,34 +1,61 @@
 #!/usr/bin/env python3
 
+import argparse
 import os
-from dotenv import load_dotenv
+import sys
 
 
-load_dotenv()
+# Nothing heavy is imported at module load: the analyzer, summary generator,
+# dotenv and openai are imported by the commands that need them, so short
+# cron/hook invocations only pay for what they run.
 
+# Mirrors turn_index.DEFAULT_INDEX_PATH, which would import the analyzer at startup.
+DEFAULT_INDEX_PATH = os.path.join('.cache', 'turns.sqlite3')
+# Mirrors near_duplicates.DEFAULT_DEDUP_PATH and DEFAULT_SIMILARITY.
+DEFAULT_DEDUP_PATH = os.path.join('.cache', 'near_duplicates.sqlite3')
+DEFAULT_SIMILARITY = 0.9
 
-api_key = os.getenv('OPENAI_API_KEY')
-print(f" DEBUG INFO:")
-print(f"   API Key found: {bool(api_key)}")
-print(f"   API Key length: {len(api_key) if api_key else 0}")
-print(f"   Starts with sk-proj: {api_key.startswith('sk-proj') if api_key else False}")
-print()
 
+def load_env():
+    
+    from dotenv import load_dotenv
+    
+    load_dotenv()
+
+
+def near_duplicate_index(args: argparse.Namespace):
+    
+    if not args.dedup:
+        return None
+    
+    from near_duplicates import NearDuplicateIndex
+    
+    return NearDuplicateIndex(args.dedup_index, threshold=args.similarity)
 
-try:
-    import openai
-    print(" OpenAI package imported successfully")
-    print(f"   OpenAI version: {openai.__version__}")
-except ImportError as e:
-    print(f" OpenAI import failed: {e}")
-except Exception as e:
-    print(f" OpenAI import issue: {e}")
-print()
 
-from summary_generator import EducationalSummaryGenerator
+def print_debug_info():
+    
+    api_key = os.getenv('OPENAI_API_KEY')
+    print(f" DEBUG INFO:")
+    print(f"   API Key found: {bool(api_key)}")
+    print(f"   API Key length: {len(api_key) if api_key else 0}")
+    print(f"   Starts with sk-proj: {api_key.startswith('sk-proj') if api_key else False}")
+    print()
+    
+    # Read the version from package metadata rather than importing openai.
+    from importlib import metadata
+    
+    try:
+        print(f" OpenAI package installed - version {metadata.version('openai')}")
+    except metadata.PackageNotFoundError:
+        print(" OpenAI package not installed")
+    print()
+
 
 def main():
     
+    load_env()
+    print_debug_info()
     
     print(" PRIME ACADEMICS INTERNSHIP APPLICATION")
     print("OPTION B: Prompt Engineering + Summary Generation")
@@ -50,31 +77,39 @@ def main():
             break
     
     if not transcript_file:
-        print(" No transcript file found - using sample data")
+        print(" No transcript file found")
         print(" To use your own transcript, save it as 'tutoring_transcript.txt'")
+        return
     
     print()
     
     
     try:
+        from summary_generator import EducationalSummaryGenerator
+        
         generator = EducationalSummaryGenerator()
         result = generator.generate_summary(transcript_file)
         
         if result:
+            summary_file = f"parent_email_summary_{result['timestamp']}.txt"
+            explanation_file = f"prompt_engineering_explanation_{result['timestamp']}.txt"
+            write_text(summary_file, result['summary_content'])
+            write_text(explanation_file, result['prompt_engineering_explanation'])
+            
             print("\n OPTION B SUBMISSION READY!")
             print("\n GENERATED PARENT SUMMARY:")
             print("-" * 50)
-            print(result['parent_summary'][:500] + "...")
+            print(result['summary_content'][:500] + "...")
             print("\n[Full summary saved to file]")
             
             print("\n PROMPT DESIGN EXPLANATION:")
             print("-" * 50)
-            print(result['prompt_design_explanation'][:300] + "...")
+            print(result['prompt_engineering_explanation'][:300] + "...")
             print("\n[Full explanation saved to file]")
             
             print("\n FILES FOR PRIME ACADEMICS APPLICATION:")
-            print("   1. parent_email_summary_[timestamp].txt - ATTACH THIS")
-            print("   2. prompt_engineering_explanation_[timestamp].txt - ATTACH THIS")
+            print(f"   1. {summary_file} - ATTACH THIS")
+            print(f"   2. {explanation_file} - ATTACH THIS")
             
             print("\n OPTION B COMPLETE! Ready for submission! 🎓")
         else:
@@ -85,5 +120,460 @@ def main():
         print(" Make sure you have the required packages installed:")
         print("   pip install openai python-dotenv")
 
+def write_text(path: str, text: str):
+    
+    with open(path, 'w', encoding='utf-8') as handle:
+        handle.write(text)
+
+
+def analyze_command(args: argparse.Namespace):
+    
+    import json
+    
+    from instrumentation import Instrumentation
+    from transcript_analyzer import EducationalTranscriptAnalyzer
+    from turn_table import json_default
+    
+    # JSON on stdout must not be mixed with progress output.
+    quiet = args.quiet or args.output == '-'
+    analyzer = EducationalTranscriptAnalyzer(instrumentation=Instrumentation(silent=quiet))
+    result = analyzer.analyze_file(args.transcript)
+    
+    if args.output == '-':
+        json.dump(result, sys.stdout, indent=2, default=json_default)
+        print()
+    elif args.output:
+        with open(args.output, 'w', encoding='utf-8') as handle:
+            json.dump(result, handle, indent=2, default=json_default)
+        if not quiet:
+            print(f"    Analysis written to: {args.output}")
+
+
+def summarize_command(args: argparse.Namespace) -> int:
+    
+    from instrumentation import Instrumentation
+    
+    if args.ai:
+        load_env()
+    
+    from summary_generator import EducationalSummaryGenerator
+    
+    generator = EducationalSummaryGenerator(instrumentation=Instrumentation(silent=args.quiet or args.output is None),
+                                            use_ai=args.ai, prompt_token_budget=args.prompt_budget,
+                                            near_duplicates=near_duplicate_index(args))
+    if args.ai and not generator.use_ai:
+        print(" Error: --ai needs the openai package and OPENAI_API_KEY", file=sys.stderr)
+        return 1
+    
+    if args.stream:
+        # Deltas go straight to stdout or the output file as they arrive.
+        stream = generator.stream_summary(args.transcript, sink=args.output or sys.stdout)
+        for _ in stream:
+            pass
+        result = stream.result
+        if args.output is None:
+            print()
+        elif not args.quiet:
+            print(f"    Summary written to: {args.output} ({result['method']}, first token after {stream.time_to_first_token:.2f}s)")
+        return 0
+    
+    result = generator.generate_summary(args.transcript, deadline=args.deadline, hedge_after=args.hedge_after)
+    if args.output is None:
+        print(result['summary_content'], flush=True)
+    else:
+        write_text(args.output, result['summary_content'])
+        if not args.quiet:
+            print(f"    Summary written to: {args.output} ({result['method']})", flush=True)
+            if 'near_duplicate' in result:
+                duplicate = result['near_duplicate']
+                print(f"    Near-duplicate of: {duplicate['path']} (similarity {duplicate['similarity']:.2f})", flush=True)
+    # A request that missed the deadline finishes here and fills the response cache.
+    generator.close()
+    return 0
+
+
+def batch_command(args: argparse.Namespace) -> int:
+    
+    load_env()
+    
+    from batch_summarizer import BatchSummarizer
+    from corpus_analyzer import JsonlSink
+    from summary_generator import EducationalSummaryGenerator
+    
+    generator = EducationalSummaryGenerator(use_ai=True, prompt_token_budget=args.prompt_budget)
+    runner = BatchSummarizer(generator, poll_interval=args.poll_interval)
+    if not runner.generator.use_ai:
+        print(" Error: batch mode needs the openai package and OPENAI_API_KEY", file=sys.stderr)
+        return 1
+    
+    if args.resume:
+        manifest = runner.load_manifest(args.resume)
+    elif args.paths:
+        manifest = runner.prepare(args.paths, args.dir, args.pattern)
+    else:
+        print(" Error: give transcript paths or --resume DIR", file=sys.stderr)
+        return 2
+    
+    runner.submit(manifest)
+    if args.no_wait:
+        print(f" Batches submitted - collect later with: main.py batch --resume {manifest['directory']}")
+        return 0
+    runner.wait(manifest)
+    
+    counts = {}
+    with JsonlSink(args.output) as sink:
+        for record in runner.collect(manifest):
+            sink.write(record)
+            counts[record['method']] = counts.get(record['method'], 0) + 1
+    
+    print(f" Batch complete - {', '.join(f'{count} {method}' for method, count in counts.items()) or 'no transcripts'}")
+    print(f"    Results written to: {args.output}")
+    return 0
+
+
+def bulk_command(args: argparse.Namespace) -> int:
+    
+    load_env()
+    
+    from bulk_summarizer import LEDGER_NAME, BulkSummarizer
+    from job_ledger import JobLedger
+    from summary_generator import EducationalSummaryGenerator
+    
+    ledger_path = args.ledger or os.path.join(args.output, LEDGER_NAME)
+    if os.path.exists(ledger_path) and not args.resume:
+        print(f" Error: {ledger_path} already records a run; pass --resume to continue it", file=sys.stderr)
+        return 2
+    if not args.paths and not args.resume:
+        print(" Error: give transcript paths or --resume", file=sys.stderr)
+        return 2
+    
+    generator = EducationalSummaryGenerator(max_concurrency=args.max_concurrency, use_ai=args.ai,
+                                            prompt_token_budget=args.prompt_budget,
+                                            near_duplicates=near_duplicate_index(args))
+    if args.ai and not generator.use_ai:
+        print(" Error: --ai needs the openai package and OPENAI_API_KEY", file=sys.stderr)
+        return 1
+    
+    ledger = JobLedger(ledger_path, commit_every=args.commit_every)
+    runner = BulkSummarizer(args.output, generator, ledger, max_attempts=args.max_attempts)
+    if args.paths:
+        print(f" Queued {runner.add(args.paths, args.pattern)} new transcripts")
+    counts = runner.run()
+    runner.close()
+    
+    print(f" Bulk run - {counts['written']} written, {counts['failed']} failed, "
+          f"{sum(counts.values()) - counts['written'] - counts['failed']} unfinished")
+    print(f"    Summaries in: {args.output} (ledger: {ledger_path})")
+    if counts['failed']:
+        print(f"    Retry failed transcripts with: main.py bulk --resume -o {args.output}")
+    return 0 if counts['written'] == sum(counts.values()) else 1
+
+
+def analyze_corpus_command(args: argparse.Namespace):
+    
+    from corpus_analyzer import analyze_corpus
+    
+    print(f" Analyzing corpus with {args.workers or os.cpu_count()} workers...")
+    
+    analyzed = 0
+    failed = 0
+    for record in analyze_corpus(args.paths, workers=args.workers, chunksize=args.chunksize,
+                                 ordered=not args.unordered, sink=args.output, pattern=args.pattern,
+                                 cache_path=args.cache):
+        if 'error' in record:
+            failed += 1
+            print(f" Failed: {record['path']} - {record['error']}")
+        else:
+            analyzed += 1
+    
+    print(f" Corpus complete - {analyzed} transcripts analyzed, {failed} failed")
+    print(f"    Results written to: {args.output}")
+
+
+def index_command(args: argparse.Namespace):
+    
+    from turn_index import TurnIndex
+    
+    index = TurnIndex(args.db)
+    counts = index.add_corpus(args.paths, pattern=args.pattern, workers=args.workers)
+    info = index.info()
+    print(f" Indexed {counts['added']} new and {counts['updated']} changed transcripts "
+          f"({counts['unchanged']} unchanged, {counts['failed']} failed)")
+    print(f"    {info['sessions']} sessions, {info['turns']} turns in {args.db}")
+    index.close()
+
+
+def search_command(args: argparse.Namespace) -> int:
+    
+    import json
+    import sqlite3
+    
+    from turn_index import TurnIndex
+    
+    index = TurnIndex(args.db)
+    try:
+        hits = index.search(phrase=args.phrase, speaker=args.speaker, category=args.category,
+                            date_from=args.since, date_to=args.until, match=args.match, limit=args.limit)
+    except sqlite3.OperationalError as e:
+        # The other filters are quoted; only a raw --match query can be malformed.
+        if args.match is None:
+            raise
+        print(f" Error: invalid --match query {args.match!r}: {e}", file=sys.stderr)
+        return 2
+    finally:
+        index.close()
+    if args.json:
+        for hit in hits:
+            print(json.dumps(hit, ensure_ascii=False))
+        return 0
+    for hit in hits:
+        tags = ', '.join(hit['moments'] + hit['strategies'] + hit['markers'])
+        print(f"{hit['session_date']} {hit['path']} {hit['timestamp']} {hit['speaker']}"
+              f"{f' [{tags}]' if tags else ''}: {hit['content']}")
+    print(f" {len(hits)} turns")
+    return 0
+
+
+def trends_command(args: argparse.Namespace) -> int:
+    
+    import json
+    import time
+    
+    from trends import NUMPY_AVAILABLE, SessionFeatures
+    
+    if not NUMPY_AVAILABLE:
+        print(" Error: trend analytics need numpy (pip install numpy)", file=sys.stderr)
+        return 1
+    if args.window < 1:
+        print(" Error: --window must be at least 1", file=sys.stderr)
+        return 2
+    if args.load:
+        features = SessionFeatures.load(args.load)
+    elif args.paths:
+        features = SessionFeatures.from_corpus(args.paths, pattern=args.pattern, workers=args.workers,
+                                               cache_path=args.cache)
+    else:
+        print(" Error: give transcripts, corpus JSONL files or --load DIR", file=sys.stderr)
+        return 2
+    if args.save:
+        features.save(args.save)
+    
+    started = time.perf_counter()
+    report = features.report(args.window)
+    elapsed = time.perf_counter() - started
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return 0
+    
+    for student, trend in report.items():
+        mean, ratio = trend['rolling_mean'], trend['confusion_ratio']
+        ratios = ' -> '.join('n/a' if value is None else f'{value:.2f}' for value in (ratio['first'], ratio['latest']))
+        print(f"{student}: {trend['sessions']} sessions {trend['first_date']}..{trend['last_date']}, "
+              f"last {args.window}: understanding {mean['understanding_moments']:.1f}, "
+              f"confusion {mean['confusion_moments']:.1f}, response length {mean['average_response_length']:.1f} "
+              f"(z {trend['latest_zscore']['average_response_length']:+.1f}), confusion/understanding {ratios}")
+    print(f" Trends for {len(report)} students over {len(features.sessions)} sessions in {elapsed * 1000:.0f} ms")
+    if args.save:
+        print(f"    Features saved to: {args.save}")
+    return 0
+
+
+def patterns_command(args: argparse.Namespace) -> int:
+    
+    from pattern_registry import load_registry, registry_path, snapshot_path
+    
+    # Loading validates the registry and writes its compiled snapshot if it has none yet.
+    path = args.registry or registry_path()
+    try:
+        registry = load_registry(path)
+    except (OSError, ValueError) as e:
+        print(f" Error: {e}", file=sys.stderr)
+        return 1
+    
+    groups = len(registry.educational_patterns) + len(registry.stage_phrases)
+    print(f" Pattern registry: {path}")
+    print(f"    Version: {registry.version[:16]}")
+    print(f"    Phrases: {registry.phrase_count} in {groups} groups")
+    print(f"    Snapshot: {snapshot_path(path)}")
+    return 0
+
+
+def serve_command(args: argparse.Namespace) -> int:
+    
+    import asyncio
+    
+    from instrumentation import Instrumentation
+    
+    if args.ai:
+        load_env()
+    
+    from response_cache import DEFAULT_CACHE_PATH
+    from summary_generator import EducationalSummaryGenerator
+    from summary_service import SummaryService
+    
+    # Per-request progress output would swamp the console under load; /metrics has the numbers.
+    generator = EducationalSummaryGenerator(max_concurrency=args.max_concurrency,
+                                            requests_per_minute=args.requests_per_minute or None,
+                                            tokens_per_minute=args.tokens_per_minute or None,
+                                            cache_path=None if args.no_response_cache else DEFAULT_CACHE_PATH,
+                                            instrumentation=Instrumentation(silent=not args.verbose),
+                                            use_ai=args.ai, prompt_token_budget=args.prompt_budget)
+    if args.ai and not generator.use_ai:
+        print(" Error: --ai needs the openai package and OPENAI_API_KEY", file=sys.stderr)
+        return 1
+    
+    async def run():
+        service = await SummaryService(args.host, args.port, workers=args.workers, queue_size=args.queue_size,
+                                       generator=generator, cache_path=args.cache).start()
+        mode = 'OpenAI' if generator.use_ai else 'template'
+        print(f" Serving on {service.url} ({service.workers} analysis workers, {mode} summaries)", flush=True)
+        await service.serve_forever()
+    
+    asyncio.run(run())
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    
+    parser = argparse.ArgumentParser(description="Prime Academics transcript analysis and summary generation")
+    subparsers = parser.add_subparsers(dest='command')
+    
+    analyze = subparsers.add_parser('analyze', help="analyze one transcript without generating a summary")
+    analyze.add_argument('transcript', help="transcript file")
+    analyze.add_argument('-o', '--output', default=None, help="write the analysis as JSON to this file ('-' for stdout)")
+    analyze.add_argument('-q', '--quiet', action='store_true', help="no progress output")
+    analyze.set_defaults(handler=analyze_command)
+    
+    summarize = subparsers.add_parser('summarize', help="write a parent summary for one transcript")
+    summarize.add_argument('transcript', help="transcript file")
+    mode = summarize.add_mutually_exclusive_group()
+    mode.add_argument('--template', action='store_true', help="template summary; never imports or calls openai (default)")
+    mode.add_argument('--ai', action='store_true', help="generate the summary with the OpenAI API")
+    summarize.add_argument('-o', '--output', default=None, help="write the summary to this file instead of stdout")
+    summarize.add_argument('--stream', action='store_true', help="write the summary as it is generated")
+    summarize.add_argument('--deadline', type=float, default=None, metavar='SECONDS',
+                           help="return the template summary if the model has not answered in time")
+    summarize.add_argument('--hedge-after', type=float, default=None, metavar='SECONDS',
+                           help="send a duplicate request if the first is still unanswered after this long")
+    summarize.add_argument('--prompt-budget', type=int, default=None, metavar='TOKENS',
+                           help="input tokens per request (default 1000); lower-priority evidence is dropped to fit")
+    summarize.add_argument('-q', '--quiet', action='store_true', help="no progress output")
+    summarize.add_argument('--dedup', action='store_true',
+                           help="reuse the analyses and AI summaries of near-duplicates of transcripts summarized before")
+    summarize.add_argument('--dedup-index', default=DEFAULT_DEDUP_PATH, metavar='PATH',
+                           help="near-duplicate signature index used with --dedup")
+    summarize.add_argument('--similarity', type=float, default=DEFAULT_SIMILARITY,
+                           help="estimated similarity (0-1) at which a transcript counts as a near-duplicate")
+    summarize.set_defaults(handler=summarize_command)
+    
+    batch = subparsers.add_parser('batch', help="summarize many transcripts through the OpenAI Batch API")
+    batch.add_argument('paths', nargs='*', help="transcript files or directories to search")
+    batch.add_argument('-o', '--output', default='batch_summaries.jsonl', help="JSONL file for summaries")
+    batch.add_argument('--dir', default=None, help="directory for request files and the manifest (default: .cache/batches/<timestamp>)")
+    batch.add_argument('--resume', default=None, metavar='DIR', help="continue the batch run recorded in DIR")
+    batch.add_argument('--no-wait', action='store_true', help="submit and exit; collect later with --resume")
+    batch.add_argument('--poll-interval', type=float, default=30.0, help="seconds between batch status checks")
+    batch.add_argument('--pattern', default='*.txt', help="filename pattern used inside directories")
+    batch.add_argument('--prompt-budget', type=int, default=None, metavar='TOKENS',
+                       help="input tokens per request (default 1000); lower-priority evidence is dropped to fit")
+    batch.set_defaults(handler=batch_command)
+    
+    bulk = subparsers.add_parser('bulk', help="write one summary file per transcript, resumable after a crash")
+    bulk.add_argument('paths', nargs='*', help="transcript files or directories to search")
+    bulk.add_argument('-o', '--output', default='summaries', help="directory for the summaries and the job ledger")
+    bulk.add_argument('--resume', action='store_true',
+                      help="continue the run recorded in the ledger: skip written summaries, retry failed ones")
+    bulk.add_argument('--ledger', default=None, metavar='PATH', help="job ledger (default: OUTPUT/ledger.sqlite3)")
+    bulk.add_argument('--ai', action='store_true', help="generate the summaries with the OpenAI API (default: template)")
+    bulk.add_argument('--max-concurrency', type=int, default=8, help="transcripts in progress at once")
+    bulk.add_argument('--max-attempts', type=int, default=3, help="runs in which a failing transcript is tried")
+    bulk.add_argument('--commit-every', type=int, default=50, help="ledger updates committed together")
+    bulk.add_argument('--pattern', default='*.txt', help="filename pattern used inside directories")
+    bulk.add_argument('--prompt-budget', type=int, default=None, metavar='TOKENS',
+                      help="input tokens per request (default 1000); lower-priority evidence is dropped to fit")
+    bulk.add_argument('--dedup', action='store_true',
+                      help="reuse the analyses and AI summaries of near-duplicates of transcripts summarized before")
+    bulk.add_argument('--dedup-index', default=DEFAULT_DEDUP_PATH, metavar='PATH',
+                      help="near-duplicate signature index used with --dedup")
+    bulk.add_argument('--similarity', type=float, default=DEFAULT_SIMILARITY,
+                      help="estimated similarity (0-1) at which a transcript counts as a near-duplicate")
+    bulk.set_defaults(handler=bulk_command)
+    
+    corpus = subparsers.add_parser('corpus', help="analyze many transcripts in parallel into a JSONL file")
+    corpus.add_argument('paths', nargs='+', help="transcript files or directories to search")
+    corpus.add_argument('-o', '--output', default='corpus_analysis.jsonl', help="JSONL file for results")
+    corpus.add_argument('-w', '--workers', type=int, default=None, help="worker processes (default: all cores)")
+    corpus.add_argument('--chunksize', type=int, default=None, help="transcripts handed to a worker at a time")
+    corpus.add_argument('--unordered', action='store_true', help="write results as they complete instead of in input order")
+    corpus.add_argument('--pattern', default='*.txt', help="filename pattern used inside directories")
+    corpus.add_argument('--cache', default=None, metavar='PATH', help="reuse analyses from this SQLite cache")
+    corpus.set_defaults(handler=analyze_corpus_command)
+    
+    index = subparsers.add_parser('index', help="add new or changed transcripts to the full-text turn index")
+    index.add_argument('paths', nargs='+', help="transcript files or directories to search")
+    index.add_argument('--db', default=DEFAULT_INDEX_PATH, help=f"index database (default: {DEFAULT_INDEX_PATH})")
+    index.add_argument('--pattern', default='*.txt', help="filename pattern used inside directories")
+    index.add_argument('-w', '--workers', type=int, default=None, help="worker processes (default: all cores)")
+    index.set_defaults(handler=index_command)
+    
+    search = subparsers.add_parser('search', help="find turns in the index")
+    search.add_argument('phrase', nargs='?', default=None, help="phrase to find in turn text")
+    search.add_argument('--speaker', default=None, help="student or tutor")
+    search.add_argument('--category', default=None,
+                        help="moment type (confusion, understanding, ...), teaching strategy or educational marker")
+    search.add_argument('--since', default=None, metavar='YYYY-MM-DD', help="sessions on or after this date")
+    search.add_argument('--until', default=None, metavar='YYYY-MM-DD', help="sessions on or before this date")
+    search.add_argument('--match', default=None, help="raw FTS5 query, combined with the other filters")
+    search.add_argument('--limit', type=int, default=50)
+    search.add_argument('--db', default=DEFAULT_INDEX_PATH, help=f"index database (default: {DEFAULT_INDEX_PATH})")
+    search.add_argument('--json', action='store_true', help="one JSON object per turn")
+    search.set_defaults(handler=search_command)
+    
+    trends = subparsers.add_parser('trends', help="per-student trends across sessions (needs numpy)")
+    trends.add_argument('paths', nargs='*',
+                        help="transcripts or directories (one directory per student), or JSONL from the corpus command")
+    trends.add_argument('--load', default=None, metavar='DIR', help="use the feature matrix saved in DIR")
+    trends.add_argument('--save', default=None, metavar='DIR', help="save the feature matrix to DIR as .npy")
+    trends.add_argument('--window', type=int, default=3, help="sessions in each rolling mean")
+    trends.add_argument('--json', action='store_true', help="print the report as JSON")
+    trends.add_argument('--pattern', default='*.txt', help="filename pattern used inside directories")
+    trends.add_argument('-w', '--workers', type=int, default=None, help="worker processes (default: all cores)")
+    trends.add_argument('--cache', default=None, metavar='PATH', help="reuse analyses from this SQLite cache")
+    trends.set_defaults(handler=trends_command)
+    
+    patterns = subparsers.add_parser('patterns', help="check the pattern registry and compile its snapshot")
+    patterns.add_argument('registry', nargs='?', default=None,
+                          help="registry file (default: $PATTERN_REGISTRY or patterns.json)")
+    patterns.set_defaults(handler=patterns_command)
+    
+    serve = subparsers.add_parser('serve', help="run the HTTP service with /analyze and /summarize endpoints")
+    serve.add_argument('--host', default='127.0.0.1')
+    serve.add_argument('--port', type=int, default=8080, help="0 picks a free port")
+    serve.add_argument('-w', '--workers', type=int, default=None, help="analysis worker processes (default: all cores)")
+    serve.add_argument('--queue-size', type=int, default=64,
+                       help="requests that may wait per endpoint beyond those running; more get 429")
+    serve.add_argument('--max-concurrency', type=int, default=8, help="OpenAI requests in flight at once")
+    serve.add_argument('--requests-per-minute', type=int, default=3500, help="OpenAI request rate limit (0: none)")
+    serve.add_argument('--tokens-per-minute', type=int, default=90000, help="OpenAI token rate limit (0: none)")
+    serve.add_argument('--ai', action='store_true', help="generate summaries with the OpenAI API (default: template)")
+    serve.add_argument('--prompt-budget', type=int, default=None, metavar='TOKENS',
+                       help="input tokens per request (default 1000); lower-priority evidence is dropped to fit")
+    serve.add_argument('--cache', default=None, metavar='PATH', help="reuse analyses from this SQLite cache")
+    serve.add_argument('--no-response-cache', action='store_true', help="always call the API, even for a repeated prompt")
+    serve.add_argument('-v', '--verbose', action='store_true', help="per-request progress output")
+    serve.set_defaults(handler=serve_command)
+    
+    return parser
+
+
+def cli(argv=None):
+    
+    args = build_parser().parse_args(argv)
+    if args.command is None:
+        main()
+        return 0
+    return args.handler(args) or 0
+
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(cli(sys.argv[1:]))
\ No newline at end of file
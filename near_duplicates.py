@@ -0,0 +1,251 @@
+import hashlib
+import importlib.util
+import io
+import json
+import os
+import random
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from array import array
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from turn_parser import iter_turns
+from turn_table import json_default
+
+# numpy is optional: it only makes signatures faster, the values are identical without it.
+NUMPY_AVAILABLE = importlib.util.find_spec('numpy') is not None
+
+DEFAULT_DEDUP_PATH = os.path.join('.cache', 'near_duplicates.sqlite3')
+DEFAULT_SIMILARITY = 0.9
+NUM_PERM = 128
+BANDS = 16
+SHINGLE_WORDS = 5
+_SEED = 20240917
+_MASK64 = (1 << 64) - 1
+_WORD = re.compile(r"[a-z0-9']+")
+
+
+def turn_tokens(text: str) -> List[str]:
+    """Normalized words of every turn, each turn led by a speaker token.
+
+    Timestamps, case and punctuation are dropped, so a re-export with
+    shifted times or tidied punctuation yields the same tokens.
+    """
+    tokens = []
+    for turn in iter_turns(io.StringIO(text)):
+        tokens.append(f"<{turn['speaker']}>")
+        tokens.extend(_WORD.findall(turn['content'].lower()))
+    return tokens
+
+
+def shingles(tokens: Sequence[str], size: int = SHINGLE_WORDS) -> List[int]:
+    """32-bit hashes of the distinct ``size``-word windows over the tokens."""
+    if not tokens:
+        return []
+    size = min(size, len(tokens))
+    return list({zlib.crc32(' '.join(tokens[i:i + size]).encode('utf-8')) for i in range(len(tokens) - size + 1)})
+
+
+class MinHasher:
+    """MinHash signatures with multiply-shift permutations of 32-bit shingle hashes.
+
+    Permutation i maps x to the top 32 bits of ``(a_i * x + b_i) mod 2**64``,
+    which numpy's wrapping uint64 arithmetic computes directly; the pure
+    Python path masks to the same values, so signatures stored by one can
+    be compared with signatures made by the other.
+    """
+
+    def __init__(self, num_perm: int = NUM_PERM, seed: int = _SEED):
+        rng = random.Random(seed)
+        self.num_perm = num_perm
+        self.a = [rng.getrandbits(64) | 1 for _ in range(num_perm)]
+        self.b = [rng.getrandbits(64) for _ in range(num_perm)]
+
+    def signature(self, hashes: Sequence[int]) -> array:
+        if not hashes:
+            return array('I', [0xFFFFFFFF] * self.num_perm)
+        if NUMPY_AVAILABLE:
+            import numpy as np
+            values = np.fromiter(hashes, dtype=np.uint64, count=len(hashes))
+            a = np.array(self.a, dtype=np.uint64)[:, None]
+            b = np.array(self.b, dtype=np.uint64)[:, None]
+            mins = ((a * values + b) >> np.uint64(32)).min(axis=1)
+            return array('I', mins.tolist())
+        return array('I', (min(((a * x + b) & _MASK64) >> 32 for x in hashes) for a, b in zip(self.a, self.b)))
+
+
+def similarity(first: Sequence[int], second: Sequence[int]) -> float:
+    """Estimated Jaccard similarity: the share of signature positions that agree."""
+    return sum(1 for x, y in zip(first, second) if x == y) / len(first)
+
+
+class NearDuplicateIndex:
+    """Persistent MinHash/LSH index of transcripts, their analyses and summaries (SQLite, WAL).
+
+    Each transcript's signature is split into ``bands`` bands; transcripts
+    sharing any band bucket are candidates, and a candidate whose estimated
+    similarity reaches ``threshold`` is a near-duplicate. With 16 bands of
+    8 rows a pair at 0.9 similarity is a candidate with probability 0.9999
+    and a pair at 0.5 only about 6% of the time, so few signatures are
+    compared. A transcript that is a re-export, a trimmed copy or a lightly
+    edited version of one already indexed gets that one's analysis and
+    summary back instead of being analyzed and summarized again.
+
+    Stored analyses are tagged with the analyzer version and patterns that
+    produced them; a lookup only matches entries made with the same.
+    """
+
+    def __init__(self, path: str = DEFAULT_DEDUP_PATH, threshold: float = DEFAULT_SIMILARITY,
+                 num_perm: int = NUM_PERM, bands: int = BANDS):
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be a multiple of bands ({bands})")
+        self.path = path
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.hasher = MinHasher(num_perm)
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS settings (
+                name TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            )''')
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS transcripts (
+                id INTEGER PRIMARY KEY,
+                path TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                analysis_version TEXT NOT NULL,
+                signature BLOB NOT NULL,
+                analysis BLOB,
+                summary TEXT,
+                method TEXT,
+                indexed_at REAL NOT NULL,
+                UNIQUE (content_hash, analysis_version)
+            )''')
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS buckets (
+                band INTEGER NOT NULL,
+                bucket INTEGER NOT NULL,
+                transcript_id INTEGER NOT NULL
+            )''')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS buckets_lookup ON buckets (band, bucket)')
+        self._check_settings({'num_perm': str(num_perm), 'bands': str(bands), 'shingle_words': str(SHINGLE_WORDS)})
+
+    def signature(self, text: str) -> array:
+        return self.hasher.signature(shingles(turn_tokens(text)))
+
+    def find(self, signature: Sequence[int], content_hash: str, analysis_version: str) -> Optional[Dict[str, Any]]:
+        """The most similar indexed transcript at or above the threshold, or None.
+
+        The match has ``path``, ``content_hash``, ``similarity``, ``analysis``
+        (a dict or None), ``summary`` and ``method``; an identical transcript
+        has similarity 1.0.
+        """
+        with self._lock:
+            row = self._conn.execute('SELECT * FROM transcripts WHERE content_hash = ? AND analysis_version = ?',
+                                     (content_hash, analysis_version)).fetchone()
+            if row is not None:
+                return self._match(row, 1.0)
+            candidates = set()
+            for band, bucket in enumerate(self._buckets(signature)):
+                candidates.update(found for found, in self._conn.execute(
+                    'SELECT transcript_id FROM buckets WHERE band = ? AND bucket = ?', (band, bucket)))
+            best, best_similarity = None, self.threshold
+            for transcript_id in candidates:
+                row = self._conn.execute('SELECT signature FROM transcripts WHERE id = ? AND analysis_version = ?',
+                                         (transcript_id, analysis_version)).fetchone()
+                if row is None:
+                    continue
+                score = similarity(signature, _unpack(row['signature']))
+                if score >= best_similarity:
+                    best, best_similarity = transcript_id, score
+            if best is None:
+                return None
+            row = self._conn.execute('SELECT * FROM transcripts WHERE id = ?', (best,)).fetchone()
+            return self._match(row, best_similarity)
+
+    def add(self, path: str, signature: Sequence[int], content_hash: str, analysis_version: str,
+            analysis: Optional[Dict[str, Any]] = None, summary: Optional[str] = None,
+            method: Optional[str] = None):
+        """Index a transcript with its analysis and summary; an existing entry for the same content is replaced."""
+        packed = None
+        if analysis is not None:
+            packed = zlib.compress(json.dumps(analysis, ensure_ascii=False, default=json_default).encode('utf-8'))
+        with self._lock:
+            self._conn.execute('BEGIN')
+            try:
+                old = self._conn.execute('SELECT id FROM transcripts WHERE content_hash = ? AND analysis_version = ?',
+                                         (content_hash, analysis_version)).fetchone()
+                if old is not None:
+                    self._conn.execute('DELETE FROM buckets WHERE transcript_id = ?', (old['id'],))
+                    self._conn.execute('DELETE FROM transcripts WHERE id = ?', (old['id'],))
+                transcript_id = self._conn.execute(
+                    'INSERT INTO transcripts (path, content_hash, analysis_version, signature, analysis, summary, '
+                    'method, indexed_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                    (path, content_hash, analysis_version, array('I', signature).tobytes(), packed, summary, method,
+                     time.time())).lastrowid
+                self._conn.executemany('INSERT INTO buckets (band, bucket, transcript_id) VALUES (?, ?, ?)',
+                                       ((band, bucket, transcript_id)
+                                        for band, bucket in enumerate(self._buckets(signature))))
+                self._conn.execute('COMMIT')
+            except BaseException:
+                self._conn.execute('ROLLBACK')
+                raise
+
+    def set_summary(self, content_hash: str, analysis_version: str, summary: str, method: str):
+        with self._lock:
+            self._conn.execute('UPDATE transcripts SET summary = ?, method = ? WHERE content_hash = ? AND analysis_version = ?',
+                               (summary, method, content_hash, analysis_version))
+
+    def info(self) -> Dict[str, Any]:
+        with self._lock:
+            transcripts, summaries = self._conn.execute('SELECT COUNT(*), COUNT(summary) FROM transcripts').fetchone()
+        return {'path': self.path, 'transcripts': transcripts, 'summaries': summaries,
+                'threshold': self.threshold, 'bands': self.bands, 'rows': self.rows}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _buckets(self, signature: Sequence[int]) -> Iterable[int]:
+        packed = array('I', signature).tobytes()
+        width = len(packed) // self.bands
+        for band in range(self.bands):
+            digest = hashlib.blake2b(packed[band * width:(band + 1) * width], digest_size=8).digest()
+            yield int.from_bytes(digest, 'big', signed=True)
+
+    def _match(self, row: sqlite3.Row, score: float) -> Dict[str, Any]:
+        analysis = json.loads(zlib.decompress(row['analysis'])) if row['analysis'] is not None else None
+        return {'path': row['path'], 'content_hash': row['content_hash'], 'similarity': score,
+                'analysis': analysis, 'summary': row['summary'], 'method': row['method']}
+
+    def _check_settings(self, settings: Dict[str, str]):
+        # Signatures made with other settings cannot be compared; an index keeps the settings it was built with.
+        with self._lock:
+            self._conn.execute('BEGIN')
+            try:
+                self._conn.executemany('INSERT OR IGNORE INTO settings (name, value) VALUES (?, ?)', settings.items())
+                stored = dict(self._conn.execute('SELECT name, value FROM settings').fetchall())
+                self._conn.execute('COMMIT')
+            except BaseException:
+                self._conn.execute('ROLLBACK')
+                raise
+        if stored != settings:
+            raise ValueError(f"{self.path} was built with {stored}, not {settings}; use another path or delete it")
+
+
+def _unpack(blob: bytes) -> array:
+    signature = array('I')
+    signature.frombytes(blob)
+    return signature
@@ -0,0 +1,172 @@
+import hashlib
+import json
+import marshal
+import os
+from typing import Any, Dict, Optional, Tuple
+
+import phrase_matcher
+from analysis_cache import pattern_fingerprint
+from phrase_matcher import PhraseMatcher
+
+DEFAULT_REGISTRY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'patterns.json')
+# Per user, so no other account can plant a snapshot; independent of the working directory.
+DEFAULT_SNAPSHOT_DIR = os.path.join(os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache'),
+                                    'transcript_patterns')
+# Points every analyzer in the process, pool workers included, at another registry file.
+REGISTRY_ENV = 'PATTERN_REGISTRY'
+SCHEMA = 1
+
+# Groups the analysis reads; a registry may add groups but not leave these out.
+EDUCATIONAL_GROUPS = ('subjects', 'learning_indicators', 'teaching_strategies')
+STAGE_GROUPS = ('session_context', 'mathematics_topics', 'teaching_moments', 'student_condition', 'performance',
+                'educational_markers', 'action_categories', 'action_priority', 'action_type')
+
+_loaded: Dict[str, 'PatternRegistry'] = {}
+_code_stamp: Optional[bytes] = None
+
+
+class PatternRegistry:
+    """The analyzer's phrase lists, loaded from a declarative JSON registry and compiled once.
+
+    ``educational_patterns`` holds the subject, learning indicator and
+    teaching strategy phrases; ``stage_phrases`` the phrases behind session
+    context, student condition, performance and action item categories and
+    priorities. Within each group the declaration order is the match
+    priority. ``version`` hashes the phrase lists, so analysis caches keyed
+    on it never serve results from other patterns. Instances are shared
+    between analyzers and must not be mutated.
+    """
+
+    def __init__(self, patterns: Dict[str, Any], source: Optional[str] = None):
+        _validate(patterns, source or 'pattern registry')
+        self.source = source
+        self.educational_patterns = patterns['educational_patterns']
+        self.stage_phrases = patterns['stage_phrases']
+        self.version = pattern_fingerprint(self.educational_patterns, self.stage_phrases)
+        self.matcher = PhraseMatcher({
+            f'{group}.{name}': phrases
+            for patterns in (self.educational_patterns, self.stage_phrases)
+            for group, phrase_sets in patterns.items()
+            for name, phrases in phrase_sets.items()
+        })
+        # Prepared here so every process that loads the snapshot starts with them.
+        self.matcher.seam_splits(' ')
+
+    @classmethod
+    def from_file(cls, path: str) -> 'PatternRegistry':
+        with open(path, 'rb') as handle:
+            return cls(_parse(handle.read(), path), path)
+
+    def to_state(self) -> Dict[str, Any]:
+        """The validated phrase lists, version and compiled matcher as plain data, for from_state."""
+        return {'educational_patterns': self.educational_patterns, 'stage_phrases': self.stage_phrases,
+                'version': self.version, 'matcher': self.matcher.to_state()}
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any], source: Optional[str] = None) -> 'PatternRegistry':
+        """Restore a registry from to_state() data without validating or compiling it again."""
+        registry = cls.__new__(cls)
+        registry.source = source
+        registry.educational_patterns = state['educational_patterns']
+        registry.stage_phrases = state['stage_phrases']
+        registry.version = state['version']
+        registry.matcher = PhraseMatcher.from_state(state['matcher'])
+        return registry
+
+    @property
+    def phrase_count(self) -> int:
+        return sum(len(phrases)
+                   for patterns in (self.educational_patterns, self.stage_phrases)
+                   for phrase_sets in patterns.values()
+                   for phrases in phrase_sets.values())
+
+
+def registry_path() -> str:
+    return os.environ.get(REGISTRY_ENV) or DEFAULT_REGISTRY_PATH
+
+
+def snapshot_path(path: Optional[str] = None, snapshot_dir: str = DEFAULT_SNAPSHOT_DIR) -> str:
+    """Where the compiled snapshot of a registry file lives; named by a hash of the file and the compiler."""
+    with open(path or registry_path(), 'rb') as handle:
+        return _snapshot_location(handle.read(), snapshot_dir)[0]
+
+
+def load_registry(path: Optional[str] = None, snapshot_dir: Optional[str] = DEFAULT_SNAPSHOT_DIR) -> 'PatternRegistry':
+    """The compiled registry for ``path`` (default: $PATTERN_REGISTRY or patterns.json).
+
+    Loaded once per process; pool workers forked after the first call
+    inherit it. Otherwise the registry compiled by an earlier process is
+    restored from its snapshot in ``snapshot_dir``, and only a registry
+    file, or registry or matcher code, that changed since the snapshot was
+    written is parsed and compiled again.
+    """
+    path = os.path.abspath(path or registry_path())
+    registry = _loaded.get(path)
+    if registry is None:
+        registry = _loaded[path] = _load_snapshot(path, snapshot_dir) if snapshot_dir else PatternRegistry.from_file(path)
+    return registry
+
+
+def _load_snapshot(path: str, snapshot_dir: str) -> PatternRegistry:
+    with open(path, 'rb') as handle:
+        data = handle.read()
+    snapshot, digest = _snapshot_location(data, snapshot_dir)
+    # marshal only builds plain values (no constructors or code run while
+    # loading, unlike pickle), and a snapshot is used only if it records
+    # the digest of these registry bytes and this code.
+    try:
+        with open(snapshot, 'rb') as handle:
+            state = marshal.loads(handle.read())
+        if state['digest'] == digest:
+            return PatternRegistry.from_state(state['registry'], path)
+    except (OSError, EOFError, ValueError, KeyError, TypeError, AttributeError):
+        pass
+
+    registry = PatternRegistry(_parse(data, path), path)
+    try:
+        os.makedirs(snapshot_dir, mode=0o700, exist_ok=True)
+        # Written under a temporary name first, so a concurrent reader never sees half a snapshot.
+        temporary = f'{snapshot}.{os.getpid()}.tmp'
+        with open(temporary, 'wb') as handle:
+            handle.write(marshal.dumps({'digest': digest, 'registry': registry.to_state()}))
+        os.replace(temporary, snapshot)
+    except OSError:
+        # An unwritable cache directory only costs the compile on the next start.
+        pass
+    return registry
+
+
+def _snapshot_location(data: bytes, snapshot_dir: str) -> Tuple[str, str]:
+    """(snapshot path, digest) for registry bytes; the digest also covers the code that compiles them."""
+    global _code_stamp
+    if _code_stamp is None:
+        # As with .pyc files, editing either module retires the snapshots written before.
+        stats = [os.stat(module) for module in (phrase_matcher.__file__, __file__)]
+        _code_stamp = repr([(stat.st_size, stat.st_mtime_ns) for stat in stats]).encode('ascii')
+    digest = hashlib.sha256(_code_stamp + b'\0' + data).hexdigest()
+    return os.path.join(snapshot_dir, f'{digest[:24]}.marshal'), digest
+
+
+def _parse(data: bytes, path: str) -> Dict[str, Any]:
+    try:
+        return json.loads(data.decode('utf-8'))
+    except (UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise ValueError(f"{path}: not valid JSON ({e})") from None
+
+
+def _validate(patterns: Dict[str, Any], source: str):
+    if not isinstance(patterns, dict) or patterns.get('schema') != SCHEMA:
+        raise ValueError(f"{source}: expected a registry with \"schema\": {SCHEMA}")
+    for section, groups in (('educational_patterns', EDUCATIONAL_GROUPS), ('stage_phrases', STAGE_GROUPS)):
+        found = patterns.get(section)
+        if not isinstance(found, dict):
+            raise ValueError(f"{source}: missing {section!r}")
+        missing = [group for group in groups if group not in found]
+        if missing:
+            raise ValueError(f"{source}: {section} lacks {', '.join(missing)}")
+        for group, phrase_sets in found.items():
+            if not isinstance(phrase_sets, dict):
+                raise ValueError(f"{source}: {section}.{group} must map names to phrase lists")
+            for name, phrases in phrase_sets.items():
+                if not isinstance(phrases, list) or not all(isinstance(phrase, str) and phrase.strip() for phrase in phrases):
+                    raise ValueError(f"{source}: {section}.{group}.{name} must be a list of non-empty phrases")
@@ -0,0 +1,211 @@
+from typing import Any, Dict, FrozenSet, Iterable, List, Set, Tuple
+
+Hit = Tuple[str, str, int]
+
+_NO_PHRASES: FrozenSet[str] = frozenset()
+
+
+class _TokenIndex(dict):
+    """Memo of token -> probes contained in it, filled on first lookup."""
+
+    def __init__(self, probes: FrozenSet[str], max_size: int):
+        super().__init__()
+        self.probes = probes
+        self.max_size = max_size
+
+    def __missing__(self, token: str) -> FrozenSet[str]:
+        contained = frozenset(probe for probe in self.probes if probe in token)
+        if len(self) < self.max_size:
+            self[token] = contained
+        return contained
+
+
+class PhraseMatcher:
+    """Finds every phrase of several named phrase sets in one pass over a text.
+
+    The text is split on whitespace once and each distinct token is resolved,
+    through a memo shared by all scans, to the single-word phrases it
+    contains. Phrases with whitespace in them are confirmed with one
+    substring check, and only when their first word was seen. Results are
+    identical to running ``phrase in text`` once per phrase.
+    """
+
+    token_cache_size = 200000
+    categorize_cache_size = 4096
+
+    def __init__(self, phrase_sets: Dict[str, Iterable[str]], word_boundaries: bool = False):
+        self.word_boundaries = word_boundaries
+        self._memberships: Dict[str, List[Tuple[str, int]]] = {}
+
+        for category, phrases in phrase_sets.items():
+            for position, phrase in enumerate(phrases):
+                self._memberships.setdefault(phrase.lower(), []).append((category, position))
+
+        single_words = set()
+        self._by_lead: Dict[str, Tuple[str, ...]] = {}
+        self._unanchored: Tuple[str, ...] = ()
+        for phrase in self._memberships:
+            words = phrase.split()
+            if not words:
+                self._unanchored += (phrase,)
+            elif len(words) == 1 and len(words[0]) == len(phrase):
+                single_words.add(phrase)
+            else:
+                self._by_lead[words[0]] = self._by_lead.get(words[0], ()) + (phrase,)
+
+        self._single_words = frozenset(single_words)
+        self._leads = frozenset(self._by_lead)
+        self._tokens = _TokenIndex(self._single_words | self._leads, self.token_cache_size)
+        self._categorized: Dict[FrozenSet[str], Dict[str, List[str]]] = {}
+        self._seam_splits: Dict[str, List[Tuple[str, str, str]]] = {}
+        self.max_length = max(map(len, self._memberships), default=0)
+
+    def to_state(self) -> Dict[str, Any]:
+        """The compiled phrase tables as plain JSON-serializable data, for from_state."""
+        return {
+            'word_boundaries': self.word_boundaries,
+            'memberships': {phrase: [list(member) for member in members] for phrase, members in self._memberships.items()},
+            'by_lead': {lead: list(phrases) for lead, phrases in self._by_lead.items()},
+            'unanchored': list(self._unanchored),
+            'single_words': sorted(self._single_words),
+            'seam_splits': {separator: [list(split) for split in splits] for separator, splits in self._seam_splits.items()},
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> 'PhraseMatcher':
+        """Rebuild a matcher from to_state() data without recompiling its phrase sets."""
+        matcher = cls.__new__(cls)
+        matcher.word_boundaries = bool(state['word_boundaries'])
+        matcher._memberships = {phrase: [(category, position) for category, position in members]
+                                for phrase, members in state['memberships'].items()}
+        matcher._by_lead = {lead: tuple(phrases) for lead, phrases in state['by_lead'].items()}
+        matcher._unanchored = tuple(state['unanchored'])
+        matcher._single_words = frozenset(state['single_words'])
+        matcher._leads = frozenset(matcher._by_lead)
+        matcher._tokens = _TokenIndex(matcher._single_words | matcher._leads, cls.token_cache_size)
+        matcher._categorized = {}
+        matcher._seam_splits = {separator: [(head, rest, phrase) for head, rest, phrase in splits]
+                                for separator, splits in state['seam_splits'].items()}
+        matcher.max_length = max(map(len, matcher._memberships), default=0)
+        return matcher
+
+    def scan(self, text_lower: str) -> List[Hit]:
+        """Return every (category, phrase, offset) hit in already-lowercased text."""
+        hits = []
+        for phrase, offset in self.find(text_lower):
+            for category, _ in self._memberships[phrase]:
+                hits.append((category, phrase, offset))
+        return hits
+
+    def find(self, text_lower: str) -> List[Tuple[str, int]]:
+        """Return every (phrase, offset) match in already-lowercased text, by offset."""
+        matches = []
+        for phrase in self._candidates(text_lower):
+            offset = text_lower.find(phrase)
+            while offset != -1:
+                if not self.word_boundaries or self._on_boundaries(text_lower, offset, len(phrase)):
+                    matches.append((phrase, offset))
+                offset = text_lower.find(phrase, offset + 1)
+        matches.sort(key=lambda match: (match[1], -len(match[0])))
+        return matches
+
+    def phrases(self, text_lower: str) -> FrozenSet[str]:
+        """Return the distinct phrases present in already-lowercased text."""
+        if self.word_boundaries:
+            return frozenset(phrase for phrase, _ in self.find(text_lower))
+        return self._candidates(text_lower)
+
+    def categorize(self, phrases: FrozenSet[str]) -> Dict[str, List[str]]:
+        """Group found phrases by category, in the order each set declared them.
+
+        Results are shared between calls with the same phrase set and must
+        not be mutated.
+        """
+        categorized = self._categorized.get(phrases)
+        if categorized is not None:
+            return categorized
+
+        grouped: Dict[str, List[Tuple[int, str]]] = {}
+        for phrase in phrases:
+            for category, position in self._memberships[phrase]:
+                grouped.setdefault(category, []).append((position, phrase))
+        categorized = {category: [phrase for _, phrase in sorted(found)] for category, found in grouped.items()}
+
+        if len(self._categorized) < self.categorize_cache_size:
+            self._categorized[phrases] = categorized
+        return categorized
+
+    def seam_splits(self, separator: str) -> List[Tuple[str, str, str]]:
+        """Split every phrase around each occurrence of ``separator``.
+
+        Returns (head, rest, phrase) triples: the phrase spans a seam when
+        the text before the seam ends with head and the text after it starts
+        with rest.
+        """
+        splits = self._seam_splits.get(separator)
+        if splits is None:
+            splits = []
+            for phrase in self._memberships:
+                start = phrase.find(separator)
+                while start != -1:
+                    splits.append((phrase[:start], phrase[start + len(separator):], phrase))
+                    start = phrase.find(separator, start + 1)
+            self._seam_splits[separator] = splits
+        return splits
+
+    def _candidates(self, text_lower: str) -> FrozenSet[str]:
+        if not text_lower:
+            return _NO_PHRASES
+        present = frozenset().union(*map(self._tokens.__getitem__, text_lower.split()))
+        found = present & self._single_words
+        extra = [phrase
+                 for lead in present & self._leads
+                 for phrase in self._by_lead[lead]
+                 if phrase in text_lower]
+        extra.extend(phrase for phrase in self._unanchored if phrase in text_lower)
+        return found.union(extra) if extra else found
+
+    @staticmethod
+    def _on_boundaries(text: str, offset: int, length: int) -> bool:
+        end = offset + length
+        before = offset == 0 or not (text[offset - 1].isalnum() or text[offset - 1] == '_')
+        after = end >= len(text) or not (text[end].isalnum() or text[end] == '_')
+        return before and after
+
+
+class JoinedPhraseScan:
+    """Phrases present in ``separator.join(parts)``, fed one part at a time.
+
+    Each part is scanned once on its own. A phrase can only span two parts
+    if it contains the separator, so seams are checked against the
+    precomputed halves of those phrases instead of being rescanned.
+    """
+
+    def __init__(self, matcher: PhraseMatcher, separator: str = ' '):
+        if len(separator) != 1:
+            raise ValueError("separator must be a single character")
+        self.matcher = matcher
+        self.separator = separator
+        self.phrases: Set[str] = set()
+        self._splits = matcher.seam_splits(separator)
+        self._heads = tuple({head for head, _, _ in self._splits})
+        self._rests = tuple({rest for _, rest, _ in self._splits})
+        self._context = max(matcher.max_length - 1, 0)
+        self._tail = ''
+        self._started = False
+
+    def add(self, part_lower: str, part_phrases: Iterable[str] = None):
+        if part_phrases is None:
+            part_phrases = self.matcher.phrases(part_lower)
+        self.phrases.update(part_phrases)
+
+        if self._started:
+            if self._heads and self._tail.endswith(self._heads) and part_lower.startswith(self._rests):
+                for head, rest, phrase in self._splits:
+                    if self._tail.endswith(head) and part_lower.startswith(rest):
+                        self.phrases.add(phrase)
+            joined = self._tail + self.separator + part_lower
+        else:
+            joined = part_lower
+        self._tail = joined[-self._context:] if self._context else ''
+        self._started = True
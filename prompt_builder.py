@@ -0,0 +1,242 @@
+import importlib.util
+import re
+from typing import Any, Dict, List, Optional
+
+# tiktoken is optional and imported on first use; without it token counts
+# are estimated.
+TIKTOKEN_AVAILABLE = importlib.util.find_spec('tiktoken') is not None
+
+DEFAULT_PROMPT_BUDGET = 1000
+
+_APPROX_PIECES = re.compile(r"\w+|[^\w\s]")
+
+PRIORITY_ORDER = {'Critical': 0, 'High': 1, 'Medium': 2, 'Low': 3}
+MOMENT_TYPES = ('understanding', 'confusion', 'effort', 'confidence')
+# Remarks shorter than this ("Oh yeah.") carry little evidence and are offered last.
+MIN_MOMENT_WORDS = 5
+
+# Identical for every prompt, so it is sent first: providers that cache
+# prompt prefixes reuse it across requests.
+STATIC_PREFIX = """ROLE: You are Dr. Varsha Meda, Ph.D. in Learning Sciences with 15+ years of experience in educational psychology and family communication. You specialize in translating complex educational assessments into actionable insights for parents.
+
+TASK: Create a professional email summary for parents about their child's tutoring session, using the session data and evidence below.
+
+COMMUNICATION FRAMEWORK:
+- Use warm, professional tone that builds parent confidence
+- Apply growth mindset language (effort-focused praise)
+- Include specific, actionable next steps
+- Balance challenges with achievements
+- Use educational terminology appropriately for parent audience
+
+STRUCTURE:
+1. Subject Line (engaging, positive)
+2. Warm opening acknowledging partnership
+3. Session highlights with specific evidence
+4. Academic progress observations
+5. Concrete action items for home support
+6. Encouraging close that reinforces growth potential
+
+CONSTRAINTS:
+- 400-500 words maximum
+- Professional email format
+- Evidence-based observations only
+- No generic praise - be specific
+- Include pedagogical best practices naturally
+"""
+
+CLOSING = "\nGenerate the complete parent email now:\n"
+
+SECTION_HEADINGS = {
+    'action_items': "\nACTION ITEMS (highest priority first):\n",
+    'student_moments': "\nKEY STUDENT MOMENTS:\n",
+    'teaching_moments': "\nTEACHING MOMENTS:\n"
+}
+
+
+class TokenCounter:
+    """Counts tokens with tiktoken when it is installed, otherwise estimates them.
+
+    The estimate charges one token per punctuation mark and one per four
+    characters of every word, which lands slightly above real BPE counts
+    for English prose.
+    """
+
+    # Chat formatting overhead per message, plus the tokens priming the reply.
+    tokens_per_message = 3
+    reply_tokens = 3
+
+    def __init__(self, model: str):
+        self.model = model
+        self._encoding = None
+        if TIKTOKEN_AVAILABLE:
+            import tiktoken
+
+            try:
+                self._encoding = tiktoken.encoding_for_model(model)
+            except KeyError:
+                self._encoding = tiktoken.get_encoding('cl100k_base')
+            except Exception:
+                # Encodings are downloaded on first use; offline, fall back to the estimate.
+                self._encoding = None
+
+    @property
+    def exact(self) -> bool:
+        return self._encoding is not None
+
+    def count(self, text: str) -> int:
+        if self._encoding is not None:
+            return len(self._encoding.encode(text))
+        return sum((len(piece) + 3) // 4 for piece in _APPROX_PIECES.findall(text))
+
+    def count_messages(self, messages: List[Dict[str, str]]) -> int:
+        return sum(self.tokens_per_message + self.count(message['content']) for message in messages) + self.reply_tokens
+
+
+class PromptBuilder:
+    """Builds the parent-summary prompt within a token budget.
+
+    The budget covers the whole request input: system prompt, user prompt
+    and chat formatting. The static prefix and the session data are always
+    included; evidence lines (action items by priority, student moments
+    across indicator types, teaching moments) are then added in rounds,
+    one from each section per round, while they fit.
+    """
+
+    def __init__(self, system_prompt: str, model: str, budget: int = DEFAULT_PROMPT_BUDGET,
+                 counter: Optional[TokenCounter] = None):
+        self.system_prompt = system_prompt
+        self.budget = budget
+        self.counter = counter or TokenCounter(model)
+        # Counted once per builder: the system message, formatting overhead and static prefix.
+        self.prefix_tokens = self.counter.count_messages([
+            {'role': 'system', 'content': system_prompt},
+            {'role': 'user', 'content': STATIC_PREFIX + CLOSING}
+        ])
+
+    def build(self, analysis: Dict[str, Any]) -> Dict[str, Any]:
+        """The prompt for ``analysis`` and its token report."""
+        session_data = self._session_data(analysis)
+        candidates = {
+            'action_items': self._action_item_lines(analysis.get('action_items', [])),
+            'student_moments': self._student_moment_lines(analysis.get('learning_patterns', {}).get('specific_moments', [])),
+            'teaching_moments': self._teaching_moment_lines(analysis.get('teaching_strategies', {}).get('teaching_moments', []))
+        }
+
+        used = self.prefix_tokens + self.counter.count(session_data)
+        selected = {section: [] for section in candidates}
+        for line, section in self._rounds(candidates):
+            cost = self.counter.count(line)
+            if not selected[section]:
+                cost += self.counter.count(SECTION_HEADINGS[section])
+            if used + cost <= self.budget:
+                selected[section].append(line)
+                used += cost
+
+        # Piecewise counts can drift from the count of the joined text; trim until it fits.
+        prompt, tokens = self._render(session_data, selected)
+        while tokens > self.budget and any(selected.values()):
+            longest = max(selected, key=lambda section: len(selected[section]))
+            selected[longest].pop()
+            prompt, tokens = self._render(session_data, selected)
+
+        return {
+            'prompt': prompt,
+            'tokens': tokens,
+            'budget': self.budget,
+            'exact': self.counter.exact,
+            'over_budget': tokens > self.budget,
+            'evidence': {section: {'included': len(selected[section]), 'available': len(lines)}
+                         for section, lines in candidates.items()}
+        }
+
+    def _render(self, session_data: str, selected: Dict[str, List[str]]):
+        parts = [STATIC_PREFIX, session_data]
+        for section, lines in selected.items():
+            if lines:
+                parts.append(SECTION_HEADINGS[section])
+                parts.extend(lines)
+        if not selected['action_items']:
+            parts.append("\nACTION ITEMS: none recorded - suggest continued practice and a review of today's concepts\n")
+        parts.append(CLOSING)
+        prompt = ''.join(parts)
+        tokens = self.counter.count_messages([
+            {'role': 'system', 'content': self.system_prompt},
+            {'role': 'user', 'content': prompt}
+        ])
+        return prompt, tokens
+
+    @staticmethod
+    def _rounds(candidates: Dict[str, List[str]]):
+        queues = list(candidates.items())
+        for index in range(max((len(lines) for lines in candidates.values()), default=0)):
+            for section, lines in queues:
+                if index < len(lines):
+                    yield lines[index], section
+
+    @staticmethod
+    def _session_data(analysis: Dict[str, Any]) -> str:
+        metadata = analysis.get('session_metadata', {})
+        subjects = analysis.get('subject_analysis', {})
+        condition = analysis.get('student_condition', {})
+        learning = analysis.get('learning_patterns', {})
+        insights = analysis.get('educational_insights', {})
+
+        lines = [
+            "\nSESSION DATA:",
+            f"- Duration: {metadata.get('duration_minutes', 'Unknown')} minutes",
+            f"- Session type: {metadata.get('session_type', 'Tutoring')} (urgency {metadata.get('urgency_level', 'normal')})",
+            f"- Subjects covered: {', '.join(subjects.get('subjects_identified', [])) or 'General academic support'}"
+        ]
+        if subjects.get('mathematics_topics'):
+            lines.append(f"- Math topics: {', '.join(subjects['mathematics_topics'])}")
+        if condition:
+            stress = ', '.join(condition.get('stress_indicators', [])) or 'none'
+            lines.append(f"- Student: engagement {condition.get('engagement_level')}, confidence {condition.get('confidence_level')}, "
+                         f"health {condition.get('health_status', 'normal').replace('_', ' ')}, stress indicators {stress}")
+        if learning:
+            indicators = ', '.join(f"{name.replace('_', ' ')} {count}" for name, count in learning.get('learning_indicators', {}).items())
+            lines.append(f"- Learning indicators: {indicators}")
+        if insights.get('pedagogical_recommendations'):
+            lines.append(f"- Recommendations: {'; '.join(insights['pedagogical_recommendations'])}")
+        return '\n'.join(lines) + '\n'
+
+    @staticmethod
+    def _action_item_lines(action_items: List[Dict[str, Any]]) -> List[str]:
+        ordered = sorted(action_items, key=lambda item: PRIORITY_ORDER.get(item.get('priority'), len(PRIORITY_ORDER)))
+        return [f"- [{item.get('priority', 'Medium')}] {item['description']} ({item.get('category', 'General')})\n"
+                for item in ordered]
+
+    @staticmethod
+    def _student_moment_lines(moments: List[Dict[str, Any]]) -> List[str]:
+        # One line per remark, taken from each indicator type in turn.
+        by_type = {moment_type: [] for moment_type in MOMENT_TYPES}
+        for moment in sorted(moments, key=lambda moment: len(moment['context'].split()) < MIN_MOMENT_WORDS):
+            by_type.setdefault(moment['type'], []).append(moment)
+
+        lines, seen = [], set()
+        queues = [iter(queue) for queue in by_type.values()]
+        while queues:
+            for queue in list(queues):
+                moment = next(queue, None)
+                if moment is None:
+                    queues.remove(queue)
+                    continue
+                key = (moment['timestamp'], moment['context'])
+                if key not in seen:
+                    seen.add(key)
+                    lines.append(f"- {moment['timestamp']} ({moment['type']}): \"{moment['context']}\"\n")
+        return lines
+
+    @staticmethod
+    def _teaching_moment_lines(moments: List[Dict[str, Any]]) -> List[str]:
+        by_strategy: Dict[str, List[Dict[str, Any]]] = {}
+        for moment in moments:
+            by_strategy.setdefault(moment['strategy'], []).append(moment)
+
+        lines = []
+        for index in range(max((len(queue) for queue in by_strategy.values()), default=0)):
+            for queue in by_strategy.values():
+                if index < len(queue):
+                    moment = queue[index]
+                    lines.append(f"- {moment['timestamp']} {moment['strategy']} ({moment['approach'].lower()})\n")
+        return lines
@@ -0,0 +1,21 @@
+import hashlib
+import json
+import os
+
+from sqlite_cache import SQLiteCache
+
+DEFAULT_CACHE_PATH = os.path.join('.cache', 'llm_responses.sqlite3')
+
+
+class ResponseCache(SQLiteCache):
+    """LLM responses keyed by a hash of everything that shapes them."""
+
+    table = 'responses'
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, **limits):
+        super().__init__(path, **limits)
+
+    @staticmethod
+    def make_key(system: str, prompt: str, model: str, max_tokens: int, temperature: float) -> str:
+        payload = json.dumps([system, prompt, model, max_tokens, temperature], ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
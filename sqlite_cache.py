@@ -0,0 +1,122 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+
+class SQLiteCache:
+    """Key/value text store in SQLite with age, size and LRU eviction.
+
+    Entries older than ``max_age_seconds`` are misses and are purged; once the
+    stored text exceeds ``max_bytes`` (or ``max_entries``) the least recently
+    used entries are evicted. Safe to share between threads and processes.
+    """
+
+    table = 'entries'
+
+    def __init__(self, path: str,
+                 max_bytes: Optional[int] = 256 * 1024 * 1024,
+                 max_entries: Optional[int] = None,
+                 max_age_seconds: Optional[float] = 30 * 24 * 3600):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.max_age_seconds = max_age_seconds
+        self.stats = {'hits': 0, 'misses': 0, 'writes': 0, 'evictions': 0}
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(f'''
+            CREATE TABLE IF NOT EXISTS {self.table} (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                label TEXT,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                size INTEGER NOT NULL
+            )''')
+        self._conn.execute(f'CREATE INDEX IF NOT EXISTS {self.table}_accessed ON {self.table} (accessed_at)')
+        self._conn.execute(f'CREATE INDEX IF NOT EXISTS {self.table}_created ON {self.table} (created_at)')
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(f'SELECT value, created_at FROM {self.table} WHERE key = ?', (key,)).fetchone()
+            if row is not None and self._expired(row[1], now):
+                self._conn.execute(f'DELETE FROM {self.table} WHERE key = ?', (key,))
+                self.stats['evictions'] += 1
+                row = None
+            if row is None:
+                self.stats['misses'] += 1
+                return None
+            self._conn.execute(f'UPDATE {self.table} SET accessed_at = ? WHERE key = ?', (now, key))
+            self.stats['hits'] += 1
+            return row[0]
+
+    def put(self, key: str, value: str, label: str = None):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                f'INSERT OR REPLACE INTO {self.table} (key, value, label, created_at, accessed_at, size) VALUES (?, ?, ?, ?, ?, ?)',
+                (key, value, label, now, now, len(value.encode('utf-8')))
+            )
+            self.stats['writes'] += 1
+            self._evict(now)
+
+    def evict(self) -> int:
+        """Apply the age and size limits now; return the number of entries removed."""
+        with self._lock:
+            return self._evict(time.time())
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute(f'DELETE FROM {self.table}')
+
+    def info(self) -> Dict[str, Any]:
+        with self._lock:
+            entries, size = self._conn.execute(f'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM {self.table}').fetchone()
+        hits, misses = self.stats['hits'], self.stats['misses']
+        return {
+            **self.stats,
+            'entries': entries,
+            'bytes': size,
+            'hit_rate': hits / (hits + misses) if hits + misses else 0.0
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _expired(self, created_at: float, now: float) -> bool:
+        return self.max_age_seconds is not None and now - created_at > self.max_age_seconds
+
+    def _evict(self, now: float) -> int:
+        removed = 0
+        if self.max_age_seconds is not None:
+            removed += self._conn.execute(f'DELETE FROM {self.table} WHERE created_at < ?',
+                                          (now - self.max_age_seconds,)).rowcount
+        if self.max_entries is None and self.max_bytes is None:
+            self.stats['evictions'] += removed
+            return removed
+
+        entries, size = self._conn.execute(f'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM {self.table}').fetchone()
+        if self.max_entries is not None and entries > self.max_entries:
+            removed += self._conn.execute(f'''
+                DELETE FROM {self.table} WHERE key NOT IN (
+                    SELECT key FROM {self.table} ORDER BY accessed_at DESC, key LIMIT ?
+                )''', (self.max_entries,)).rowcount
+        if self.max_bytes is not None and size > self.max_bytes:
+            removed += self._conn.execute(f'''
+                DELETE FROM {self.table} WHERE key IN (
+                    SELECT key FROM (
+                        SELECT key, SUM(size) OVER (ORDER BY accessed_at DESC, key) AS running
+                        FROM {self.table}
+                    ) WHERE running > ?
+                )''', (self.max_bytes,)).rowcount
+        self.stats['evictions'] += removed
+        return removed
@@ -3,173 +3,626 @@ os.environ['OPENAI_API_KEY'] = 'sk-proj-Moujj3xelqelKZ8rOU_aqySWHzqFmq1UYLgc4QVy
 
 
 
+import importlib.util
+import time
 from datetime import datetime
-from typing import Dict, Any, List
-import json
+from typing import Dict, Any, List, Optional, Tuple
+from client_registry import ClientRegistry
+from analysis_cache import content_hash
+from instrumentation import Instrumentation
+from near_duplicates import NearDuplicateIndex
+from prompt_builder import DEFAULT_PROMPT_BUDGET, PromptBuilder
+from response_cache import DEFAULT_CACHE_PATH, ResponseCache
+from summary_stream import AsyncSummaryStream, StreamSink, SummaryStream
 from transcript_analyzer import EducationalTranscriptAnalyzer
 
 
-try:
-    import openai
-    OPENAI_AVAILABLE = True
-except ImportError:
-    OPENAI_AVAILABLE = False
+# openai (with httpx and pydantic) is imported on the first API call and
+# asyncio by the async methods, not here; importing them takes far longer
+# than a template or analysis-only run.
+OPENAI_AVAILABLE = importlib.util.find_spec('openai') is not None
+if not OPENAI_AVAILABLE:
     print("OpenAI not available - using template generation")
 
+SYSTEM_PROMPT = "You are Dr. Sarah Chen, an expert educational consultant specializing in learning sciences and parent communication."
+MODEL = "gpt-3.5-turbo"
+MAX_TOKENS = 1800
+TEMPERATURE = 0.7
+
+
 class EducationalSummaryGenerator:
     
     
-    def __init__(self):
-        self.analyzer = EducationalTranscriptAnalyzer()
+    def __init__(self, max_concurrency: int = 8, requests_per_minute: Optional[int] = 3500,
+                 tokens_per_minute: Optional[int] = 90000, max_retries: int = 5,
+                 cache_path: Optional[str] = DEFAULT_CACHE_PATH, bypass_cache: bool = False,
+                 instrumentation: Optional[Instrumentation] = None, use_ai: Optional[bool] = None,
+                 prompt_token_budget: Optional[int] = None, clients: Optional[ClientRegistry] = None,
+                 analyzer: Optional[EducationalTranscriptAnalyzer] = None,
+                 near_duplicates: Optional[NearDuplicateIndex] = None):
+        # One Instrumentation for the generator and its analyzer; silent=True mutes both.
+        self.instrumentation = instrumentation if instrumentation is not None else Instrumentation()
+        # Generators made per request should share one analyzer and, through
+        # the registry, the API connection pools instead of building their own.
+        self.analyzer = analyzer or EducationalTranscriptAnalyzer(instrumentation=self.instrumentation)
+        self.clients = clients or ClientRegistry.default()
+        self.max_concurrency = max_concurrency
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.max_retries = max_retries
+        self._async_state = None
+        self._executor = None
+        self._background_tasks = set()
+        self.client = None
+        self.openai_version = None
+        # Input tokens per request (system and user prompt); evidence beyond it is left out.
+        self.prompt_token_budget = prompt_token_budget or DEFAULT_PROMPT_BUDGET
+        self._prompt_builder = None
+        # Transcripts close to one summarized before reuse its analysis and model summary.
+        self.near_duplicates = near_duplicates
         
-       
-        try:
-            import openai
-            
-            
-            api_key = os.getenv('OPENAI_API_KEY')
-            
-            if api_key:
-                
-                if hasattr(openai, 'OpenAI'):
-                    self.client = openai.OpenAI(api_key=api_key)
-                    self.use_ai = True
-                    self.openai_version = "new"
-                    print(" Using OpenAI GPT-4 for enhanced summary generation (v1.x)")
-                else:
-                    
-                    openai.api_key = api_key
-                    self.use_ai = True
-                    self.openai_version = "legacy"
-                    print(" Using OpenAI GPT-4 for enhanced summary generation (v0.x)")
-            else:
-                self.use_ai = False
-                print(" No API key found - using template")
-                
-        except ImportError:
+        # use_ai=None uses the API when openai is installed and a key is set.
+        api_key = os.getenv('OPENAI_API_KEY')
+        if use_ai is False:
             self.use_ai = False
-            print(" OpenAI not installed - using template")
-        except Exception as e:
+            self.instrumentation.log(" Template generation requested")
+        elif not OPENAI_AVAILABLE:
+            self.use_ai = False
+            self.instrumentation.log(" OpenAI not installed - using template")
+        elif not api_key:
             self.use_ai = False
-            print(f" OpenAI setup failed: {e} - using template")
+            self.instrumentation.log(" No API key found - using template")
+        else:
+            self.use_ai = True
+            self.instrumentation.log(" Using OpenAI GPT-4 for enhanced summary generation")
+        
+        # bypass_cache skips lookups but still stores fresh responses.
+        self.response_cache = ResponseCache(cache_path) if cache_path and self.use_ai else None
+        self.bypass_cache = bypass_cache
 
-    def generate_summary(self, transcript_file: str) -> Dict[str, Any]:
-        """Generate comprehensive educational summary"""
-        print("🎓 Generating comprehensive educational summary...")
+    def generate_summary(self, transcript_file: str, deadline: Optional[float] = None,
+                         hedge_after: Optional[float] = None) -> Dict[str, Any]:
+        """Generate comprehensive educational summary
+        
+        ``deadline`` bounds the whole call in seconds: if the model has not
+        answered by then the template summary is returned and the request
+        keeps running in the background to fill the response cache.
+        ``hedge_after`` sends a duplicate request when the first is still
+        unanswered after that many seconds; whichever answers first wins.
+        The result's ``method`` records the path that produced the summary;
+        with a near-duplicate index, a transcript close enough to one already
+        summarized reuses that analysis and AI summary and the result's
+        ``near_duplicate`` names the original.
+        """
+        deadline_at = time.perf_counter() + deadline if deadline is not None else None
+        instrumentation = self.instrumentation
+        instrumentation.log("🎓 Generating comprehensive educational summary...")
         
        
-        analysis = self.analyzer.analyze_transcript(transcript_file)
+        analysis, duplicate = self._load_deduplicated(transcript_file)
+        summary_content, method = self._reused_summary(duplicate)
         
-        if self.use_ai:
+        if summary_content is None and self.use_ai:
             
-            prompt = self._create_advanced_prompt(analysis)
-            summary_content = self._generate_ai_summary(prompt)
-        else:
-            
-            summary_content = self._generate_template_summary(analysis)
+            with instrumentation.stage('summary.prompt'):
+                prompt = self._create_advanced_prompt(analysis)
+            with instrumentation.stage('summary.llm'):
+                summary_content, method = self._ai_summary(prompt, deadline_at, hedge_after)
+        elif summary_content is None:
+            method = 'Template-Based'
+        
+        if summary_content is None:
+            with instrumentation.stage('summary.template'):
+                summary_content = self._generate_template_summary(analysis)
+        instrumentation.count('summaries_generated')
+        
+        
+        return self._deduplicated_result(duplicate, analysis, summary_content, method)
+    
+    def stream_summary(self, transcript_file: str, sink: StreamSink = None) -> SummaryStream:
+        """Stream the summary as text deltas while the model writes it.
+        
+        Iterate the returned stream for the deltas; each is also written to
+        ``sink`` (a path or text file such as sys.stdout) as it arrives.
+        Afterwards ``stream.result`` holds the generate_summary dict.
+        """
+        
+        return SummaryStream(self, transcript_file, sink)
+    
+    def astream_summary(self, transcript_file: str, sink: StreamSink = None) -> AsyncSummaryStream:
+        """Async stream_summary; use ``async for delta in stream``."""
+        
+        return AsyncSummaryStream(self, transcript_file, sink)
+    
+    def _load_analysis(self, transcript_file: str) -> Dict[str, Any]:
+        
+        with self.instrumentation.stage('summary.analysis'):
+            with open(transcript_file, encoding='utf-8-sig') as handle:
+                return self.analyzer.analyze_transcript(handle.read(), lazy=not self.use_ai)
+    
+    def _load_deduplicated(self, transcript_file: str,
+                           text: Optional[str] = None) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+        """The analysis, plus the near-duplicate lookup (None without an index) for _remember_summary."""
+        
+        if self.near_duplicates is None and text is None:
+            return self._load_analysis(transcript_file), None
+        if text is None:
+            with open(transcript_file, encoding='utf-8-sig') as handle:
+                text = handle.read()
+        
+        duplicate = None
+        if self.near_duplicates is not None:
+            with self.instrumentation.stage('summary.near_duplicates'):
+                signature = self.near_duplicates.signature(text)
+                transcript_hash = content_hash(text)
+                version = self.analyzer.analysis_version
+                match = self.near_duplicates.find(signature, transcript_hash, version)
+            duplicate = {'path': transcript_file, 'signature': signature, 'content_hash': transcript_hash,
+                         'version': version, 'match': match}
+            self.instrumentation.count('near_duplicate_hits' if match is not None else 'near_duplicate_misses')
+            if match is not None:
+                self.instrumentation.log(f" Near-duplicate of {match['path']} (similarity {match['similarity']:.2f}) - reusing its analysis")
+                return match['analysis'], duplicate
+        
+        # The prompt reads turn-level sections, so a lazy result would scan the
+        # transcript twice; only the template summary gets by on the line pass.
+        with self.instrumentation.stage('summary.analysis'):
+            return self.analyzer.analyze_transcript(text, lazy=not self.use_ai), duplicate
+    
+    def _reused_summary(self, duplicate: Optional[Dict[str, Any]]) -> Tuple[Optional[str], Optional[str]]:
+        
+        match = duplicate and duplicate['match']
+        if match and match['summary'] is not None and self.use_ai:
+            self.instrumentation.count('near_duplicate_summaries')
+            return match['summary'], f"{match['method']} (near-duplicate)"
+        return None, None
+    
+    def _remember_summary(self, duplicate: Optional[Dict[str, Any]], analysis: Dict[str, Any],
+                          summary_content: str, method: str):
+        """Index a new transcript, or give a near-duplicate's original the AI summary it lacked."""
         
+        if duplicate is None:
+            return
+        # Only model summaries are kept: a template summary is cheap to make again from the analysis.
+        keep = method in ('AI-Enhanced', 'AI-Enhanced (cached)', 'AI-Enhanced (hedged)')
+        match = duplicate['match']
+        if match is None:
+            self.near_duplicates.add(duplicate['path'], duplicate['signature'], duplicate['content_hash'],
+                                     duplicate['version'], analysis, summary_content if keep else None,
+                                     'AI-Enhanced' if keep else None)
+        elif match['summary'] is None and keep:
+            self.near_duplicates.set_summary(match['content_hash'], duplicate['version'], summary_content, 'AI-Enhanced')
+    
+    def _deduplicated_result(self, duplicate: Optional[Dict[str, Any]], analysis: Dict[str, Any],
+                             summary_content: str, method: str) -> Dict[str, Any]:
         
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self._remember_summary(duplicate, analysis, summary_content, method)
+        result = self._summary_result(analysis, summary_content, method)
+        if duplicate is not None and duplicate['match'] is not None:
+            match = duplicate['match']
+            result['near_duplicate'] = {'path': match['path'], 'similarity': match['similarity']}
+        return result
+    
+    def _summary_result(self, analysis: Dict[str, Any], summary_content: str, method: str) -> Dict[str, Any]:
         
-        result = {
-            'timestamp': timestamp,
+        return {
+            'timestamp': datetime.now().strftime("%Y%m%d_%H%M%S"),
             'analysis': analysis,
             'summary_content': summary_content,
-            'method': 'AI-Enhanced' if self.use_ai else 'Template-Based',
+            'method': method,
             'prompt_engineering_explanation': self._create_prompt_explanation()
         }
-        
-        return result
 
     def _generate_ai_summary(self, prompt: str) -> str:
         
+        summary_content, _ = self._ai_summary(prompt)
+        return summary_content if summary_content is not None else self._generate_template_summary({})
+    
+    def _ai_summary(self, prompt: str, deadline_at: Optional[float] = None,
+                    hedge_after: Optional[float] = None) -> Tuple[Optional[str], str]:
+        """The model's summary and the method that produced it; None means use the template."""
+        
+        cache_key = self._response_cache_key(prompt)
+        cached = self._cached_response(cache_key)
+        if cached is not None:
+            return cached, 'AI-Enhanced (cached)'
+        
+        instrumentation = self.instrumentation
         try:
-            print(" Calling OpenAI API...")
+            instrumentation.log(" Calling OpenAI API...")
+            if deadline_at is None and hedge_after is None:
+                return self._request_ai_summary(prompt, cache_key), 'AI-Enhanced'
+            return self._race_ai_summary(prompt, cache_key, deadline_at, hedge_after)
+                
+        except Exception as e:
+            instrumentation.log(f" OpenAI error: {e}")
+            instrumentation.log(" Using template fallback...")
+            instrumentation.count('llm_fallbacks')
+            return None, 'Template-Based (fallback)'
+    
+    def _request_ai_summary(self, prompt: str, cache_key: str) -> str:
+        
+        instrumentation = self.instrumentation
+        instrumentation.count('llm_requests')
+        started = time.perf_counter()
+        try:
+            self._openai_client()
             
-            if hasattr(self, 'openai_version') and self.openai_version == "new":
+            if self.openai_version == "new":
                 
-                response = self.client.chat.completions.create(
-                    model="gpt-3.5-turbo",
-                    messages=[
-                        {"role": "system", "content": "You are Dr. Sarah Chen, an expert educational consultant specializing in learning sciences and parent communication."},
-                        {"role": "user", "content": prompt}
-                    ],
-                    max_tokens=1800,
-                    temperature=0.7
-                )
-                result = response.choices[0].message.content.strip()
-                print(" OpenAI response received!")
-                return result
+                response = self.client.chat.completions.create(**self._chat_request(prompt))
                 
             else:
                 
                 import openai
-                response = openai.ChatCompletion.create(
-                    model="gpt-3.5-turbo",
-                    messages=[
-                        {"role": "system", "content": "You are Dr. Sarah Chen, an expert educational consultant specializing in learning sciences and parent communication."},
-                        {"role": "user", "content": prompt}
-                    ],
-                    max_tokens=1800,
-                    temperature=0.7
-                )
+                response = openai.ChatCompletion.create(**self._chat_request(prompt))
+        except Exception:
+            instrumentation.count('llm_errors')
+            raise
+        
+        result = response.choices[0].message.content.strip()
+        self._record_response(response, time.perf_counter() - started)
+        instrumentation.log(" OpenAI response received!")
+        self._store_response(cache_key, result)
+        return result
+    
+    def _race_ai_summary(self, prompt: str, cache_key: str, deadline_at: Optional[float],
+                         hedge_after: Optional[float]) -> Tuple[Optional[str], str]:
+        
+        # Requests run on background threads so the caller can stop waiting;
+        # one that outlives the deadline still stores its answer in the cache.
+        from concurrent.futures import FIRST_COMPLETED, wait
+        
+        instrumentation = self.instrumentation
+        executor = self._background_executor()
+        futures = {executor.submit(self._request_ai_summary, prompt, cache_key): 'AI-Enhanced'}
+        hedge_at = time.perf_counter() + hedge_after if hedge_after is not None else None
+        error = None
+        
+        while futures:
+            wake_times = [t for t in (deadline_at, hedge_at) if t is not None]
+            timeout = max(0.0, min(wake_times) - time.perf_counter()) if wake_times else None
+            done, _ = wait(futures, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                method = futures.pop(future)
+                if future.exception() is None:
+                    if method == 'AI-Enhanced (hedged)':
+                        instrumentation.count('llm_hedge_wins')
+                    return future.result(), method
+                error = future.exception()
+            
+            now = time.perf_counter()
+            if hedge_at is not None and now >= hedge_at:
+                hedge_at = None
+                instrumentation.count('llm_hedges')
+                futures[executor.submit(self._request_ai_summary, prompt, cache_key)] = 'AI-Enhanced (hedged)'
+            elif deadline_at is not None and now >= deadline_at and futures:
+                instrumentation.count('llm_deadline_misses')
+                instrumentation.log(" Deadline reached - using template while the API call finishes in the background")
+                return None, 'Template-Based (deadline)'
+        
+        raise error
+    
+    def _background_executor(self):
+        
+        if self._executor is None:
+            from concurrent.futures import ThreadPoolExecutor
+            
+            self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix='summary-llm')
+        return self._executor
+    
+    def close(self):
+        """Wait for background API calls (left running by a deadline or hedge) to finish."""
+        
+        if self._executor is not None:
+            executor, self._executor = self._executor, None
+            executor.shutdown(wait=True)
+
+    async def agenerate_summary(self, transcript_file: str, deadline: Optional[float] = None,
+                                hedge_after: Optional[float] = None) -> Dict[str, Any]:
+        """Async generate_summary; API calls share the generator's concurrency and rate limits.
+        
+        ``deadline`` and ``hedge_after`` work as in generate_summary; a hedge
+        that loses is cancelled.
+        """
+        
+        deadline_at = time.perf_counter() + deadline if deadline is not None else None
+        analysis, duplicate = self._load_deduplicated(transcript_file)
+        summary_content, method = self._reused_summary(duplicate)
+        if summary_content is not None:
+            self.instrumentation.count('summaries_generated')
+            return self._deduplicated_result(duplicate, analysis, summary_content, method)
+        result = await self._asummarize(analysis, deadline_at, hedge_after)
+        return self._deduplicated_result(duplicate, analysis, result['summary_content'], result['method'])
+    
+    async def asummarize_analysis(self, analysis: Dict[str, Any], deadline: Optional[float] = None,
+                                  hedge_after: Optional[float] = None) -> Dict[str, Any]:
+        """agenerate_summary for an analysis that is already done, e.g. in another process."""
+        
+        deadline_at = time.perf_counter() + deadline if deadline is not None else None
+        return await self._asummarize(analysis, deadline_at, hedge_after)
+    
+    async def _asummarize(self, analysis: Dict[str, Any], deadline_at: Optional[float],
+                          hedge_after: Optional[float]) -> Dict[str, Any]:
+        
+        instrumentation = self.instrumentation
+        if self.use_ai:
+            with instrumentation.stage('summary.prompt'):
+                prompt = self._create_advanced_prompt(analysis)
+            with instrumentation.stage('summary.llm'):
+                summary_content, method = await self._aai_summary(prompt, deadline_at, hedge_after)
+        else:
+            summary_content, method = None, 'Template-Based'
+        
+        if summary_content is None:
+            with instrumentation.stage('summary.template'):
+                summary_content = self._generate_template_summary(analysis)
+        instrumentation.count('summaries_generated')
+        
+        return self._summary_result(analysis, summary_content, method)
+    
+    async def agenerate_many(self, transcript_files: List[str], deadline: Optional[float] = None,
+                             hedge_after: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Summarize many transcripts concurrently, returning results in input order.
+        
+        API calls still running when a ``deadline`` passed are cancelled on
+        return rather than waited for, so the call returns within about the
+        deadline.
+        """
+        
+        import asyncio
+        
+        self.instrumentation.log(f"🎓 Generating {len(transcript_files)} summaries (concurrency {self.max_concurrency})...")
+        try:
+            return await asyncio.gather(*(self.agenerate_summary(path, deadline, hedge_after) for path in transcript_files))
+        finally:
+            await self.aclose(cancel_background=True)
+    
+    async def aclose(self, cancel_background: bool = False):
+        """Wait for background API calls and close the loop's connection pool if this generator opened it.
+        
+        ``cancel_background`` cancels the calls left running by a deadline
+        instead of waiting for them to fill the response cache. A pool
+        another generator opened stays open for it; ``clients.aclose()``
+        closes it.
+        """
+        
+        import asyncio
+        
+        if self._background_tasks:
+            if cancel_background:
+                for task in self._background_tasks:
+                    task.cancel()
+            await asyncio.gather(*self._background_tasks, return_exceptions=True)
+        state, self._async_state = self._async_state, None
+        if state is not None and state['owns_pool'] and state['loop'] is asyncio.get_running_loop():
+            await self.clients.aclose()
+    
+    def _openai_client(self):
+        """Import openai and set up the client on first use; None with a v0.x package."""
+        
+        if self.openai_version is None:
+            import openai
+            
+            api_key = os.getenv('OPENAI_API_KEY')
+            if hasattr(openai, 'OpenAI'):
+                self.client = self.clients.client(api_key)
+                self.openai_version = "new"
+            else:
+                openai.api_key = api_key
+                self.openai_version = "legacy"
+        return self.client
+    
+    def _get_async_state(self) -> Dict[str, Any]:
+        
+        # The client, semaphore and limiter belong to one event loop; rebuild
+        # them when called from a new one (e.g. a second asyncio.run).
+        import asyncio
+        
+        loop = asyncio.get_running_loop()
+        if self._async_state is None or self._async_state['loop'] is not loop:
+            from rate_limiter import RateLimiter
+            
+            owns_pool = not self.clients.async_pool_open()
+            self._async_state = {
+                'loop': loop,
+                'owns_pool': owns_pool,
+                'client': self.clients.async_client(os.getenv('OPENAI_API_KEY'), max_retries=0),
+                'semaphore': asyncio.Semaphore(self.max_concurrency),
+                'limiter': RateLimiter(self.requests_per_minute, self.tokens_per_minute)
+            }
+        return self._async_state
+    
+    async def _agenerate_ai_summary(self, prompt: str) -> str:
+        
+        summary_content, _ = await self._aai_summary(prompt)
+        return summary_content if summary_content is not None else self._generate_template_summary({})
+    
+    async def _aai_summary(self, prompt: str, deadline_at: Optional[float] = None,
+                           hedge_after: Optional[float] = None) -> Tuple[Optional[str], str]:
+        
+        import asyncio
+        
+        try:
+            self._openai_client()
+        except Exception as e:
+            self.instrumentation.log(f" OpenAI setup failed: {e} - using template")
+            self.instrumentation.count('llm_fallbacks')
+            return None, 'Template-Based (fallback)'
+        if self.openai_version != "new":
+            return await asyncio.to_thread(self._ai_summary, prompt, deadline_at, hedge_after)
+        
+        cache_key = self._response_cache_key(prompt)
+        cached = self._cached_response(cache_key)
+        if cached is not None:
+            return cached, 'AI-Enhanced (cached)'
+        
+        instrumentation = self.instrumentation
+        try:
+            if deadline_at is None and hedge_after is None:
+                return await self._arequest_ai_summary(prompt, cache_key), 'AI-Enhanced'
+            return await self._arace_ai_summary(prompt, cache_key, deadline_at, hedge_after)
+        except Exception as e:
+            instrumentation.log(f" OpenAI error: {e}")
+            instrumentation.log(" Using template fallback...")
+            instrumentation.count('llm_fallbacks')
+            return None, 'Template-Based (fallback)'
+    
+    async def _arequest_ai_summary(self, prompt: str, cache_key: str) -> str:
+        
+        import asyncio
+        from rate_limiter import backoff_delay
+        
+        instrumentation = self.instrumentation
+        state = self._get_async_state()
+        estimated_tokens = self._estimated_tokens(prompt)
+        
+        async with state['semaphore']:
+            for attempt in range(self.max_retries + 1):
+                await state['limiter'].acquire(estimated_tokens)
+                instrumentation.count('llm_requests')
+                started = time.perf_counter()
+                try:
+                    response = await state['client'].chat.completions.create(**self._chat_request(prompt))
+                except Exception as e:
+                    instrumentation.count('llm_errors')
+                    if attempt < self.max_retries and self._is_retryable(e):
+                        delay = self._retry_after(e) or backoff_delay(attempt)
+                        instrumentation.log(f" OpenAI error: {e} - retrying in {delay:.1f}s")
+                        instrumentation.count('llm_retries')
+                        await asyncio.sleep(delay)
+                        continue
+                    raise
+                
+                if response.usage is not None:
+                    state['limiter'].reconcile(estimated_tokens, response.usage.total_tokens)
                 result = response.choices[0].message.content.strip()
-                print(" OpenAI response received!")
+                self._record_response(response, time.perf_counter() - started)
+                self._store_response(cache_key, result)
                 return result
-                
-        except Exception as e:
-            print(f" OpenAI error: {e}")
-            print(" Using template fallback...")
-            return self._generate_template_summary({})
+    
+    async def _arace_ai_summary(self, prompt: str, cache_key: str, deadline_at: Optional[float],
+                                hedge_after: Optional[float]) -> Tuple[Optional[str], str]:
+        
+        import asyncio
+        
+        instrumentation = self.instrumentation
+        tasks = {asyncio.ensure_future(self._arequest_ai_summary(prompt, cache_key)): 'AI-Enhanced'}
+        hedge_at = time.perf_counter() + hedge_after if hedge_after is not None else None
+        error = None
+        
+        while tasks:
+            wake_times = [t for t in (deadline_at, hedge_at) if t is not None]
+            timeout = max(0.0, min(wake_times) - time.perf_counter()) if wake_times else None
+            done, _ = await asyncio.wait(tasks, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                method = tasks.pop(task)
+                if task.exception() is None:
+                    for loser in tasks:
+                        loser.cancel()
+                    if method == 'AI-Enhanced (hedged)':
+                        instrumentation.count('llm_hedge_wins')
+                    return task.result(), method
+                error = task.exception()
+            
+            now = time.perf_counter()
+            if hedge_at is not None and now >= hedge_at:
+                hedge_at = None
+                instrumentation.count('llm_hedges')
+                tasks[asyncio.ensure_future(self._arequest_ai_summary(prompt, cache_key))] = 'AI-Enhanced (hedged)'
+            elif deadline_at is not None and now >= deadline_at and tasks:
+                instrumentation.count('llm_deadline_misses')
+                instrumentation.log(" Deadline reached - using template while the API call finishes in the background")
+                # Kept referenced until done; aclose waits for (or cancels) them.
+                for task in tasks:
+                    self._background_tasks.add(task)
+                    task.add_done_callback(self._background_tasks.discard)
+                return None, 'Template-Based (deadline)'
+        
+        raise error
+    
+    @staticmethod
+    def _chat_request(prompt: str) -> Dict[str, Any]:
+        """Chat completion parameters for one summary prompt, as sent directly or in a batch."""
+        
+        return {
+            'model': MODEL,
+            'messages': [
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": prompt}
+            ],
+            'max_tokens': MAX_TOKENS,
+            'temperature': TEMPERATURE
+        }
+    
+    def _estimated_tokens(self, prompt: str) -> int:
+        """Upper bound on the tokens one request uses, for rate limiting before the real usage is known."""
+        
+        counter = self._get_prompt_builder().counter
+        return counter.count_messages(self._chat_request(prompt)['messages']) + MAX_TOKENS
+    
+    def _response_cache_key(self, prompt: str) -> str:
+        
+        return ResponseCache.make_key(SYSTEM_PROMPT, prompt, MODEL, MAX_TOKENS, TEMPERATURE)
+    
+    def _cached_response(self, cache_key: str) -> Optional[str]:
+        
+        if self.response_cache is None or self.bypass_cache:
+            return None
+        cached = self.response_cache.get(cache_key)
+        if cached is not None:
+            self.instrumentation.count('llm_cache_hits')
+            self.instrumentation.log(" Cache hit - reusing stored OpenAI response")
+        else:
+            self.instrumentation.count('llm_cache_misses')
+        return cached
+    
+    def _record_response(self, response, latency: float):
+        
+        self.instrumentation.observe('llm_latency_seconds', latency)
+        usage = getattr(response, 'usage', None)
+        if usage is not None:
+            self.instrumentation.count('llm_tokens_in', usage.prompt_tokens or 0)
+            self.instrumentation.count('llm_tokens_out', usage.completion_tokens or 0)
+    
+    def _store_response(self, cache_key: str, response: str):
+        
+        if self.response_cache is not None:
+            self.response_cache.put(cache_key, response, MODEL)
+    
+    @staticmethod
+    def _is_retryable(error: Exception) -> bool:
+        
+        import openai
+        
+        if isinstance(error, openai.APIConnectionError):
+            return True
+        status = getattr(error, 'status_code', None)
+        return status == 429 or (status is not None and status >= 500)
+    
+    @staticmethod
+    def _retry_after(error: Exception) -> Optional[float]:
+        
+        response = getattr(error, 'response', None)
+        value = response.headers.get('retry-after') if response is not None else None
+        try:
+            return float(value) if value is not None else None
+        except ValueError:
+            return None
 
     def _create_advanced_prompt(self, analysis: Dict[str, Any]) -> str:
         
+        built = self._get_prompt_builder().build(analysis)
+        self.instrumentation.observe('prompt_tokens', built['tokens'])
+        estimated = '' if built['exact'] else ', estimated'
+        self.instrumentation.log(f" Prompt: {built['tokens']} tokens (budget {built['budget']}{estimated})")
+        return built['prompt']
+    
+    def _get_prompt_builder(self) -> PromptBuilder:
         
-        subjects = analysis.get('subjects', {}).get('subjects_identified', [])
-        action_items = analysis.get('action_items', [])
-        teaching_moments = analysis.get('teaching_moments', [])
-        session_duration = analysis.get('session_metadata', {}).get('duration_minutes', 'Unknown')
-        
-        prompt = f"""
-ROLE: You are Dr. Varsha Meda, Ph.D. in Learning Sciences with 15+ years of experience in educational psychology and family communication. You specialize in translating complex educational assessments into actionable insights for parents.
-
-TASK: Create a professional email summary for parents about their child's tutoring session.
-
-SESSION DATA:
-- Duration: {session_duration} minutes
-- Subjects Covered: {', '.join(subjects) if subjects else 'General academic support'}
-- Action Items Identified: {len(action_items)}
-- Teaching Moments: {len(teaching_moments)}
-
-SPECIFIC CONTENT TO INCLUDE:
-1. Action Items Found: {action_items[:3] if action_items else ['Continue regular practice', 'Review today\'s concepts']}
-2. Key Learning Areas: {subjects[:3] if subjects else ['Problem-solving', 'Study skills']}
-
-COMMUNICATION FRAMEWORK:
-- Use warm, professional tone that builds parent confidence
-- Apply growth mindset language (effort-focused praise)
-- Include specific, actionable next steps
-- Balance challenges with achievements
-- Use educational terminology appropriately for parent audience
-
-STRUCTURE:
-1. Subject Line (engaging, positive)
-2. Warm opening acknowledging partnership
-3. Session highlights with specific evidence
-4. Academic progress observations
-5. Concrete action items for home support
-6. Encouraging close that reinforces growth potential
-
-CONSTRAINTS:
-- 400-500 words maximum
-- Professional email format
-- Evidence-based observations only
-- No generic praise - be specific
-- Include pedagogical best practices naturally
-
-Generate the complete parent email now:
-"""
-        return prompt
+        if self._prompt_builder is None:
+            self._prompt_builder = PromptBuilder(SYSTEM_PROMPT, MODEL, self.prompt_token_budget)
+        return self._prompt_builder
 
     def _generate_template_summary(self, analysis: Dict[str, Any]) -> str:
         
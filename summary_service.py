@@ -0,0 +1,294 @@
+import asyncio
+import json
+import os
+import signal
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from analysis_cache import AnalysisCache
+from instrumentation import Instrumentation
+from summary_generator import EducationalSummaryGenerator
+from transcript_analyzer import EducationalTranscriptAnalyzer
+from turn_table import json_default
+
+MAX_BODY_BYTES = 16 * 1024 * 1024
+MAX_HEADER_LINES = 100
+KEEP_ALIVE_SECONDS = 30.0
+STATUS_TEXT = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed', 411: 'Length Required',
+               413: 'Payload Too Large', 429: 'Too Many Requests', 431: 'Request Header Fields Too Large',
+               500: 'Internal Server Error'}
+
+_worker_analyzer: Optional[EducationalTranscriptAnalyzer] = None
+
+
+def _init_worker(cache_path: Optional[str] = None):
+    global _worker_analyzer
+    cache = AnalysisCache(cache_path) if cache_path else None
+    _worker_analyzer = EducationalTranscriptAnalyzer(quiet=True, cache=cache)
+
+
+def _worker_ready() -> bool:
+    return _worker_analyzer is not None
+
+
+def _analyze_text(text: str) -> str:
+    # JSON crosses the process boundary cheaper than the pickled turn tables.
+    return json.dumps(_worker_analyzer.analyze_transcript(text), default=json_default)
+
+
+class ServiceOverloaded(Exception):
+    pass
+
+
+class _HTTPError(Exception):
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class _Lane:
+    """Bounded admission for one kind of work: at most ``capacity`` requests running or waiting."""
+
+    def __init__(self, name: str, capacity: int):
+        self.name = name
+        self.capacity = capacity
+        self.pending = 0
+
+    @contextmanager
+    def admit(self) -> Iterator[None]:
+        if self.pending >= self.capacity:
+            raise ServiceOverloaded(f"{self.name} queue is full ({self.capacity} requests)")
+        self.pending += 1
+        try:
+            yield
+        finally:
+            self.pending -= 1
+
+
+class SummaryService:
+    """Long-running HTTP service for transcript analysis and parent summaries.
+
+    ``POST /analyze`` and ``POST /summarize`` take a transcript as the raw
+    body or as JSON ``{"transcript": ..., "deadline": ..., "hedge_after": ...}``
+    (the timing options may also be query parameters). Analysis runs in a
+    pool of worker processes, each with a warm analyzer; summaries share one
+    generator, so its API client, connection pool, concurrency limit and
+    rate limiter serve every request. Each endpoint admits at most its
+    running capacity plus ``queue_size`` requests and answers 429 with
+    Retry-After beyond that, so overload never piles up unbounded work.
+    ``GET /health`` reports queue depths and ``GET /metrics`` the
+    instrumentation in Prometheus format.
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 8080, workers: Optional[int] = None,
+                 queue_size: int = 64, generator: Optional[EducationalSummaryGenerator] = None,
+                 cache_path: Optional[str] = None, retry_after: float = 1.0):
+        self.host = host
+        self.port = port
+        self.workers = workers or os.cpu_count() or 1
+        self.queue_size = queue_size
+        self.cache_path = cache_path
+        self.retry_after = retry_after
+        self.generator = generator or EducationalSummaryGenerator(instrumentation=Instrumentation(silent=True))
+        self.instrumentation = self.generator.instrumentation
+        self.analysis_lane = _Lane('analysis', self.workers + queue_size)
+        self.summary_lane = _Lane('summary', self.generator.max_concurrency + queue_size)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._connections = set()
+
+    @property
+    def url(self) -> str:
+        return f'http://{self.host}:{self.port}'
+
+    async def start(self) -> 'SummaryService':
+        self._pool = ProcessPoolExecutor(self.workers, initializer=_init_worker, initargs=(self.cache_path,))
+        # Start every worker (and build its analyzer) now rather than on the first requests.
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(self._pool, _worker_ready) for _ in range(self.workers)))
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def serve_forever(self):
+        """Serve until SIGINT or SIGTERM, then close."""
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signum, stop.set)
+        try:
+            await stop.wait()
+        finally:
+            await self.close()
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            for writer in list(self._connections):
+                writer.close()
+            await self._server.wait_closed()
+            self._server = None
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+        await self.generator.aclose()
+        await self.generator.clients.aclose()
+
+    async def analyze(self, text: str) -> str:
+        """The analysis of ``text`` as JSON, computed in the worker pool."""
+        with self.analysis_lane.admit(), self.instrumentation.stage('service.analysis'):
+            return await asyncio.get_running_loop().run_in_executor(self._pool, _analyze_text, text)
+
+    async def summarize(self, text: str, deadline: Optional[float] = None,
+                        hedge_after: Optional[float] = None) -> Dict[str, Any]:
+        # The deadline covers analysis too; the generator gets what remains of it.
+        started = time.perf_counter()
+        with self.summary_lane.admit():
+            analysis = json.loads(await self.analyze(text))
+            if deadline is not None:
+                deadline = max(0.0, deadline - (time.perf_counter() - started))
+            result = await self.generator.asummarize_analysis(analysis, deadline, hedge_after)
+        return {'summary_content': result['summary_content'], 'method': result['method'], 'timestamp': result['timestamp']}
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._connections.add(writer)
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(self._read_request(reader), KEEP_ALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    break
+                except _HTTPError as e:
+                    # The rest of the request cannot be trusted; answer and drop the connection.
+                    writer.write(self._response(e.status, {'error': str(e)}, keep_alive=False))
+                    await writer.drain()
+                    break
+                if request is None:
+                    break
+
+                method, target, headers, body = request
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                started = time.perf_counter()
+                status, payload, extra_headers = await self._dispatch(method, target, headers, body)
+                self.instrumentation.count('http_requests')
+                self.instrumentation.observe('http_request_seconds', time.perf_counter() - started)
+                writer.write(self._response(status, payload, keep_alive, extra_headers))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self._connections.discard(writer)
+            writer.close()
+
+    @staticmethod
+    async def _read_request(reader: asyncio.StreamReader) -> Optional[Tuple[str, str, Dict[str, str], bytes]]:
+        line = await reader.readline()
+        if not line.strip():
+            return None
+        try:
+            method, target, _ = line.decode('latin-1').split(' ', 2)
+        except ValueError:
+            raise _HTTPError(400, "malformed request line")
+
+        headers = {}
+        lines = 0
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            lines += 1
+            if lines > MAX_HEADER_LINES:
+                raise _HTTPError(431, f"more than {MAX_HEADER_LINES} header lines")
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        if 'transfer-encoding' in headers:
+            raise _HTTPError(411, "chunked request bodies are not supported; send Content-Length")
+        length = headers.get('content-length') or '0'
+        if not (length.isascii() and length.isdigit()):
+            raise _HTTPError(400, "Content-Length must be a non-negative integer")
+        length = int(length)
+        if length > MAX_BODY_BYTES:
+            raise _HTTPError(413, f"request body over {MAX_BODY_BYTES} bytes")
+        body = await reader.readexactly(length) if length else b''
+        return method.upper(), target, headers, body
+
+    async def _dispatch(self, method: str, target: str, headers: Dict[str, str], body: bytes):
+        url = urlsplit(target)
+        path = url.path.rstrip('/') or '/'
+        try:
+            if path == '/health' and method == 'GET':
+                return 200, self._health(), None
+            if path == '/metrics' and method == 'GET':
+                return 200, self.instrumentation.to_prometheus(), None
+            if path not in ('/analyze', '/summarize'):
+                raise _HTTPError(404, f"unknown path {path}")
+            if method != 'POST':
+                raise _HTTPError(405, f"{path} takes POST")
+
+            text, options = self._parse_body(headers, body, parse_qs(url.query))
+            if path == '/analyze':
+                return 200, (await self.analyze(text)).encode('utf-8'), None
+            return 200, await self.summarize(text, options.get('deadline'), options.get('hedge_after')), None
+        except ServiceOverloaded as e:
+            self.instrumentation.count('http_rejected')
+            return 429, {'error': str(e)}, {'Retry-After': f'{self.retry_after:g}'}
+        except _HTTPError as e:
+            return e.status, {'error': str(e)}, None
+        except Exception as e:
+            self.instrumentation.count('http_errors')
+            return 500, {'error': f'{type(e).__name__}: {e}'}, None
+
+    @staticmethod
+    def _parse_body(headers: Dict[str, str], body: bytes, query: Dict[str, Any]) -> Tuple[str, Dict[str, float]]:
+        options = {name: values[-1] for name, values in query.items()}
+        if headers.get('content-type', '').startswith('application/json'):
+            try:
+                request = json.loads(body)
+            except ValueError as e:
+                raise _HTTPError(400, f"invalid JSON: {e}")
+            if not isinstance(request, dict) or not isinstance(request.get('transcript'), str):
+                raise _HTTPError(400, 'JSON body needs a "transcript" string')
+            text = request['transcript']
+            options.update((name, request[name]) for name in ('deadline', 'hedge_after') if request.get(name) is not None)
+        else:
+            try:
+                text = body.decode('utf-8-sig')
+            except UnicodeDecodeError:
+                raise _HTTPError(400, "transcript is not UTF-8")
+
+        try:
+            timing = {name: float(options[name]) for name in ('deadline', 'hedge_after') if name in options}
+        except (TypeError, ValueError):
+            raise _HTTPError(400, "deadline and hedge_after are seconds")
+        return text, timing
+
+    def _health(self) -> Dict[str, Any]:
+        return {
+            'status': 'ok',
+            'workers': self.workers,
+            'use_ai': self.generator.use_ai,
+            'analysis_pending': self.analysis_lane.pending,
+            'analysis_capacity': self.analysis_lane.capacity,
+            'summary_pending': self.summary_lane.pending,
+            'summary_capacity': self.summary_lane.capacity
+        }
+
+    @staticmethod
+    def _response(status: int, payload: Any, keep_alive: bool = True, headers: Optional[Dict[str, str]] = None) -> bytes:
+        if isinstance(payload, bytes):
+            body, content_type = payload, 'application/json'
+        elif isinstance(payload, str):
+            body, content_type = payload.encode('utf-8'), 'text/plain; version=0.0.4'
+        else:
+            body, content_type = json.dumps(payload).encode('utf-8'), 'application/json'
+        lines = [f'HTTP/1.1 {status} {STATUS_TEXT.get(status, "")}', f'Content-Type: {content_type}',
+                 f'Content-Length: {len(body)}', f'Connection: {"keep-alive" if keep_alive else "close"}']
+        lines.extend(f'{name}: {value}' for name, value in (headers or {}).items())
+        return ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + body
@@ -0,0 +1,246 @@
+import os
+import time
+from typing import Any, AsyncIterator, Dict, Iterator, Optional, TextIO, Tuple, Union
+
+StreamSink = Union[str, os.PathLike, TextIO, None]
+
+
+class _SummaryStreamBase:
+
+    def __init__(self, generator, transcript_file: str, sink: StreamSink = None):
+        self.generator = generator
+        self.instrumentation = generator.instrumentation
+        self.transcript_file = transcript_file
+        self.sink = sink
+        self.result: Optional[Dict[str, Any]] = None
+        # Seconds from the start of iteration to the first delta.
+        self.time_to_first_token: Optional[float] = None
+        self.total_tokens: Optional[int] = None
+        self._handle: Optional[TextIO] = None
+        self._parts = []
+        self._analysis = None
+        self._duplicate = None
+        # (summary, method) when no request is needed: near-duplicate, cached or template.
+        self._ready: Optional[Tuple[str, str]] = None
+        self._cache_key = None
+        self._started = None
+        self._requested = None
+
+    def _start(self) -> Optional[str]:
+        """Open the sink and load the analysis; returns the prompt, or None when ``_ready`` holds the summary."""
+        if self._started is not None:
+            raise RuntimeError("a summary stream can only be iterated once")
+        self._started = time.perf_counter()
+        if isinstance(self.sink, (str, os.PathLike)):
+            self._handle = open(self.sink, 'w', encoding='utf-8')
+        elif self.sink is not None:
+            self._handle = self.sink
+
+        generator = self.generator
+        self._analysis, self._duplicate = generator._load_deduplicated(self.transcript_file)
+        summary, method = generator._reused_summary(self._duplicate)
+        if summary is not None:
+            self._ready = summary, method
+            return None
+        if not generator.use_ai:
+            with self.instrumentation.stage('summary.template'):
+                self._ready = self._template(), 'Template-Based'
+            return None
+
+        with self.instrumentation.stage('summary.prompt'):
+            prompt = generator._create_advanced_prompt(self._analysis)
+        self._cache_key = generator._response_cache_key(prompt)
+        cached = generator._cached_response(self._cache_key)
+        if cached is not None:
+            self._ready = cached, 'AI-Enhanced (cached)'
+            return None
+        return prompt
+
+    def _emit(self, delta: str) -> str:
+        if self.time_to_first_token is None:
+            self.time_to_first_token = time.perf_counter() - self._started
+            self.instrumentation.observe('summary_time_to_first_token_seconds', self.time_to_first_token)
+        self._parts.append(delta)
+        if self._handle is not None:
+            self._handle.write(delta)
+            self._handle.flush()
+        return delta
+
+    def _template(self) -> str:
+        return self.generator._generate_template_summary(self._analysis)
+
+    def _v0_summary(self, prompt: str) -> Tuple[str, str]:
+        # v0.x clients: no streaming; the summary and method come from the blocking path, fallback included.
+        summary, method = self.generator._ai_summary(prompt)
+        return (summary, method) if summary is not None else (self._template(), method)
+
+    def _fallback(self, error: Exception) -> str:
+        self.instrumentation.log(f" OpenAI error: {error}")
+        self.instrumentation.log(" Using template fallback...")
+        self.instrumentation.count('llm_errors')
+        self.instrumentation.count('llm_fallbacks')
+        return self._template()
+
+    def _record_chunk(self, chunk) -> Optional[str]:
+        """The chunk's text delta, if any; the final chunk's usage is counted."""
+        if getattr(chunk, 'usage', None) is not None:
+            self.total_tokens = chunk.usage.total_tokens
+            self.instrumentation.count('llm_tokens_in', chunk.usage.prompt_tokens or 0)
+            self.instrumentation.count('llm_tokens_out', chunk.usage.completion_tokens or 0)
+        if chunk.choices:
+            return chunk.choices[0].delta.content or None
+        return None
+
+    def _finish(self, method: str, cache_key: Optional[str] = None, error: Optional[Exception] = None):
+        summary_content = ''.join(self._parts).strip()
+        if cache_key is not None and error is None and summary_content:
+            self.instrumentation.observe('llm_latency_seconds', time.perf_counter() - self._requested)
+            self.generator._store_response(cache_key, summary_content)
+        if isinstance(self.sink, (str, os.PathLike)) and self._handle is not None:
+            self._handle.close()
+        self.instrumentation.count('summaries_generated')
+
+        if error is None:
+            self.result = self.generator._deduplicated_result(self._duplicate, self._analysis, summary_content, method)
+        else:
+            # The stream broke after text was already delivered; keep what arrived, but do not index it.
+            self.result = self.generator._summary_result(self._analysis, summary_content, method)
+            self.result['error'] = str(error)
+            self.instrumentation.count('llm_errors')
+
+    def _stream_request(self, prompt: str) -> Dict[str, Any]:
+        self._requested = time.perf_counter()
+        self.instrumentation.count('llm_requests')
+        return {**self.generator._chat_request(prompt), 'stream': True, 'stream_options': {'include_usage': True}}
+
+
+class SummaryStream(_SummaryStreamBase):
+    """Iterator over the text deltas of one parent summary, from EducationalSummaryGenerator.stream_summary.
+
+    Template, cached and near-duplicate summaries arrive as a single delta.
+    If the API fails, or the stream breaks or ends empty, before the first
+    token the template summary is streamed instead; a stream that breaks
+    later keeps the text that arrived and sets ``result['error']``.
+    ``result`` is set once iteration finishes, with the same ``method``
+    labels as generate_summary.
+    """
+
+    def __iter__(self) -> Iterator[str]:
+        generator = self.generator
+        prompt = self._start()
+        if prompt is None:
+            summary, method = self._ready
+            yield self._emit(summary)
+            self._finish(method)
+            return
+        cache_key = self._cache_key
+
+        with self.instrumentation.stage('summary.llm'):
+            try:
+                generator._openai_client()
+                if generator.openai_version != "new":
+                    summary, method = self._v0_summary(prompt)
+                    yield self._emit(summary)
+                    self._finish(method)
+                    return
+                stream = generator.client.chat.completions.create(**self._stream_request(prompt))
+            except Exception as e:
+                yield self._emit(self._fallback(e))
+                self._finish('Template-Based (fallback)')
+                return
+
+            try:
+                for chunk in stream:
+                    delta = self._record_chunk(chunk)
+                    if delta:
+                        yield self._emit(delta)
+            except Exception as e:
+                if not self._parts:
+                    yield self._emit(self._fallback(e))
+                    self._finish('Template-Based (fallback)')
+                    return
+                self._finish('AI-Enhanced', cache_key, e)
+                return
+            finally:
+                stream.close()
+        if not ''.join(self._parts).strip():
+            yield self._emit(self._fallback(RuntimeError("the model returned an empty summary")))
+            self._finish('Template-Based (fallback)')
+            return
+        self._finish('AI-Enhanced', cache_key)
+
+
+class AsyncSummaryStream(_SummaryStreamBase):
+    """Async iterator over the text deltas of one parent summary, from astream_summary.
+
+    Shares the generator's concurrency limit, rate limiter and retry policy
+    with agenerate_summary; retries only happen before the first token.
+    """
+
+    async def __aiter__(self) -> AsyncIterator[str]:
+        import asyncio
+        from rate_limiter import backoff_delay
+
+        generator = self.generator
+        prompt = self._start()
+        if prompt is None:
+            summary, method = self._ready
+            yield self._emit(summary)
+            self._finish(method)
+            return
+        cache_key = self._cache_key
+
+        try:
+            generator._openai_client()
+        except Exception as e:
+            yield self._emit(self._fallback(e))
+            self._finish('Template-Based (fallback)')
+            return
+        if generator.openai_version != "new":
+            summary, method = await asyncio.to_thread(self._v0_summary, prompt)
+            yield self._emit(summary)
+            self._finish(method)
+            return
+
+        state = generator._get_async_state()
+        estimated_tokens = generator._estimated_tokens(prompt)
+        async with state['semaphore']:
+            with self.instrumentation.stage('summary.llm'):
+                for attempt in range(generator.max_retries + 1):
+                    await state['limiter'].acquire(estimated_tokens)
+                    try:
+                        stream = await state['client'].chat.completions.create(**self._stream_request(prompt))
+                        break
+                    except Exception as e:
+                        if attempt < generator.max_retries and generator._is_retryable(e):
+                            delay = generator._retry_after(e) or backoff_delay(attempt)
+                            self.instrumentation.log(f" OpenAI error: {e} - retrying in {delay:.1f}s")
+                            self.instrumentation.count('llm_errors')
+                            self.instrumentation.count('llm_retries')
+                            await asyncio.sleep(delay)
+                            continue
+                        yield self._emit(self._fallback(e))
+                        self._finish('Template-Based (fallback)')
+                        return
+
+                try:
+                    async for chunk in stream:
+                        delta = self._record_chunk(chunk)
+                        if delta:
+                            yield self._emit(delta)
+                except Exception as e:
+                    if not self._parts:
+                        yield self._emit(self._fallback(e))
+                        self._finish('Template-Based (fallback)')
+                        return
+                    self._finish('AI-Enhanced', cache_key, e)
+                    return
+                finally:
+                    await stream.close()
+        if self.total_tokens is not None:
+            state['limiter'].reconcile(estimated_tokens, self.total_tokens)
+        if not ''.join(self._parts).strip():
+            yield self._emit(self._fallback(RuntimeError("the model returned an empty summary")))
+            self._finish('Template-Based (fallback)')
+            return
+        self._finish('AI-Enhanced', cache_key)
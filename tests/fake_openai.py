@@ -0,0 +1,54 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from fake_llm_server import FakeLLMServer  # noqa: E402
+from instrumentation import Instrumentation  # noqa: E402
+from summary_generator import EducationalSummaryGenerator  # noqa: E402
+from transcript_analyzer import EducationalTranscriptAnalyzer  # noqa: E402
+
+TRANSCRIPT = os.path.join(ROOT, 'Tutoring_Transcript_File.txt')
+
+
+class FakeOpenAITestCase(unittest.TestCase):
+    """Each test gets its own FakeLLMServer and OPENAI_BASE_URL pointing at it; nothing reaches the real API.
+
+    The server's options are plain attributes read per request, so a test
+    can change them (``self.server.error_every = 1``) after setUp.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.analyzer = EducationalTranscriptAnalyzer(quiet=True)
+
+    def setUp(self):
+        self.server = FakeLLMServer(latency=0.0).start()
+        self.addCleanup(self.server.stop)
+        previous = os.environ.get('OPENAI_BASE_URL')
+        os.environ['OPENAI_BASE_URL'] = self.server.base_url
+        self.addCleanup(self._restore_base_url, previous)
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, True)
+
+    def generator(self, **options) -> EducationalSummaryGenerator:
+        options = {'use_ai': True, 'max_retries': 0, 'cache_path': None, 'requests_per_minute': None,
+                   'tokens_per_minute': None, 'instrumentation': Instrumentation(silent=True),
+                   'analyzer': self.analyzer, **options}
+        generator = EducationalSummaryGenerator(**options)
+        self.addCleanup(generator.close)
+        return generator
+
+    def template(self, generator: EducationalSummaryGenerator, result) -> str:
+        return generator._generate_template_summary(result['analysis']).strip()
+
+    @staticmethod
+    def _restore_base_url(previous):
+        if previous is None:
+            os.environ.pop('OPENAI_BASE_URL', None)
+        else:
+            os.environ['OPENAI_BASE_URL'] = previous
@@ -0,0 +1,92 @@
+import copy
+import json
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from fake_openai import ROOT, TRANSCRIPT
+
+from analysis_cache import AnalysisCache
+from instrumentation import Instrumentation
+from pattern_registry import PatternRegistry
+from transcript_analyzer import EducationalTranscriptAnalyzer
+from turn_table import json_default
+
+
+def as_json(result) -> str:
+    return json.dumps(result, default=json_default, sort_keys=True)
+
+
+class AnalysisCacheTest(unittest.TestCase):
+    """Analyses are served from the cache until the transcript or the patterns change."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, True)
+        self.cache = self.open_cache()
+
+    def open_cache(self, **options) -> AnalysisCache:
+        cache = AnalysisCache(os.path.join(self.directory, 'analyses.sqlite3'), **options)
+        self.addCleanup(cache.close)
+        return cache
+
+    def analyzer(self, **options) -> EducationalTranscriptAnalyzer:
+        return EducationalTranscriptAnalyzer(cache=self.cache, instrumentation=Instrumentation(silent=True), **options)
+
+    def copy_transcript(self, suffix: str = '') -> str:
+        path = os.path.join(self.directory, 'transcript.txt')
+        with open(TRANSCRIPT, encoding='utf-8') as source, open(path, 'w', encoding='utf-8') as target:
+            target.write(source.read() + suffix)
+        return path
+
+    def test_second_analysis_is_served_from_cache(self):
+        analyzer = self.analyzer()
+        first = analyzer.analyze_file(TRANSCRIPT)
+        second = analyzer.analyze_file(TRANSCRIPT)
+        self.assertEqual(analyzer.instrumentation.counters['analysis_cache_misses'], 1)
+        self.assertEqual(analyzer.instrumentation.counters['analysis_cache_hits'], 1)
+        self.assertEqual(as_json(second), as_json(first))
+
+
+    def test_second_text_analysis_is_served_from_cache(self):
+        analyzer = self.analyzer()
+        with open(TRANSCRIPT, encoding='utf-8') as handle:
+            text = handle.read()
+        first = analyzer.analyze_transcript(text)
+        self.assertEqual(as_json(analyzer.analyze_transcript(text)), as_json(first))
+        self.assertEqual(analyzer.instrumentation.counters['analysis_cache_hits'], 1)
+
+    def test_edited_transcript_misses(self):
+        analyzer = self.analyzer()
+        analyzer.analyze_file(self.copy_transcript())
+        analyzer.analyze_file(self.copy_transcript('\nTutor: One more thing before you go.\n'))
+        self.assertEqual(analyzer.instrumentation.counters['analysis_cache_misses'], 2)
+        self.assertNotIn('analysis_cache_hits', analyzer.instrumentation.counters)
+
+    def test_changed_patterns_miss(self):
+        self.analyzer().analyze_file(TRANSCRIPT)
+        with open(os.path.join(ROOT, 'patterns.json'), encoding='utf-8') as handle:
+            patterns = copy.deepcopy(json.load(handle))
+        patterns['educational_patterns']['subjects']['mathematics'].append('long division')
+        analyzer = self.analyzer(registry=PatternRegistry(patterns))
+        analyzer.analyze_file(TRANSCRIPT)
+        self.assertEqual(analyzer.instrumentation.counters['analysis_cache_misses'], 1)
+        self.assertNotIn('analysis_cache_hits', analyzer.instrumentation.counters)
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = self.open_cache(max_entries=2)
+        for key in ('a', 'b'):
+            cache.put_analysis(key, {'key': key})
+            time.sleep(0.01)
+        cache.get_analysis('a')
+        time.sleep(0.01)
+        cache.put_analysis('c', {'key': 'c'})
+        self.assertIsNone(cache.get_analysis('b'))
+        self.assertEqual(cache.get_analysis('a'), {'key': 'a'})
+        self.assertEqual(cache.get_analysis('c'), {'key': 'c'})
+
+
+if __name__ == '__main__':
+    unittest.main()
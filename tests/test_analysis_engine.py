@@ -0,0 +1,79 @@
+import json
+import os
+import sys
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from transcript_analyzer import EducationalTranscriptAnalyzer  # noqa: E402
+from turn_table import json_default  # noqa: E402
+
+GOLDEN_DIR = os.path.join(ROOT, 'tests', 'golden')
+FIXTURE_DIR = os.path.join(ROOT, 'tests', 'fixtures')
+
+
+def transcripts():
+    """(name, path) of every transcript with golden output."""
+    yield 'tutoring_transcript', os.path.join(ROOT, 'Tutoring_Transcript_File.txt')
+    for name in sorted(os.listdir(FIXTURE_DIR)):
+        yield os.path.splitext(name)[0], os.path.join(FIXTURE_DIR, name)
+
+
+def comparable(result) -> str:
+    """The analysis as JSON, without what was added after the golden output was recorded.
+
+    The golden files come from the analyzer before the single-pass engine;
+    the timeline section, the turns' ``seconds`` and the moments' ``turn``
+    positions were added later.
+    """
+    result = json.loads(json.dumps(result, default=json_default))
+    result.pop('timeline', None)
+    for turn in result['parsed_conversations']:
+        turn.pop('seconds', None)
+    for moment in result['learning_patterns']['specific_moments'] + result['teaching_strategies']['teaching_moments']:
+        moment.pop('turn', None)
+    return json.dumps(result, indent=1, ensure_ascii=False) + '\n'
+
+
+class AnalysisEngineGoldenTest(unittest.TestCase):
+    """The single-pass engine reproduces the pre-engine analyzer's output byte for byte."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.analyzer = EducationalTranscriptAnalyzer(quiet=True)
+
+    def golden(self, name: str) -> str:
+        with open(os.path.join(GOLDEN_DIR, f'{name}.json'), encoding='utf-8') as handle:
+            return handle.read()
+
+    def text(self, path: str) -> str:
+        # newline='' keeps CRLF line endings as the analyzer would see them from a client.
+        with open(path, encoding='utf-8-sig', newline='') as handle:
+            return handle.read()
+
+    def test_analyze_transcript(self):
+        for name, path in transcripts():
+            with self.subTest(name):
+                self.assertEqual(comparable(self.analyzer.analyze_transcript(self.text(path))), self.golden(name))
+
+    def test_lazy_result(self):
+        for name, path in transcripts():
+            with self.subTest(name):
+                result = self.analyzer.analyze_transcript(self.text(path), lazy=True)
+                self.assertEqual(comparable(result), self.golden(name))
+
+    def test_analyze_file(self):
+        for name, path in transcripts():
+            with self.subTest(name), open(path, encoding='utf-8-sig', newline='') as handle:
+                self.assertEqual(comparable(self.analyzer.analyze_file(handle)), self.golden(name))
+
+    def test_compact_turns(self):
+        analyzer = EducationalTranscriptAnalyzer(quiet=True, compact_turns=True)
+        for name, path in transcripts():
+            with self.subTest(name):
+                self.assertEqual(comparable(analyzer.analyze_transcript(self.text(path))), self.golden(name))
+
+
+if __name__ == '__main__':
+    unittest.main()
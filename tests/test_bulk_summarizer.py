@@ -0,0 +1,132 @@
+import hashlib
+import os
+import unittest
+from typing import Dict, List
+
+from fake_openai import TRANSCRIPT, FakeOpenAITestCase
+
+from bulk_summarizer import BulkSummarizer
+from job_ledger import FAILED, GENERATED, PROMPT_RENDERED, WRITTEN
+
+
+class BulkSummarizerTest(FakeOpenAITestCase):
+    """Resuming bulk runs from the job ledger after API failures and interruptions."""
+
+    def setUp(self):
+        super().setUp()
+        self.corpus = os.path.join(self.directory, 'corpus')
+        self.output = os.path.join(self.directory, 'summaries')
+        os.makedirs(self.corpus)
+        with open(TRANSCRIPT, encoding='utf-8-sig') as handle:
+            text = handle.read()
+        self.paths = []
+        for number in range(3):
+            path = os.path.join(self.corpus, f'session_{number}.txt')
+            self.write(path, f'{text}\nTutor: See you next week, session {number}.\n')
+            self.paths.append(path)
+
+    @staticmethod
+    def write(path: str, text: str):
+        with open(path, 'w', encoding='utf-8') as handle:
+            handle.write(text)
+
+    def run_bulk(self, max_attempts: int = 3, **generator_options) -> BulkSummarizer:
+        # An analyzer of its own, so the run's instrumentation counts its analyses.
+        generator = self.generator(analyzer=None, **generator_options)
+        summarizer = BulkSummarizer(self.output, generator, max_attempts=max_attempts)
+        self.addCleanup(summarizer.close)
+        summarizer.add(self.corpus)
+        self.counts = summarizer.run()
+        return summarizer
+
+    def jobs(self, summarizer: BulkSummarizer) -> Dict[str, Dict]:
+        return {os.path.basename(job['path']): job for job in summarizer.ledger.jobs()}
+
+    def outputs(self) -> List[str]:
+        return sorted(name for name in os.listdir(self.output) if name.endswith('_summary.txt'))
+
+    def test_resumes_failed_jobs_from_stored_prompts(self):
+        self.server.error_every = 1
+        failed = self.run_bulk()
+        self.assertEqual(self.counts[FAILED], 3)
+        prompts = {name: job['prompt'] for name, job in self.jobs(failed).items()}
+        self.assertTrue(all(prompts.values()))
+        self.assertEqual(self.outputs(), [])
+        failed.close()
+
+        self.server.error_every = 0
+        resumed = self.run_bulk()
+        self.assertEqual(self.counts[WRITTEN], 3)
+        self.assertEqual(len(self.outputs()), 3)
+        # Each job continued from its prompt: no transcript was analyzed again.
+        self.assertNotIn('transcripts_analyzed', resumed.instrumentation.counters)
+        for name, job in self.jobs(resumed).items():
+            self.assertEqual(job['prompt'], prompts[name])
+            self.assertEqual(job['method'], 'AI-Enhanced')
+
+    def test_failed_jobs_stop_after_max_attempts(self):
+        self.server.error_every = 1
+        self.run_bulk(max_attempts=1).close()
+        requests = self.server.stats['requests']
+        self.run_bulk(max_attempts=1)
+        self.assertEqual(self.counts[FAILED], 3)
+        self.assertEqual(self.server.stats['requests'], requests)
+
+    def test_template_run_resumes_ai_failures(self):
+        self.server.error_every = 1
+        self.run_bulk().close()
+        template = self.run_bulk(use_ai=False)
+        self.assertEqual(self.counts[WRITTEN], 3)
+        for name, job in self.jobs(template).items():
+            with open(os.path.join(self.output, job['output']), encoding='utf-8') as handle:
+                summary = handle.read()
+            analysis = self.analyzer.analyze_file(os.path.join(self.corpus, name))
+            self.assertEqual(summary, template.generator._generate_template_summary(analysis))
+            self.assertEqual(job['method'], 'Template-Based')
+
+    def test_edited_transcript_is_analyzed_again(self):
+        self.server.error_every = 1
+        failed = self.run_bulk()
+        hashes = {name: job['content_hash'] for name, job in self.jobs(failed).items()}
+        failed.close()
+        with open(self.paths[0], 'a', encoding='utf-8') as handle:
+            handle.write('Student: Can we do fractions next time?\n')
+
+        self.server.error_every = 0
+        resumed = self.run_bulk()
+        self.assertEqual(self.counts[WRITTEN], 3)
+        self.assertEqual(resumed.instrumentation.counters['transcripts_analyzed'], 1)
+        jobs = self.jobs(resumed)
+        self.assertNotEqual(jobs['session_0.txt']['content_hash'], hashes['session_0.txt'])
+        self.assertEqual(jobs['session_1.txt']['content_hash'], hashes['session_1.txt'])
+
+    def test_written_jobs_are_skipped_and_missing_files_rewritten(self):
+        self.run_bulk().close()
+        requests = self.server.stats['requests']
+        os.remove(os.path.join(self.output, 'session_1_summary.txt'))
+
+        self.run_bulk()
+        self.assertEqual(self.counts[WRITTEN], 3)
+        self.assertEqual(len(self.outputs()), 3)
+        self.assertEqual(self.server.stats['requests'], requests)
+
+    def test_generated_summary_is_written_without_calling_the_api(self):
+        interrupted = BulkSummarizer(self.output, self.generator())
+        interrupted.add(self.corpus)
+        # As if the run had died after the API answered but before the file was written.
+        for path in self.paths:
+            with open(path, 'rb') as handle:
+                digest = hashlib.sha256(handle.read()).hexdigest()
+            interrupted.ledger.update(path, PROMPT_RENDERED, content_hash=digest, prompt='stored prompt')
+            interrupted.ledger.update(path, GENERATED, summary='stored summary', method='AI-Enhanced')
+        interrupted.close()
+
+        self.run_bulk()
+        self.assertEqual(self.counts[WRITTEN], 3)
+        self.assertEqual(self.server.stats['requests'], 0)
+        with open(os.path.join(self.output, 'session_2_summary.txt'), encoding='utf-8') as handle:
+            self.assertEqual(handle.read(), 'stored summary')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+
+from fake_openai import ROOT, TRANSCRIPT
+
+from benchmarks.startup import imported_modules
+
+MAIN = os.path.join(ROOT, 'main.py')
+HEAVY_MODULES = ('openai', 'httpx', 'numpy', 'pydantic', 'dotenv')
+# Generous so a loaded CI machine does not flake; a module-level openai
+# import alone costs several hundred milliseconds.
+BUDGET_S = 1.0
+
+
+class StartupTest(unittest.TestCase):
+    """Imports and CLI runs that need no API must not pull in the heavy optional packages."""
+
+    def run_python(self, *args: str) -> subprocess.CompletedProcess:
+        return subprocess.run([sys.executable, *args], cwd=ROOT, check=True, capture_output=True, text=True)
+
+    def assert_light(self, *args: str):
+        started = time.perf_counter()
+        self.run_python(*args)
+        elapsed = time.perf_counter() - started
+        modules = imported_modules(self.run_python('-X', 'importtime', *args).stderr)
+        self.assertEqual([name for name in HEAVY_MODULES if name in modules], [])
+        self.assertLess(elapsed, BUDGET_S)
+
+    def test_import_transcript_analyzer(self):
+        self.assert_light('-c', 'import transcript_analyzer')
+
+    def test_import_summary_generator(self):
+        self.assert_light('-c', 'import summary_generator')
+
+    def test_help(self):
+        self.assert_light(MAIN, '--help')
+
+    def test_analyze(self):
+        self.assert_light(MAIN, 'analyze', '--quiet', TRANSCRIPT)
+
+    def test_template_summary(self):
+        with tempfile.TemporaryDirectory() as directory:
+            self.assert_light(MAIN, 'summarize', '--template', '--quiet', TRANSCRIPT,
+                              '-o', os.path.join(directory, 'summary.txt'))
+
+
+if __name__ == '__main__':
+    unittest.main()
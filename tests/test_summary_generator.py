@@ -0,0 +1,172 @@
+import asyncio
+import os
+import time
+import unittest
+
+from fake_openai import TRANSCRIPT, FakeOpenAITestCase
+
+from fake_llm_server import FakeLLMServer
+
+from rate_limiter import backoff_delay
+
+
+class RetryTest(FakeOpenAITestCase):
+    """The async pipeline's retries, backoff and concurrency cap against the fake API."""
+
+    def summarize(self, generator, count: int = 1):
+        return asyncio.run(generator.agenerate_many([TRANSCRIPT] * count))
+
+    def test_retries_server_errors(self):
+        # Requests 2, 4 and 6 fail; each is retried once and succeeds.
+        self.server.error_every = 2
+        generator = self.generator(max_retries=1, max_concurrency=1)
+        results = self.summarize(generator, 4)
+        self.assertEqual([result['method'] for result in results], ['AI-Enhanced'] * 4)
+        self.assertEqual(self.server.stats['requests'], 7)
+        self.assertEqual(generator.instrumentation.counters['llm_retries'], 3)
+
+    def test_waits_retry_after_then_gives_up(self):
+        self.server.rate_limit_every = 1
+        self.server.retry_after = 0.4
+        generator = self.generator(max_retries=2)
+        started = time.perf_counter()
+        result, = self.summarize(generator)
+        self.assertGreaterEqual(time.perf_counter() - started, 0.8)
+        self.assertEqual(result['method'], 'Template-Based (fallback)')
+        self.assertEqual(result['summary_content'], self.template(generator, result))
+        self.assertEqual(self.server.stats['rate_limited'], 3)
+        self.assertEqual(generator.instrumentation.counters['llm_retries'], 2)
+
+    def test_without_retries_falls_back_at_once(self):
+        self.server.error_every = 1
+        generator = self.generator(max_retries=0)
+        result, = self.summarize(generator)
+        self.assertEqual(result['method'], 'Template-Based (fallback)')
+        self.assertEqual(self.server.stats['requests'], 1)
+        self.assertNotIn('llm_retries', generator.instrumentation.counters)
+
+    def test_backoff_delay_grows_with_full_jitter(self):
+        for attempt, ceiling in ((0, 0.5), (1, 1.0), (3, 4.0), (10, 30.0)):
+            delays = [backoff_delay(attempt) for _ in range(200)]
+            self.assertTrue(all(0 <= delay <= ceiling for delay in delays), attempt)
+            self.assertGreater(max(delays), ceiling / 2)
+
+    def test_concurrency_is_capped(self):
+        self.server.latency = 0.05
+        results = self.summarize(self.generator(max_concurrency=2), 6)
+        self.assertEqual([result['method'] for result in results], ['AI-Enhanced'] * 6)
+        self.assertEqual(self.server.stats['max_in_flight'], 2)
+
+
+class SlowFirstServer(FakeLLMServer):
+    """Answers its first completion ``first_latency`` seconds late, the rest at once."""
+
+    first_latency = 1.5
+
+    def _chat_completion(self, request, count):
+        if count == 1:
+            time.sleep(self.first_latency)
+        return super()._chat_completion(request, count)
+
+
+class DeadlineTest(FakeOpenAITestCase):
+    """deadline and hedge_after against a slow fake API."""
+
+    def setUp(self):
+        super().setUp()
+        self.cache_path = os.path.join(self.directory, 'responses.sqlite3')
+
+    def slow_first_server(self):
+        server = SlowFirstServer(latency=0.0).start()
+        self.addCleanup(server.stop)
+        os.environ['OPENAI_BASE_URL'] = server.base_url
+        return server
+
+    def timed(self, function, *args, **kwargs):
+        started = time.perf_counter()
+        result = function(*args, **kwargs)
+        return result, time.perf_counter() - started
+
+    def warm_generator(self, **options):
+        generator = self.generator(**options)
+        generator._openai_client()  # Importing openai is not what is being timed.
+        return generator
+
+    def test_deadline_returns_template_and_fills_cache(self):
+        self.server.latency = 1.0
+        generator = self.warm_generator(cache_path=self.cache_path)
+        result, elapsed = self.timed(generator.generate_summary, TRANSCRIPT, deadline=0.3)
+        self.assertLess(elapsed, 0.8)
+        self.assertEqual(result['method'], 'Template-Based (deadline)')
+        self.assertEqual(result['summary_content'], self.template(generator, result))
+        self.assertEqual(generator.instrumentation.counters['llm_deadline_misses'], 1)
+
+        # close() waits for the late answer, which then serves the next call.
+        generator.close()
+        result = generator.generate_summary(TRANSCRIPT, deadline=0.3)
+        self.assertEqual(result['method'], 'AI-Enhanced (cached)')
+        self.assertEqual(self.server.stats['requests'], 1)
+
+    def test_answer_within_deadline_is_used(self):
+        result = self.warm_generator().generate_summary(TRANSCRIPT, deadline=5.0)
+        self.assertEqual(result['method'], 'AI-Enhanced')
+
+    def test_hedge_wins_over_slow_request(self):
+        server = self.slow_first_server()
+        generator = self.warm_generator()
+        result, elapsed = self.timed(generator.generate_summary, TRANSCRIPT, hedge_after=0.2)
+        self.assertLess(elapsed, 1.0)
+        self.assertEqual(result['method'], 'AI-Enhanced (hedged)')
+        self.assertIn('#2.', result['summary_content'])
+        self.assertEqual(server.stats['requests'], 2)
+        self.assertEqual(generator.instrumentation.counters['llm_hedge_wins'], 1)
+
+    def test_fast_answer_sends_no_hedge(self):
+        generator = self.warm_generator()
+        result = generator.generate_summary(TRANSCRIPT, hedge_after=1.0)
+        self.assertEqual(result['method'], 'AI-Enhanced')
+        self.assertEqual(self.server.stats['requests'], 1)
+        self.assertNotIn('llm_hedges', generator.instrumentation.counters)
+
+    def test_async_hedge_wins_over_slow_request(self):
+        self.slow_first_server()
+        generator = self.warm_generator()
+
+        async def run():
+            try:
+                return await generator.agenerate_summary(TRANSCRIPT, hedge_after=0.2)
+            finally:
+                await generator.aclose()
+        result, elapsed = self.timed(asyncio.run, run())
+        self.assertLess(elapsed, 1.0)
+        self.assertEqual(result['method'], 'AI-Enhanced (hedged)')
+        self.assertEqual(generator.instrumentation.counters['llm_hedge_wins'], 1)
+
+    def test_async_deadline_then_aclose_fills_cache(self):
+        self.server.latency = 1.0
+        generator = self.warm_generator(cache_path=self.cache_path)
+
+        async def run():
+            started = time.perf_counter()
+            result = await generator.agenerate_summary(TRANSCRIPT, deadline=0.3)
+            elapsed = time.perf_counter() - started
+            self.assertEqual(len(generator._background_tasks), 1)
+            await generator.aclose()
+            return result, elapsed
+        result, elapsed = asyncio.run(run())
+        self.assertLess(elapsed, 0.8)
+        self.assertEqual(result['method'], 'Template-Based (deadline)')
+        self.assertEqual(generator.generate_summary(TRANSCRIPT)['method'], 'AI-Enhanced (cached)')
+
+    def test_agenerate_many_returns_within_deadline(self):
+        self.server.latency = 3.0
+        generator = self.warm_generator()
+        results, elapsed = self.timed(asyncio.run, generator.agenerate_many([TRANSCRIPT] * 3, deadline=0.3))
+        self.assertLess(elapsed, 1.0)
+        self.assertEqual([result['method'] for result in results], ['Template-Based (deadline)'] * 3)
+        self.assertEqual(results[0]['summary_content'], self.template(generator, results[0]))
+        self.assertFalse(generator._background_tasks)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,132 @@
+import asyncio
+import json
+import unittest
+import warnings
+from typing import Any, Dict, Tuple
+
+from fake_openai import TRANSCRIPT, FakeOpenAITestCase
+
+from summary_service import MAX_HEADER_LINES, SummaryService
+from turn_table import json_default
+
+
+class SummaryServiceTest(FakeOpenAITestCase):
+    """SummaryService on an ephemeral port, summarizing through the fake API."""
+
+    def setUp(self):
+        super().setUp()
+        with open(TRANSCRIPT, encoding='utf-8-sig') as handle:
+            self.transcript = handle.read()
+
+    def serve(self, test, generator_options=None, **options):
+        """Run ``await test(service)`` against a started service, closing it afterwards."""
+        generator = self.generator(**(generator_options or {}))
+
+        async def run():
+            with warnings.catch_warnings():
+                # The fake API's thread is running when the worker pool forks; the workers never touch it.
+                warnings.filterwarnings('ignore', 'This process .* is multi-threaded', DeprecationWarning)
+                service = await SummaryService(port=0, workers=1, generator=generator, **options).start()
+            try:
+                return await test(service)
+            finally:
+                await service.close()
+        return asyncio.run(run())
+
+    @staticmethod
+    async def send(service: SummaryService, raw: bytes) -> Tuple[int, Dict[str, str], bytes]:
+        """Send one raw request on its own connection; (status, headers, body) of the response."""
+        reader, writer = await asyncio.open_connection(service.host, service.port)
+        try:
+            writer.write(raw)
+            await writer.drain()
+            head, _, body = (await asyncio.wait_for(reader.read(), 10)).partition(b'\r\n\r\n')
+        finally:
+            writer.close()
+        status_line, *lines = head.decode('latin-1').split('\r\n')
+        headers = {name.lower(): value.strip() for name, _, value in (line.partition(':') for line in lines)}
+        return int(status_line.split()[1]), headers, body
+
+    @classmethod
+    async def post(cls, service: SummaryService, path: str, payload: Any) -> Tuple[int, Dict[str, str], bytes]:
+        body = json.dumps(payload).encode('utf-8')
+        return await cls.send(service, b'POST %s HTTP/1.1\r\nContent-Type: application/json\r\n'
+                                       b'Content-Length: %d\r\nConnection: close\r\n\r\n%s' % (path.encode(), len(body), body))
+
+    def test_health(self):
+        async def test(service):
+            return await self.send(service, b'GET /health HTTP/1.1\r\nConnection: close\r\n\r\n')
+        status, _, body = self.serve(test)
+        self.assertEqual(status, 200)
+        health = json.loads(body)
+        self.assertEqual(health['status'], 'ok')
+        self.assertEqual(health['workers'], 1)
+        self.assertEqual(health['summary_pending'], 0)
+
+    def test_analyze_and_summarize(self):
+        async def test(service):
+            analyzed = await self.post(service, '/analyze', {'transcript': self.transcript})
+            summarized = await self.post(service, '/summarize', {'transcript': self.transcript})
+            return analyzed, summarized
+        (status, _, body), (summary_status, _, summary) = self.serve(test)
+        self.assertEqual(status, 200)
+        expected = json.loads(json.dumps(self.analyzer.analyze_transcript(self.transcript), default=json_default))
+        self.assertEqual(json.loads(body)['subject_analysis'], expected['subject_analysis'])
+        self.assertEqual(summary_status, 200)
+        self.assertEqual(json.loads(summary)['method'], 'AI-Enhanced')
+
+    def test_summary_deadline_answers_with_template(self):
+        self.server.latency = 2.0
+
+        async def test(service):
+            return await self.post(service, '/summarize', {'transcript': self.transcript, 'deadline': 0.5})
+        status, _, body = self.serve(test, {'cache_path': None})
+        self.assertEqual(status, 200)
+        self.assertEqual(json.loads(body)['method'], 'Template-Based (deadline)')
+
+    def test_full_summary_lane_answers_429(self):
+        # One summary may run and none may wait; the second is turned away while the first is with the API.
+        self.server.latency = 1.0
+
+        async def test(service):
+            first = asyncio.ensure_future(self.post(service, '/summarize', {'transcript': self.transcript}))
+            await asyncio.sleep(0.3)
+            second = await self.post(service, '/summarize', {'transcript': self.transcript})
+            return await first, second
+        (status, _, _), (rejected, headers, body) = self.serve(test, {'max_concurrency': 1}, queue_size=0, retry_after=2)
+        self.assertEqual(status, 200)
+        self.assertEqual(rejected, 429)
+        self.assertEqual(headers['retry-after'], '2')
+        self.assertIn('summary queue is full', json.loads(body)['error'])
+
+    def test_rejects_malformed_requests(self):
+        body = b'10:00 - student\nI get it now\n'
+        requests = {
+            'non-numeric Content-Length': (400, b'POST /analyze HTTP/1.1\r\nContent-Length: abc\r\n\r\n' + body),
+            'negative Content-Length': (400, b'POST /analyze HTTP/1.1\r\nContent-Length: -5\r\n\r\n' + body),
+            'exponent Content-Length': (400, b'POST /analyze HTTP/1.1\r\nContent-Length: 1e3\r\n\r\n' + body),
+            'non-ASCII Content-Length': (400, b'POST /analyze HTTP/1.1\r\nContent-Length: \xb2\r\n\r\n' + body),
+            'chunked body': (411, b'POST /analyze HTTP/1.1\r\nTransfer-Encoding: chunked\r\n\r\n'),
+            'too many header lines': (431, b'GET /health HTTP/1.1\r\n'
+                                      + b''.join(b'X-Header: %d\r\n' % i for i in range(MAX_HEADER_LINES + 1)) + b'\r\n'),
+            'unknown path': (404, b'GET /nowhere HTTP/1.1\r\nConnection: close\r\n\r\n'),
+            'wrong method': (405, b'GET /analyze HTTP/1.1\r\nConnection: close\r\n\r\n'),
+            'invalid JSON': (400, b'POST /analyze HTTP/1.1\r\nContent-Type: application/json\r\n'
+                             b'Content-Length: 1\r\nConnection: close\r\n\r\n{'),
+        }
+
+        async def test(service):
+            responses = {name: await self.send(service, raw) for name, (_, raw) in requests.items()}
+            healthy = await self.send(service, b'GET /health HTTP/1.1\r\nConnection: close\r\n\r\n')
+            return responses, healthy
+        responses, healthy = self.serve(test)
+        for name, (expected, _) in requests.items():
+            with self.subTest(name):
+                status, _, body = responses[name]
+                self.assertEqual(status, expected)
+                self.assertIn('error', json.loads(body))
+        self.assertEqual(healthy[0], 200)
+
+
+if __name__ == '__main__':
+    unittest.main()
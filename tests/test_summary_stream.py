@@ -0,0 +1,94 @@
+import asyncio
+import os
+import unittest
+
+from fake_openai import TRANSCRIPT, FakeOpenAITestCase
+
+
+class SummaryStreamTest(FakeOpenAITestCase):
+    """stream_summary and astream_summary, including their fallbacks, against the fake API."""
+
+    def stream(self, generator):
+        stream = generator.stream_summary(TRANSCRIPT)
+        return list(stream), stream.result
+
+    def astream(self, generator):
+        async def run():
+            stream = generator.astream_summary(TRANSCRIPT)
+            try:
+                return [delta async for delta in stream], stream.result
+            finally:
+                await generator.aclose()
+        return asyncio.run(run())
+
+    def both(self, generator_options=None):
+        """(deltas, result) from a sync and an async stream, each with a fresh generator."""
+        for name, run in (('sync', self.stream), ('async', self.astream)):
+            with self.subTest(name):
+                yield run(self.generator(**(generator_options or {})))
+
+    def test_streams_deltas_then_serves_cache(self):
+        cache_path = os.path.join(self.directory, 'responses.sqlite3')
+        deltas, result = self.stream(self.generator(cache_path=cache_path))
+        self.assertGreater(len(deltas), 1)
+        self.assertEqual(result['method'], 'AI-Enhanced')
+        self.assertEqual(''.join(deltas).strip(), result['summary_content'])
+        self.assertNotIn('error', result)
+
+        deltas, cached = self.stream(self.generator(cache_path=cache_path))
+        self.assertEqual(len(deltas), 1)
+        self.assertEqual(cached['method'], 'AI-Enhanced (cached)')
+        self.assertEqual(cached['summary_content'], result['summary_content'])
+        self.assertEqual(self.server.stats['requests'], 1)
+
+    def test_request_error_falls_back_to_template(self):
+        self.server.error_every = 1
+        for deltas, result in self.both():
+            self.assertEqual(result['method'], 'Template-Based (fallback)')
+            self.assertEqual(len(deltas), 1)
+            self.assertNotIn('error', result)
+
+    def test_break_before_first_token_falls_back_to_template(self):
+        self.server.stream_break_after = 0
+        for deltas, result in self.both():
+            self.assertEqual(result['method'], 'Template-Based (fallback)')
+            self.assertEqual(len(deltas), 1)
+            self.assertEqual(result['summary_content'], self.template(self.generator(), result))
+            self.assertNotIn('error', result)
+
+    def test_break_after_text_keeps_partial_summary(self):
+        self.server.stream_break_after = 3
+        cache_path = os.path.join(self.directory, 'responses.sqlite3')
+        for deltas, result in self.both({'cache_path': cache_path}):
+            self.assertEqual(result['method'], 'AI-Enhanced')
+            self.assertEqual(len(deltas), 3)
+            self.assertEqual(result['summary_content'], ''.join(deltas).strip())
+            self.assertIn('error', result)
+            # A broken stream is not cached.
+            self.assertIsNone(self.generator(cache_path=cache_path).response_cache.get(self.cache_key(result)))
+
+    def test_empty_stream_falls_back_and_is_not_cached(self):
+        self.server.reply = ''
+        cache_path = os.path.join(self.directory, 'responses.sqlite3')
+        for deltas, result in self.both({'cache_path': cache_path}):
+            self.assertEqual(result['method'], 'Template-Based (fallback)')
+            self.assertEqual(result['summary_content'], self.template(self.generator(), result))
+            self.assertIsNone(self.generator(cache_path=cache_path).response_cache.get(self.cache_key(result)))
+
+    def test_blocking_client_reports_its_fallback(self):
+        # Without streaming support the summary comes from the blocking path; its method is passed through.
+        self.server.error_every = 1
+        generator = self.generator()
+        generator._openai_client()
+        generator.openai_version = 'legacy'
+        deltas, result = self.stream(generator)
+        self.assertEqual(result['method'], 'Template-Based (fallback)')
+        self.assertEqual(result['summary_content'], self.template(generator, result))
+
+    def cache_key(self, result) -> str:
+        generator = self.generator()
+        return generator._response_cache_key(generator._create_advanced_prompt(result['analysis']))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from fake_openai import TRANSCRIPT
+
+from transcript_analyzer import EducationalTranscriptAnalyzer
+from turn_index import TurnIndex
+
+
+class TurnIndexTest(unittest.TestCase):
+    """Re-indexing and removing sessions replaces exactly their own turns."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.analyzer = EducationalTranscriptAnalyzer(quiet=True)
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, True)
+        with open(TRANSCRIPT, encoding='utf-8-sig') as handle:
+            self.text = handle.read()
+        self.paths = [self.write(f'session_{number}.txt', f'{self.text}\nTutor: Goodbye {number}.\n') for number in range(3)]
+        self.index = self.open_index()
+        for path in self.paths:
+            self.index.add(path)
+
+    def open_index(self) -> TurnIndex:
+        index = TurnIndex(os.path.join(self.directory, 'turns.sqlite3'), analyzer=self.analyzer)
+        self.addCleanup(index.close)
+        return index
+
+    def write(self, name: str, text: str) -> str:
+        path = os.path.join(self.directory, name)
+        with open(path, 'w', encoding='utf-8') as handle:
+            handle.write(text)
+        return path
+
+    def turn_counts(self, index: TurnIndex):
+        """Turns per session as indexed, and as each session's row says."""
+        indexed = {path: len(index.search(path=path, limit=None)) for path in self.paths}
+        recorded = {session['path']: session['turn_count'] for session in index.sessions()}
+        return indexed, recorded
+
+    def stored_turns(self, index: TurnIndex) -> int:
+        return index._conn.execute('SELECT COUNT(*) FROM turns').fetchone()[0]
+
+    def test_updated_session_replaces_only_its_turns(self):
+        self.write('session_1.txt', self.text + '\nStudent: One more question.\nTutor: Sure.\n')
+        self.assertEqual(self.index.add(self.paths[1]), 'updated')
+        indexed, recorded = self.turn_counts(self.index)
+        self.assertEqual(indexed, recorded)
+        self.assertEqual(self.stored_turns(self.index), sum(recorded.values()))
+        self.assertEqual(self.index.search(phrase='one more question')[0]['path'], self.paths[1])
+
+    def test_remove_deletes_only_its_turns(self):
+        self.assertTrue(self.index.remove(self.paths[0]))
+        self.assertFalse(self.index.remove(self.paths[0]))
+        self.assertEqual(self.index.search(path=self.paths[0]), [])
+        self.assertEqual(self.stored_turns(self.index), self.index.info()['turns'])
+        self.assertEqual(len(self.index.search(path=self.paths[2], limit=None)), self.index.sessions()[1]['turn_count'])
+
+    def test_index_without_turn_rowids_is_upgraded(self):
+        # An index built before sessions recorded first_turn and last_turn.
+        self.index._conn.execute('ALTER TABLE sessions DROP COLUMN first_turn')
+        self.index._conn.execute('ALTER TABLE sessions DROP COLUMN last_turn')
+        self.index.close()
+
+        index = self.open_index()
+        self.assertTrue(index.remove(self.paths[0]))
+        self.write('session_1.txt', self.text + '\nStudent: One more question.\n')
+        self.assertEqual(index.add(self.paths[1]), 'updated')
+        self.assertTrue(index.remove(self.paths[1]))
+        self.assertEqual(self.stored_turns(index), index.info()['turns'])
+        self.assertEqual(index.sessions()[0]['path'], self.paths[2])
+
+
+if __name__ == '__main__':
+    unittest.main()
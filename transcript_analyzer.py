@@ -1,143 +1,211 @@
 
-import re
-import json
-from typing import Dict, List, Any
-from datetime import datetime
+import hashlib
+import io
+import os
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Any, Optional, Tuple
+from analysis_cache import AnalysisCache, content_hash
+from analysis_result import AnalysisResult
+from analysis_engine import (AcademicPerformance, ActionItems, AnalysisEngine, LearningPatterns,
+                             SessionMetadata, StudentCondition, TeachingStrategies, Timeline, TurnScanner)
+from instrumentation import Instrumentation
+from pattern_registry import PatternRegistry, load_registry
+from turn_parser import TranscriptSource, open_lines
+from turn_table import TurnTable
+
+# Bump whenever a change to the analysis code alters its output, so cached
+# results from the previous version are not served.
+ANALYZER_VERSION = '5'
 
 class EducationalTranscriptAnalyzer:
    
     
-    def __init__(self):
-        self.educational_patterns = {
-            'subjects': {
-                'mathematics': ['math', 'ratio', 'median', 'formula', 'calculator', 'equation', 'algebra', 'geometry'],
-                'reading': ['reading', 'comprehension', 'kaplan', 'passage', 'section'],
-                'science': ['physics', 'chemistry', 'biology', 'force', 'formula'],
-                'test_prep': ['test', 'exam', 'preparation', 'score', 'practice']
-            },
-            'learning_indicators': {
-                'understanding': ['makes sense', 'oh yeah', 'i see', 'got it', 'understand', 'that works'],
-                'confusion': ['don\'t understand', 'confused', 'what', 'huh', 'wrong', 'not working'],
-                'effort': ['trying', 'working on', 'practicing', 'studying', 'i think'],
-                'confidence': ['i know', 'sure', 'confident', 'definitely', 'right']
-            },
-            'teaching_strategies': {
-                'scaffolding': ['let me help', 'step by step', 'break it down', 'think about it'],
-                'questioning': ['what do you think', 'how would you', 'why', 'can you help'],
-                'feedback': ['good job', 'well done', 'that\'s right', 'not quite', 'correct'],
-                'encouragement': ['you can do it', 'keep trying', 'almost there', 'good']
-            }
-        }
+    def __init__(self, quiet: bool = False, cache: Optional[AnalysisCache] = None, compact_turns: bool = False,
+                 instrumentation: Optional[Instrumentation] = None, registry: Optional[PatternRegistry] = None):
+        self.instrumentation = instrumentation if instrumentation is not None else Instrumentation()
+        if quiet:
+            self.quiet = True
+        self.cache = cache
+        # compact_turns stores parsed_conversations as a TurnTable instead of a list of dicts.
+        self.compact_turns = compact_turns
+        # Phrase lists come from the pattern registry (patterns.json), compiled once per process.
+        self.registry = registry or load_registry()
+        self.educational_patterns = self.registry.educational_patterns
+        self.stage_phrases = self.registry.stage_phrases
+        self.matcher = self.registry.matcher
+        self.pattern_fingerprint = self.registry.version
+        # Stored with indexed or cached results: changes with the analysis code or the registry.
+        self.analysis_version = f'{ANALYZER_VERSION}:{self.registry.version}'
     
-    def analyze_transcript(self, transcript_text: str) -> Dict[str, Any]:
+    @property
+    def quiet(self) -> bool:
+        """Suppresses console progress output; shared with the instrumentation's silent mode."""
         
+        return self.instrumentation.silent
+    
+    @quiet.setter
+    def quiet(self, value: bool):
+        self.instrumentation.silent = value
+    
+    def analyze_transcript(self, transcript_text: str, lazy: bool = False) -> Dict[str, Any]:
+        """Analyze transcript text; ``lazy=True`` returns an AnalysisResult computed on access."""
+        
+        if lazy:
+            # A cached analysis is already complete; a partial lazy one is never stored.
+            cached = self._load_cached(content_hash(transcript_text)) if self.cache is not None else None
+            self.instrumentation.count('transcripts_analyzed')
+            return cached if cached is not None else AnalysisResult(self, transcript_text)
+        
+        if self.cache is None:
+            return self._analyze_lines(io.StringIO(transcript_text))
+        return self._cached_analysis(content_hash(transcript_text), io.StringIO(transcript_text))
+    
+    def analyze_file(self, source: TranscriptSource) -> Dict[str, Any]:
+        """Analyze a transcript path or file object without reading it into memory first."""
         
-        print(" Analyzing transcript with educational expertise...")
+        if self.cache is not None and isinstance(source, (str, os.PathLike)):
+            return self._cached_analysis(self._file_hash(source), source)
         
+        with open_lines(source) as lines:
+            return self._analyze_lines(lines)
+    
+    def cache_key(self, transcript_hash: str) -> str:
         
-        parsed_conversations = self._parse_conversations(transcript_text)
+        return AnalysisCache.make_key(transcript_hash, ANALYZER_VERSION, self.pattern_fingerprint)
+    
+    def _cached_analysis(self, transcript_hash: str, source: TranscriptSource) -> Dict[str, Any]:
+        
+        result = self._load_cached(transcript_hash)
+        if result is not None:
+            self.instrumentation.count('transcripts_analyzed')
+            self.instrumentation.log(" Analysis loaded from cache")
+            self._report_analysis(result)
+            return result
+        
+        with open_lines(source) as lines:
+            result = self._analyze_lines(lines)
+        self.cache.put_analysis(self.cache_key(transcript_hash), result, ANALYZER_VERSION)
+        return result
+    
+    def _load_cached(self, transcript_hash: str) -> Optional[Dict[str, Any]]:
         
+        result = self.cache.get_analysis(self.cache_key(transcript_hash))
+        self.instrumentation.count('analysis_cache_hits' if result is not None else 'analysis_cache_misses')
+        if result is not None and self.compact_turns:
+            result['parsed_conversations'] = self.new_turn_table(result['parsed_conversations'])
+        return result
+    
+    @staticmethod
+    def _file_hash(path) -> str:
+        
+        digest = hashlib.sha256()
+        with open(path, 'rb') as handle:
+            for block in iter(lambda: handle.read(1 << 20), b''):
+                digest.update(block)
+        return digest.hexdigest()
+    
+    def _analyze_lines(self, lines: Iterable[str]) -> Dict[str, Any]:
         
-        session_metadata = self._extract_session_metadata(transcript_text)
+        instrumentation = self.instrumentation
+        instrumentation.log(" Analyzing transcript with educational expertise...")
         
         
-        subject_analysis = self._analyze_subjects(transcript_text)
-        learning_patterns = self._analyze_learning_patterns(parsed_conversations)
-        teaching_strategies = self._analyze_teaching_strategies(parsed_conversations)
+        # All sections are built in one pass over the lines; the staged
+        # _analyze_* methods below share the same section accumulators.
+        with instrumentation.stage('analysis.total'):
+            engine = AnalysisEngine(self)
+            with instrumentation.stage('analysis.traverse'):
+                engine.feed_lines(lines).close()
+            with instrumentation.stage('analysis.sections'):
+                result = engine.result()
         
-       
-        student_condition = self._assess_student_condition(parsed_conversations, transcript_text)
+        instrumentation.count('transcripts_analyzed')
+        self._record_engine(engine)
+        instrumentation.count('action_items', len(result['action_items']))
+        self._report_analysis(result)
+        return result
+    
+    def _record_engine(self, engine: AnalysisEngine):
         
-      
-        action_items = self._extract_action_items(transcript_text)
+        instrumentation = self.instrumentation
+        instrumentation.count('lines_read', engine.lines_read)
+        if engine.turns:
+            instrumentation.count('turns_parsed', len(engine.conversations))
+            instrumentation.count('keyword_hits', engine.keyword_hits)
+    
+    def _report_analysis(self, result: Dict[str, Any]):
         
-       
-        performance_indicators = self._analyze_academic_performance(parsed_conversations)
-        
-        
-        educational_insights = self._generate_educational_insights(
-            subject_analysis, learning_patterns, student_condition
-        )
-        
-        result = {
-            'session_metadata': session_metadata,
-            'subject_analysis': subject_analysis,
-            'learning_patterns': learning_patterns,
-            'teaching_strategies': teaching_strategies,
-            'student_condition': student_condition,
-            'action_items': action_items,
-            'performance_indicators': performance_indicators,
-            'educational_insights': educational_insights,
-            'parsed_conversations': parsed_conversations
-        }
+        if not self.instrumentation.silent:
+            print(f" Analysis complete - {len(result['parsed_conversations'])} conversation segments analyzed")
+            print(f"    Subjects identified: {', '.join(result['subject_analysis'].get('subjects_identified', []))}")
+            print(f"    Action items found: {len(result['action_items'])}")
+            print(f"    Teaching moments: {len(result['teaching_strategies'].get('teaching_moments', []))}")
+    
+    def new_turn_table(self, turns: Iterable[Dict[str, Any]] = ()) -> TurnTable:
         
-        print(f" Analysis complete - {len(parsed_conversations)} conversation segments analyzed")
-        print(f"    Subjects identified: {', '.join(subject_analysis.get('subjects_identified', []))}")
-        print(f"    Action items found: {len(action_items)}")
-        print(f"    Teaching moments: {len(teaching_strategies.get('teaching_moments', []))}")
+        return TurnTable(self.stage_phrases['educational_markers'], turns)
+    
+    def turn_table(self, source: TranscriptSource) -> TurnTable:
+        """Parse a transcript path, file object or line iterable straight into a TurnTable."""
         
-        return result
+        return self.new_turn_table(self.iter_conversations(source))
     
     def _parse_conversations(self, text: str) -> List[Dict[str, Any]]:
         
-        conversations = []
-        lines = text.split('\n')
-        
-        for line in lines:
-            line = line.strip()
-            
-            match = re.match(r'(\d+:\d+)\s*-\s*(student|tutor)', line, re.IGNORECASE)
-            if match:
-                timestamp = match.group(1)
-                speaker = match.group(2).lower()
-                
-                
-                content_start = line.lower().find(speaker) + len(speaker)
-                speech_content = line[content_start:].strip()
-                if speech_content.startswith('-'):
-                    speech_content = speech_content[1:].strip()
-                
-                conversations.append({
-                    'timestamp': timestamp,
-                    'speaker': speaker,
-                    'content': speech_content,
-                    'word_count': len(speech_content.split()) if speech_content else 0,
-                    'educational_markers': self._identify_educational_markers(speech_content)
-                })
-        
-        return conversations
-    
-    def _extract_session_metadata(self, text: str) -> Dict[str, Any]:
-        
-        metadata = {}
-        
-        
-        duration_match = re.search(r'Duration:\s*(\d+)\s*minutes', text, re.IGNORECASE)
-        if duration_match:
-            metadata['duration_minutes'] = int(duration_match.group(1))
+        return [conversation for conversation, _ in self._scan_turns(io.StringIO(text))]
+    
+    def iter_conversations(self, source: TranscriptSource) -> Iterator[Dict[str, Any]]:
+        """Lazily yield parsed turns from a transcript path, file object or line iterable."""
         
-       
-        if 'test preparation' in text.lower():
-            metadata['session_type'] = 'Test Preparation'
-            metadata['urgency_level'] = 'High'
+        with open_lines(source) as lines:
+            for conversation, _ in self._scan_turns(lines):
+                yield conversation
+    
+    def _scan_turns(self, lines: Iterable[str]) -> Iterator[Tuple[Dict[str, Any], FrozenSet[str]]]:
         
-        if 'day before test' in text.lower():
-            metadata['timing_context'] = 'Final preparation session'
-            metadata['pressure_level'] = 'High'
+        scanner = TurnScanner(self)
+        for line in lines:
+            completed = scanner.feed(line)
+            if completed is not None:
+                yield completed
         
+        completed = scanner.close()
+        if completed is not None:
+            yield completed
+    
+    def _build_conversation(self, turn: Dict[str, Any], phrases: FrozenSet[str]) -> Dict[str, Any]:
         
-        action_count = len(re.findall(r'ACTION ITEM:', text))
-        metadata['action_items_count'] = action_count
+        content = turn['content']
+        return {
+            'timestamp': turn['timestamp'],
+            'seconds': turn['seconds'],
+            'speaker': turn['speaker'],
+            'content': content,
+            'word_count': len(content.split()) if content else 0,
+            'educational_markers': self._identify_educational_markers(content, phrases)
+        }
+    
+    def _turn_phrases(self, conversations: List[Dict]) -> List[FrozenSet[str]]:
         
-        return metadata
+        return [self.matcher.phrases(c['content'].lower()) for c in conversations]
+    
+    def _extract_session_metadata(self, text: str, text_phrases: FrozenSet[str] = None) -> Dict[str, Any]:
+        
+        if text_phrases is None:
+            text_phrases = self.matcher.phrases(text.lower())
+        section = SessionMetadata(self)
+        for line in text.split('\n'):
+            section.add_line(line)
+        return section.result(text_phrases)
     
-    def _analyze_subjects(self, text: str) -> Dict[str, Any]:
+    def _analyze_subjects(self, text: str, text_phrases: FrozenSet[str] = None) -> Dict[str, Any]:
         
-        text_lower = text.lower()
+        if text_phrases is None:
+            text_phrases = self.matcher.phrases(text.lower())
+        found = self.matcher.categorize(text_phrases)
         subjects_found = {}
         
-        for subject, keywords in self.educational_patterns['subjects'].items():
-            matches = sum(1 for keyword in keywords if keyword in text_lower)
+        for subject in self.educational_patterns['subjects']:
+            matches = len(found.get(f'subjects.{subject}', []))
             if matches > 0:
                 subjects_found[subject] = {
                     'keyword_matches': matches,
@@ -147,11 +215,9 @@ class EducationalTranscriptAnalyzer:
       
         math_topics = []
         if 'mathematics' in subjects_found:
-            if 'ratio' in text_lower: math_topics.append('Ratios and Proportions')
-            if 'median' in text_lower: math_topics.append('Statistics and Data Analysis')
-            if 'histogram' in text_lower: math_topics.append('Data Visualization')
-            if 'formula' in text_lower: math_topics.append('Formula Application')
-            if 'calculator' in text_lower: math_topics.append('Computational Skills')
+            for topic in self.stage_phrases['mathematics_topics']:
+                if found.get(f'mathematics_topics.{topic}'):
+                    math_topics.append(topic)
         
         return {
             'subjects_identified': list(subjects_found.keys()),
@@ -160,202 +226,82 @@ class EducationalTranscriptAnalyzer:
             'primary_focus': max(subjects_found.keys(), key=lambda x: subjects_found[x]['keyword_matches']) if subjects_found else None
         }
     
-    def _analyze_learning_patterns(self, conversations: List[Dict]) -> Dict[str, Any]:
-        
-        student_conversations = [c for c in conversations if c['speaker'] == 'student']
-        
-        learning_indicators = {
-            'understanding_moments': 0,
-            'confusion_moments': 0,
-            'effort_indicators': 0,
-            'confidence_markers': 0
-        }
-        
-        specific_moments = []
-        
-        for conv in student_conversations:
-            content_lower = conv['content'].lower()
-            
-            
-            for indicator_type, keywords in self.educational_patterns['learning_indicators'].items():
-                for keyword in keywords:
-                    if keyword in content_lower:
-                        learning_indicators[f'{indicator_type}_moments'] += 1
-                        specific_moments.append({
-                            'timestamp': conv['timestamp'],
-                            'type': indicator_type,
-                            'context': conv['content'][:80] + "..." if len(conv['content']) > 80 else conv['content']
-                        })
-        
-        
-        total_words = sum(c['word_count'] for c in student_conversations)
-        avg_response_length = total_words / len(student_conversations) if student_conversations else 0
-        
-        engagement_level = 'high' if avg_response_length > 12 else 'medium' if avg_response_length > 6 else 'low'
-        
-        return {
-            'learning_indicators': learning_indicators,
-            'specific_moments': specific_moments,
-            'engagement_level': engagement_level,
-            'average_response_length': avg_response_length,
-            'total_student_responses': len(student_conversations)
-        }
+    def _analyze_learning_patterns(self, conversations: List[Dict], turn_phrases: List[FrozenSet[str]] = None) -> Dict[str, Any]:
+        
+        if turn_phrases is None:
+            turn_phrases = self._turn_phrases(conversations)
+        section = LearningPatterns(self)
+        for turn, (conv, phrases) in enumerate(zip(conversations, turn_phrases)):
+            if conv['speaker'] == 'student':
+                section.add(conv, self.matcher.categorize(phrases), turn)
+        return section.result()
     
-    def _analyze_teaching_strategies(self, conversations: List[Dict]) -> Dict[str, Any]:
-        
-        tutor_conversations = [c for c in conversations if c['speaker'] == 'tutor']
-        
-        strategy_usage = {
-            'scaffolding': 0,
-            'questioning': 0,
-            'feedback': 0,
-            'encouragement': 0
-        }
-        
-        teaching_moments = []
-        
-        for conv in tutor_conversations:
-            content_lower = conv['content'].lower()
-            
-            
-            for strategy, keywords in self.educational_patterns['teaching_strategies'].items():
-                for keyword in keywords:
-                    if keyword in content_lower:
-                        strategy_usage[strategy] += 1
-            
-            
-            if any(phrase in content_lower for phrase in ['think about it again', 'try this', 'let me explain']):
-                teaching_moments.append({
-                    'timestamp': conv['timestamp'],
-                    'strategy': 'Error Correction',
-                    'approach': 'Guided redirection'
-                })
-            
-            if any(phrase in content_lower for phrase in ['what do you think', 'how would you', 'why']):
-                teaching_moments.append({
-                    'timestamp': conv['timestamp'],
-                    'strategy': 'Socratic Questioning',
-                    'approach': 'Concept exploration'
-                })
-        
-        return {
-            'strategy_distribution': strategy_usage,
-            'teaching_moments': teaching_moments,
-            'dominant_approach': max(strategy_usage.keys(), key=lambda x: strategy_usage[x]) if any(strategy_usage.values()) else 'balanced',
-            'total_teaching_interventions': len(teaching_moments)
-        }
+    def _analyze_teaching_strategies(self, conversations: List[Dict], turn_phrases: List[FrozenSet[str]] = None) -> Dict[str, Any]:
+        
+        if turn_phrases is None:
+            turn_phrases = self._turn_phrases(conversations)
+        section = TeachingStrategies(self)
+        for turn, (conv, phrases) in enumerate(zip(conversations, turn_phrases)):
+            if conv['speaker'] == 'tutor':
+                section.add(conv, self.matcher.categorize(phrases), turn)
+        return section.result()
     
-    def _assess_student_condition(self, conversations: List[Dict], full_text: str) -> Dict[str, Any]:
-        
-        student_content = " ".join([c['content'] for c in conversations if c['speaker'] == 'student']).lower()
-        
-        condition = {
-            'health_status': 'normal',
-            'emotional_state': 'stable',
-            'engagement_level': 'moderate',
-            'confidence_level': 'developing',
-            'stress_indicators': []
-        }
-        
-        
-        if any(word in student_content for word in ['sick', 'doctor', 'steroids', 'inhalers']):
-            condition['health_status'] = 'recently_ill_but_attending'
-        
-       
-        response_count = len([c for c in conversations if c['speaker'] == 'student'])
-        if response_count > 25:
-            condition['engagement_level'] = 'high'
-        elif response_count > 15:
-            condition['engagement_level'] = 'medium'
-        else:
-            condition['engagement_level'] = 'low'
-        
-       
-        if any(phrase in student_content for phrase in ['makes sense', 'got it', 'understand']):
-            condition['confidence_level'] = 'building'
-        
-        if any(phrase in student_content for phrase in ['don\'t know', 'confused', 'wrong']):
-            condition['stress_indicators'].append('self_doubt')
-        
-        
-        if 'workout' in student_content and condition['health_status'] == 'recently_ill_but_attending':
-            condition['resilience_level'] = 'high'
-        
-        return condition
+    def _assess_student_condition(self, conversations: List[Dict], full_text: str, turn_phrases: List[FrozenSet[str]] = None) -> Dict[str, Any]:
+        
+        if turn_phrases is None:
+            turn_phrases = self._turn_phrases(conversations)
+        section = StudentCondition(self)
+        for conv, phrases in zip(conversations, turn_phrases):
+            if conv['speaker'] == 'student':
+                section.add(conv['content'].lower(), phrases)
+        return section.result()
     
     def _extract_action_items(self, text: str) -> List[Dict[str, Any]]:
         
-        action_items = []
-        lines = text.split('\n')
-        
-        for line in lines:
-            if 'ACTION ITEM:' in line:
-                description = line.split('ACTION ITEM:')[1].strip()
-                category = self._categorize_action_item(description)
-                priority = self._assess_action_priority(description)
-                
-                action_items.append({
-                    'description': description,
-                    'category': category,
-                    'priority': priority,
-                    'type': 'Academic' if 'practice' in description.lower() or 'review' in description.lower() else 'Logistical'
-                })
-        
-        return action_items
-    
-    def _categorize_action_item(self, description: str) -> str:
-        
-        desc_lower = description.lower()
-        
-        if any(word in desc_lower for word in ['practice', 'review', 'study', 'kaplan']):
-            return 'Academic Preparation'
-        elif any(word in desc_lower for word in ['wake up', 'leave', 'time']):
-            return 'Test Day Logistics'
-        elif any(word in desc_lower for word in ['charge', 'lay out', 'prepare']):
-            return 'Material Organization'
-        else:
-            return 'General Support'
-    
-    def _assess_action_priority(self, description: str) -> str:
-        
-        desc_lower = description.lower()
-        
-        if any(word in desc_lower for word in ['test tomorrow', 'wake up', 'leave house']):
-            return 'Critical'
-        elif any(word in desc_lower for word in ['practice', 'review']):
-            return 'High'
-        else:
-            return 'Medium'
-    
-    def _analyze_academic_performance(self, conversations: List[Dict]) -> Dict[str, Any]:
-       
-        all_content = " ".join([c['content'] for c in conversations]).lower()
-        
-        performance = {
-            'error_patterns': [],
-            'strength_areas': [],
-            'improvement_opportunities': [],
-            'conceptual_understanding': 'developing'
-        }
-        
-        
-        if 'calculator' in all_content and 'wrong' in all_content:
-            performance['error_patterns'].append('Calculator input errors')
+        section = ActionItems(self)
+        for line in text.split('\n'):
+            section.add_line(line)
+        return section.result()
+    
+    def _categorize_action_item(self, description: str, phrases: FrozenSet[str] = None) -> str:
         
-        if 'time' in all_content and 'running out' in all_content:
-            performance['error_patterns'].append('Time management challenges')
+        if phrases is None:
+            phrases = self.matcher.phrases(description.lower())
+        found = self.matcher.categorize(phrases)
         
-        if 'well done' in all_content:
-            performance['strength_areas'].append('Problem-solving accuracy')
+        for category in self.stage_phrases['action_categories']:
+            if found.get(f'action_categories.{category}'):
+                return category
+        return 'General Support'
+    
+    def _assess_action_priority(self, description: str, phrases: FrozenSet[str] = None) -> str:
         
-        if 'makes sense' in all_content:
-            performance['strength_areas'].append('Conceptual understanding')
+        if phrases is None:
+            phrases = self.matcher.phrases(description.lower())
+        found = self.matcher.categorize(phrases)
         
+        for priority in self.stage_phrases['action_priority']:
+            if found.get(f'action_priority.{priority}'):
+                return priority
+        return 'Medium'
+    
+    def _analyze_academic_performance(self, conversations: List[Dict], turn_phrases: List[FrozenSet[str]] = None) -> Dict[str, Any]:
        
-        if len(performance['error_patterns']) > 0:
-            performance['improvement_opportunities'].append('Strategic execution refinement')
-        
-        return performance
+        if turn_phrases is None:
+            turn_phrases = self._turn_phrases(conversations)
+        section = AcademicPerformance(self)
+        for conv, phrases in zip(conversations, turn_phrases):
+            section.add(conv['content'].lower(), phrases)
+        return section.result()
+    
+    def _analyze_timeline(self, conversations: List[Dict], turn_phrases: List[FrozenSet[str]] = None) -> Dict[str, Any]:
+        
+        if turn_phrases is None:
+            turn_phrases = self._turn_phrases(conversations)
+        section = Timeline(self)
+        for conv, phrases in zip(conversations, turn_phrases):
+            section.add(conv, self.matcher.categorize(phrases))
+        return section.result()
     
     def _generate_educational_insights(self, subject_analysis: Dict, learning_patterns: Dict, student_condition: Dict) -> Dict[str, Any]:
         
@@ -387,19 +333,14 @@ class EducationalTranscriptAnalyzer:
         
         return insights
     
-    def _identify_educational_markers(self, content: str) -> List[str]:
-        
-        markers = []
-        content_lower = content.lower()
+    def _identify_educational_markers(self, content: str, phrases: FrozenSet[str] = None) -> List[str]:
         
-        if any(word in content_lower for word in ['understand', 'makes sense']):
-            markers.append('comprehension')
-        if any(word in content_lower for word in ['confused', 'don\'t get']):
-            markers.append('confusion')
-        if any(word in content_lower for word in ['practice', 'study']):
-            markers.append('academic_preparation')
+        if phrases is None:
+            phrases = self.matcher.phrases(content.lower())
+        found = self.matcher.categorize(phrases)
         
-        return markers
+        return [marker for marker in self.stage_phrases['educational_markers']
+                if found.get(f'educational_markers.{marker}')]
 
 
 if __name__ == "__main__":
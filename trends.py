@@ -0,0 +1,213 @@
+import importlib.util
+import json
+import os
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from corpus_analyzer import CorpusSource, analyze_corpus
+from turn_index import session_date
+
+# numpy is optional: only the trend analytics need it.
+NUMPY_AVAILABLE = importlib.util.find_spec('numpy') is not None
+
+INDICATORS = ('understanding_moments', 'confusion_moments', 'effort_indicators', 'confidence_markers')
+STRATEGIES = ('scaffolding', 'questioning', 'feedback', 'encouragement')
+FEATURES = INDICATORS + STRATEGIES + ('average_response_length', 'engagement', 'student_responses',
+                                      'duration_minutes', 'action_items')
+ENGAGEMENT_SCORES = {'low': 0.0, 'medium': 1.0, 'moderate': 1.0, 'high': 2.0}
+REPORT_FEATURES = ('understanding_moments', 'confusion_moments', 'average_response_length', 'engagement')
+DEFAULT_WINDOW = 3
+MATRIX_NAME = 'features.npy'
+SESSIONS_NAME = 'sessions.json'
+_HEADER_CHARS = 2000
+
+
+def _numpy():
+    if not NUMPY_AVAILABLE:
+        raise RuntimeError("trend analytics need numpy: pip install numpy")
+    import numpy
+    return numpy
+
+
+def directory_student(path: str) -> str:
+    """Default student key: the name of the directory the transcript is in."""
+    return os.path.basename(os.path.dirname(os.path.abspath(path)))
+
+
+def feature_row(analysis: Dict[str, Any]) -> List[float]:
+    """One session's analysis as numbers, in FEATURES order."""
+    learning = analysis.get('learning_patterns', {})
+    indicators = learning.get('learning_indicators', {})
+    strategies = analysis.get('teaching_strategies', {}).get('strategy_distribution', {})
+    metadata = analysis.get('session_metadata', {})
+    return ([float(indicators.get(name, 0)) for name in INDICATORS]
+            + [float(strategies.get(name, 0)) for name in STRATEGIES]
+            + [float(learning.get('average_response_length', 0.0)),
+               ENGAGEMENT_SCORES.get(learning.get('engagement_level'), 1.0),
+               float(learning.get('total_student_responses', 0)),
+               float(metadata.get('duration_minutes') or 0),
+               float(metadata.get('action_items_count', 0))])
+
+
+def session_info(path: str, student_of: Callable[[str], str] = directory_student) -> Dict[str, Any]:
+    try:
+        with open(path, encoding='utf-8-sig') as handle:
+            header = handle.read(_HEADER_CHARS)
+    except (OSError, UnicodeDecodeError):
+        header = ''
+    return {'path': path, 'student': student_of(path), 'date': session_date(header, path)}
+
+
+def _jsonl_records(path: str) -> Iterator[Dict[str, Any]]:
+    with open(path, encoding='utf-8') as handle:
+        for line in handle:
+            if line.strip():
+                yield json.loads(line)
+
+
+class SessionFeatures:
+    """Analysis results as a fixed-schema sessions x features matrix.
+
+    Row i of ``matrix`` (float64, columns in FEATURES order) describes
+    ``sessions[i]``, a ``{'path', 'student', 'date'}`` dict. Rows are sorted
+    by student and then date, so each student's sessions form one
+    contiguous block in time order and rolling means, per-student z-scores
+    and confusion ratios are whole-array numpy operations instead of loops
+    over sessions. ``save`` writes the matrix as .npy next to the session
+    list; ``load`` memory-maps it.
+    """
+
+    def __init__(self, matrix, sessions: List[Dict[str, Any]]):
+        np = _numpy()
+        matrix = np.asarray(matrix, dtype=np.float64).reshape(len(sessions), len(FEATURES))
+        order = np.lexsort((np.array([session['date'] or '' for session in sessions], dtype=str),
+                            np.array([session['student'] for session in sessions], dtype=str)))
+        # Saved matrices are already in order; reordering would read a memory map into memory.
+        if not np.array_equal(order, np.arange(len(sessions))):
+            matrix = matrix[order]
+            sessions = [sessions[index] for index in order]
+        self.matrix = matrix
+        self.sessions = sessions
+
+        students = np.array([session['student'] for session in sessions], dtype=str)
+        first = np.ones(len(sessions), dtype=bool)
+        first[1:] = students[1:] != students[:-1]
+        self._starts = np.flatnonzero(first)
+        self._ends = np.append(self._starts[1:], len(sessions)) - 1
+        self._group = np.cumsum(first) - 1
+        self.students = students[self._starts].tolist()
+
+    @classmethod
+    def from_analyses(cls, records: Iterable[Tuple[Dict[str, Any], Dict[str, Any]]]) -> 'SessionFeatures':
+        """Build from ``(session, analysis)`` pairs; ``session`` as returned by session_info."""
+        sessions, rows = [], []
+        for session, analysis in records:
+            sessions.append(session)
+            rows.append(feature_row(analysis))
+        return cls(rows, sessions)
+
+    @classmethod
+    def from_corpus(cls, paths_or_dir: CorpusSource, pattern: str = '*.txt', workers: Optional[int] = None,
+                    cache_path: Optional[str] = None,
+                    student_of: Callable[[str], str] = directory_student) -> 'SessionFeatures':
+        """Analyze transcripts across a process pool; ``.jsonl`` paths are read as ``main.py corpus`` output."""
+        if isinstance(paths_or_dir, (str, os.PathLike)):
+            paths_or_dir = [paths_or_dir]
+        jsonl = [str(path) for path in paths_or_dir if str(path).endswith('.jsonl')]
+        transcripts = [path for path in paths_or_dir if not str(path).endswith('.jsonl')]
+
+        def records():
+            sources = [_jsonl_records(path) for path in jsonl]
+            if transcripts:
+                sources.append(analyze_corpus(transcripts, workers=workers, pattern=pattern, cache_path=cache_path))
+            for source in sources:
+                for record in source:
+                    if 'analysis' in record:
+                        yield session_info(record['path'], student_of), record['analysis']
+
+        return cls.from_analyses(records())
+
+    def save(self, directory: str):
+        np = _numpy()
+        os.makedirs(directory, exist_ok=True)
+        np.save(os.path.join(directory, MATRIX_NAME), np.ascontiguousarray(self.matrix))
+        with open(os.path.join(directory, SESSIONS_NAME), 'w', encoding='utf-8') as handle:
+            json.dump({'features': list(FEATURES), 'sessions': self.sessions}, handle)
+
+    @classmethod
+    def load(cls, directory: str, mmap: bool = True) -> 'SessionFeatures':
+        np = _numpy()
+        with open(os.path.join(directory, SESSIONS_NAME), encoding='utf-8') as handle:
+            saved = json.load(handle)
+        if tuple(saved['features']) != FEATURES:
+            raise ValueError(f"{directory} was saved with a different feature schema; rebuild it")
+        matrix = np.load(os.path.join(directory, MATRIX_NAME), mmap_mode='r' if mmap else None)
+        return cls(matrix, saved['sessions'])
+
+    def column(self, name: str):
+        return self.matrix[:, FEATURES.index(name)]
+
+    def rolling_mean(self, window: int = DEFAULT_WINDOW, features: Iterable[str] = FEATURES):
+        """Each feature averaged over the student's last ``window`` sessions up to each row."""
+        sums, counts = self._rolling_sum(self._columns(features), window)
+        return sums / counts[:, None]
+
+    def zscores(self, features: Iterable[str] = FEATURES):
+        """Each session's features in standard deviations from that student's own mean (0 where constant)."""
+        np = _numpy()
+        values = self._columns(features)
+        if not self.sessions:
+            return np.zeros_like(values)
+        counts = (self._ends - self._starts + 1)[:, None]
+        means = np.add.reduceat(values, self._starts, axis=0) / counts
+        deviation = values - means[self._group]
+        std = np.sqrt(np.add.reduceat(deviation * deviation, self._starts, axis=0) / counts)
+        # Rounding leaves a tiny spread in columns that are really constant; those are not deviations.
+        constant = std <= 1e-9 * np.maximum(1.0, np.abs(means))
+        std = np.where(constant, np.inf, std)[self._group]
+        return deviation / std
+
+    def confusion_ratio(self, window: int = DEFAULT_WINDOW):
+        """Confusion moments per understanding moment over the student's last ``window`` sessions (NaN without any understanding)."""
+        np = _numpy()
+        sums, _ = self._rolling_sum(self._columns(('confusion_moments', 'understanding_moments')), window)
+        return np.divide(sums[:, 0], sums[:, 1], out=np.full(len(sums), np.nan), where=sums[:, 1] > 0)
+
+    def report(self, window: int = DEFAULT_WINDOW) -> Dict[str, Dict[str, Any]]:
+        """Per-student summary: session span, latest rolling means and z-scores, confusion ratio first and latest."""
+        np = _numpy()
+        if not self.sessions:
+            return {}
+        rolling = self.rolling_mean(window, REPORT_FEATURES)[self._ends].tolist()
+        zscores = self.zscores(REPORT_FEATURES)[self._ends].tolist()
+        ratio = self.confusion_ratio(window)
+        ratio_first = np.where(np.isnan(ratio[self._starts]), None, ratio[self._starts]).tolist()
+        ratio_latest = np.where(np.isnan(ratio[self._ends]), None, ratio[self._ends]).tolist()
+
+        report = {}
+        for group, student in enumerate(self.students):
+            first, last = int(self._starts[group]), int(self._ends[group])
+            report[student] = {
+                'sessions': last - first + 1,
+                'first_date': self.sessions[first]['date'],
+                'last_date': self.sessions[last]['date'],
+                'rolling_mean': dict(zip(REPORT_FEATURES, rolling[group])),
+                'latest_zscore': dict(zip(REPORT_FEATURES, zscores[group])),
+                'confusion_ratio': {'first': ratio_first[group], 'latest': ratio_latest[group]}
+            }
+        return report
+
+    def _columns(self, features: Iterable[str]):
+        features = tuple(features)
+        if features == FEATURES:
+            return self.matrix
+        return self.matrix[:, [FEATURES.index(name) for name in features]]
+
+    def _rolling_sum(self, values, window: int):
+        # Windows are clipped at the start of each student's block, so they never mix students.
+        if window < 1:
+            raise ValueError(f"window must be at least one session, not {window}")
+        np = _numpy()
+        cumulative = np.concatenate([np.zeros((1, values.shape[1])), np.cumsum(values, axis=0)])
+        rows = np.arange(len(values))
+        start = np.maximum(rows - window + 1, self._starts[self._group])
+        return cumulative[rows + 1] - cumulative[start], rows + 1 - start
@@ -0,0 +1,296 @@
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional
+
+from analysis_cache import content_hash
+from corpus_analyzer import CorpusSource, analyze_corpus, find_transcripts
+from transcript_analyzer import EducationalTranscriptAnalyzer
+
+DEFAULT_INDEX_PATH = os.path.join('.cache', 'turns.sqlite3')
+
+_DATE_LINE = re.compile(r'^\W*Date:\s*(.+?)\s*$', re.IGNORECASE | re.MULTILINE)
+_DATE_FORMATS = ('%Y-%m-%d', '%m/%d/%Y', '%m/%d/%y', '%B %d, %Y', '%b %d, %Y', '%d %B %Y', '%A, %B %d, %Y')
+# How far into a transcript the SESSION DETAILS header may run.
+_HEADER_CHARS = 2000
+
+
+def session_date(text: str, path: Optional[str] = None) -> Optional[str]:
+    """ISO date of a session: the header's ``Date:`` line if it parses, else the file's modification date."""
+    match = _DATE_LINE.search(text[:_HEADER_CHARS])
+    if match:
+        for date_format in _DATE_FORMATS:
+            try:
+                return datetime.strptime(match.group(1), date_format).date().isoformat()
+            except ValueError:
+                continue
+    if path is not None and os.path.exists(path):
+        return date.fromtimestamp(os.path.getmtime(path)).isoformat()
+    return None
+
+
+def _tag(name: str) -> str:
+    # 'Socratic Questioning' -> 'socratic_questioning', one token for the index.
+    return re.sub(r'\W+', '_', name.strip().lower()).strip('_')
+
+
+class TurnIndex:
+    """SQLite FTS5 index of parsed turns across the session corpus.
+
+    Every turn is stored with its session, speaker, timestamp, educational
+    markers, the learning-moment types the analyzer found in it and, for
+    tutor turns, the teaching strategy. ``add`` and ``add_corpus`` only
+    (re)index transcripts whose content, analyzer version or pattern
+    registry changed, so the index is kept current as new transcripts
+    arrive. ``search`` filters by phrase, speaker, category and session
+    date in milliseconds instead of re-analyzing the corpus.
+    """
+
+    def __init__(self, path: str = DEFAULT_INDEX_PATH, analyzer: Optional[EducationalTranscriptAnalyzer] = None):
+        self.path = path
+        self.analyzer = analyzer or EducationalTranscriptAnalyzer(quiet=True)
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS sessions (
+                id INTEGER PRIMARY KEY,
+                path TEXT UNIQUE NOT NULL,
+                content_hash TEXT NOT NULL,
+                analyzer_version TEXT NOT NULL,
+                session_date TEXT,
+                session_type TEXT,
+                subjects TEXT,
+                turn_count INTEGER NOT NULL,
+                indexed_at REAL NOT NULL,
+                first_turn INTEGER,
+                last_turn INTEGER
+            )''')
+        # Indexes built before sessions recorded their turns' rowids gain the columns here.
+        columns = {row['name'] for row in self._conn.execute('PRAGMA table_info(sessions)')}
+        for column in ('first_turn', 'last_turn'):
+            if column not in columns:
+                self._conn.execute(f'ALTER TABLE sessions ADD COLUMN {column} INTEGER')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS sessions_date ON sessions (session_date)')
+        # Porter stemming lets "ratio" find "ratios"; '_' keeps tags such as socratic_questioning whole.
+        # A session's turns take consecutive rowids, first_turn to last_turn, so they
+        # are deleted by rowid range; session_id is UNINDEXED and filtering on it scans.
+        self._conn.execute('''
+            CREATE VIRTUAL TABLE IF NOT EXISTS turns USING fts5(
+                content, speaker, markers, moments, strategies,
+                session_id UNINDEXED, position UNINDEXED, timestamp UNINDEXED, seconds UNINDEXED,
+                tokenize = "porter unicode61 tokenchars '_'"
+            )''')
+
+    def add(self, path: str, text: Optional[str] = None) -> str:
+        """Index one transcript; returns 'added', 'updated' or 'unchanged'."""
+        if text is None:
+            with open(path, encoding='utf-8-sig') as handle:
+                text = handle.read()
+        transcript_hash = content_hash(text)
+        status = self._status(path, transcript_hash)
+        if status != 'unchanged':
+            self._store(path, transcript_hash, session_date(text, path), self.analyzer.analyze_transcript(text))
+        return status
+
+    def add_corpus(self, paths_or_dir: CorpusSource, pattern: str = '*.txt',
+                   workers: Optional[int] = None) -> Dict[str, int]:
+        """Index every new or changed transcript, analyzing them across a process pool."""
+        counts = {'added': 0, 'updated': 0, 'unchanged': 0, 'failed': 0}
+        # Only the hash and date are kept per file; the workers read the text again to analyze it.
+        pending = {}
+        for path in find_transcripts(paths_or_dir, pattern):
+            try:
+                with open(path, encoding='utf-8-sig') as handle:
+                    text = handle.read()
+            except (OSError, UnicodeDecodeError):
+                counts['failed'] += 1
+                continue
+            transcript_hash = content_hash(text)
+            status = self._status(path, transcript_hash)
+            if status == 'unchanged':
+                counts['unchanged'] += 1
+            else:
+                pending[path] = (status, transcript_hash, session_date(text, path))
+
+        if pending:
+            for record in analyze_corpus(list(pending), workers=workers):
+                if 'error' in record:
+                    counts['failed'] += 1
+                    continue
+                status, transcript_hash, day = pending[record['path']]
+                self._store(record['path'], transcript_hash, day, record['analysis'])
+                counts[status] += 1
+        return counts
+
+    def remove(self, path: str) -> bool:
+        with self._lock:
+            self._conn.execute('BEGIN')
+            try:
+                removed = self._delete(path)
+                self._conn.execute('COMMIT')
+            except BaseException:
+                self._conn.execute('ROLLBACK')
+                raise
+        return removed
+
+    def search(self, phrase: Optional[str] = None, speaker: Optional[str] = None,
+               category: Optional[str] = None, date_from: Optional[str] = None, date_to: Optional[str] = None,
+               path: Optional[str] = None, match: Optional[str] = None, limit: Optional[int] = 100) -> List[Dict[str, Any]]:
+        """Turns matching every given filter.
+
+        ``phrase`` is matched as a phrase in the turn's text (stemmed, case
+        insensitive); ``category`` is a learning-moment type ("confusion"),
+        teaching strategy ("Socratic Questioning") or educational marker;
+        ``date_from``/``date_to`` are inclusive ISO dates; ``match`` is a raw
+        FTS5 query added to the others. Results with a phrase are ranked by
+        relevance, otherwise listed by session date and turn order.
+        """
+        terms, params = [], []
+        if phrase:
+            terms.append('content : ' + self._quote(phrase))
+        if speaker:
+            terms.append('speaker : ' + self._quote(speaker.lower()))
+        if category:
+            terms.append('{markers moments strategies} : ' + self._quote(_tag(category)))
+        if match:
+            terms.append(f'({match})')
+
+        sql = ['SELECT sessions.path, sessions.session_date, turns.timestamp, turns.seconds, turns.position,',
+               'turns.speaker, turns.content, turns.markers, turns.moments, turns.strategies',
+               'FROM turns JOIN sessions ON sessions.id = turns.session_id']
+        conditions = []
+        if terms:
+            conditions.append('turns MATCH ?')
+            params.append(' AND '.join(terms))
+        if date_from:
+            conditions.append('sessions.session_date >= ?')
+            params.append(date_from)
+        if date_to:
+            conditions.append('sessions.session_date <= ?')
+            params.append(date_to)
+        if path:
+            conditions.append('sessions.path = ?')
+            params.append(path)
+        if conditions:
+            sql.append('WHERE ' + ' AND '.join(conditions))
+        sql.append('ORDER BY turns.rank' if phrase or match else
+                   'ORDER BY sessions.session_date, sessions.path, turns.position')
+        if limit is not None:
+            sql.append('LIMIT ?')
+            params.append(limit)
+
+        with self._lock:
+            rows = self._conn.execute('\n'.join(sql), params).fetchall()
+        return [self._hit(row) for row in rows]
+
+    def sessions(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute('SELECT path, session_date, session_type, subjects, turn_count, indexed_at '
+                                      'FROM sessions ORDER BY session_date, path').fetchall()
+        return [{**dict(row), 'subjects': row['subjects'].split()} for row in rows]
+
+    def info(self) -> Dict[str, Any]:
+        with self._lock:
+            sessions, turns = self._conn.execute('SELECT COUNT(*), COALESCE(SUM(turn_count), 0) FROM sessions').fetchone()
+        return {'path': self.path, 'sessions': sessions, 'turns': turns}
+
+    def optimize(self):
+        """Merge the FTS5 index segments; worth running after a large batch of additions."""
+        with self._lock:
+            self._conn.execute("INSERT INTO turns (turns) VALUES ('optimize')")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _status(self, path: str, transcript_hash: str) -> str:
+        with self._lock:
+            row = self._conn.execute('SELECT content_hash, analyzer_version FROM sessions WHERE path = ?', (path,)).fetchone()
+        if row is None:
+            return 'added'
+        if row['content_hash'] == transcript_hash and row['analyzer_version'] == self.analyzer.analysis_version:
+            return 'unchanged'
+        return 'updated'
+
+    def _store(self, path: str, transcript_hash: str, day: Optional[str], analysis: Dict[str, Any]):
+        turns = analysis['parsed_conversations']
+        moments = self._turn_tags(len(turns), analysis['learning_patterns']['specific_moments'], 'type')
+        strategies = self._turn_tags(len(turns), analysis['teaching_strategies']['teaching_moments'], 'strategy')
+        subjects = ' '.join(analysis['subject_analysis'].get('subjects_identified', []))
+
+        with self._lock:
+            self._conn.execute('BEGIN')
+            try:
+                self._delete(path)
+                last = self._conn.execute('SELECT rowid FROM turns ORDER BY rowid DESC LIMIT 1').fetchone()
+                first_turn = (last[0] if last is not None else 0) + 1
+                session_id = self._conn.execute(
+                    'INSERT INTO sessions (path, content_hash, analyzer_version, session_date, session_type, subjects, '
+                    'turn_count, indexed_at, first_turn, last_turn) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                    (path, transcript_hash, self.analyzer.analysis_version, day,
+                     analysis['session_metadata'].get('session_type'), subjects, len(turns), time.time(),
+                     first_turn, first_turn + len(turns) - 1)
+                ).lastrowid
+                self._conn.executemany(
+                    'INSERT INTO turns (rowid, content, speaker, markers, moments, strategies, session_id, position, '
+                    'timestamp, seconds) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                    ((first_turn + position, turn['content'], turn['speaker'],
+                      ' '.join(_tag(marker) for marker in turn['educational_markers']),
+                      ' '.join(moments[position]), ' '.join(strategies[position]), session_id, position,
+                      turn['timestamp'], turn['seconds'])
+                     for position, turn in enumerate(turns))
+                )
+                self._conn.execute('COMMIT')
+            except BaseException:
+                self._conn.execute('ROLLBACK')
+                raise
+
+    def _delete(self, path: str) -> bool:
+        row = self._conn.execute('SELECT id, first_turn, last_turn FROM sessions WHERE path = ?', (path,)).fetchone()
+        if row is None:
+            return False
+        if row['first_turn'] is not None:
+            self._conn.execute('DELETE FROM turns WHERE rowid BETWEEN ? AND ?', (row['first_turn'], row['last_turn']))
+        else:
+            # Indexed before sessions recorded their rowids.
+            self._conn.execute('DELETE FROM turns WHERE session_id = ?', (row['id'],))
+        self._conn.execute('DELETE FROM sessions WHERE id = ?', (row['id'],))
+        return True
+
+    @staticmethod
+    def _turn_tags(turn_count: int, moments: List[Dict[str, Any]], key: str) -> List[List[str]]:
+        # Each moment records the position of the turn it was found in.
+        tags: List[List[str]] = [[] for _ in range(turn_count)]
+        for moment in moments:
+            tag = _tag(moment[key])
+            if tag not in tags[moment['turn']]:
+                tags[moment['turn']].append(tag)
+        return tags
+
+    @staticmethod
+    def _quote(text: str) -> str:
+        return '"' + text.replace('"', '""') + '"'
+
+    @staticmethod
+    def _hit(row: sqlite3.Row) -> Dict[str, Any]:
+        return {
+            'path': row['path'],
+            'session_date': row['session_date'],
+            'timestamp': row['timestamp'],
+            'seconds': row['seconds'],
+            'position': row['position'],
+            'speaker': row['speaker'],
+            'content': row['content'],
+            'markers': row['markers'].split(),
+            'moments': row['moments'].split(),
+            'strategies': row['strategies'].split()
+        }
@@ -0,0 +1,131 @@
+import io
+import os
+import re
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, Optional, Union
+
+TURN_HEADER = re.compile(r'(\d+:\d{2}(?::\d{2})?)\s*-\s*(student|tutor)\b', re.IGNORECASE)
+ANNOTATION = re.compile(r'[A-Z]{2,}(?: [A-Z]{2,})+:|_{3,}$')
+
+HEADER = 'header'
+CONTENT = 'content'
+OTHER = 'other'
+
+TranscriptSource = Union[str, os.PathLike, Iterable[str], io.IOBase]
+
+
+class TurnParser:
+    """Push parser that turns transcript lines into speaker turns.
+
+    A turn starts at a ``M:SS - speaker`` (or ``H:MM:SS - speaker``) header
+    and takes every following speech line up to the next header. Blank
+    lines and annotations such as ``ACTION ITEM:`` or ``SCREEN SHARING:``
+    are not speech. Each turn carries its header timestamp as written and
+    as integer seconds. Only the turn in progress is held in memory.
+    """
+
+    def __init__(self):
+        self.line_kind: Optional[str] = None
+        self.line_content: Optional[str] = None
+        self._timestamp: Optional[str] = None
+        self._speaker: Optional[str] = None
+        self._content = []
+
+    def feed(self, line: str) -> Optional[Dict[str, Any]]:
+        """Consume one line; return the turn it completed, if any."""
+        line = line.lstrip('\ufeff').strip()
+        self.line_content = None
+
+        header = TURN_HEADER.match(line)
+        if header:
+            completed = self.close()
+            self._timestamp = header.group(1)
+            self._speaker = header.group(2).lower()
+
+            inline = line[header.end():].strip()
+            if inline.startswith('-'):
+                inline = inline[1:].strip()
+            if inline:
+                self._content.append(inline)
+                self.line_content = inline
+            self.line_kind = HEADER
+            return completed
+
+        if self._speaker is None or not line or ANNOTATION.match(line):
+            self.line_kind = OTHER
+            return None
+
+        self._content.append(line)
+        self.line_content = line
+        self.line_kind = CONTENT
+        return None
+
+    def close(self) -> Optional[Dict[str, Any]]:
+        """Return the turn in progress, if any, and reset."""
+        if self._speaker is None:
+            return None
+
+        turn = {
+            'timestamp': self._timestamp,
+            'seconds': timestamp_seconds(self._timestamp),
+            'speaker': self._speaker,
+            'content': ' '.join(self._content)
+        }
+        self._timestamp = None
+        self._speaker = None
+        self._content = []
+        return turn
+
+
+def timestamp_seconds(timestamp: str) -> int:
+    """Convert an ``M:SS`` or ``H:MM:SS`` header timestamp to seconds."""
+    seconds = 0
+    for part in timestamp.split(':'):
+        seconds = seconds * 60 + int(part)
+    return seconds
+
+
+def format_timestamp(seconds: int) -> str:
+    """Inverse of timestamp_seconds for canonically written timestamps."""
+    hours, remainder = divmod(seconds, 3600)
+    minutes, seconds = divmod(remainder, 60)
+    if hours:
+        return f'{hours}:{minutes:02d}:{seconds:02d}'
+    return f'{minutes}:{seconds:02d}'
+
+
+@contextmanager
+def open_lines(source: TranscriptSource) -> Iterator[Iterable[str]]:
+    """Yield the lines of a path, text or binary file object, or line iterable.
+
+    Paths are opened as UTF-8 with an optional BOM; binary file objects are
+    decoded the same way. File objects passed in are left open.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, encoding='utf-8-sig') as handle:
+            yield handle
+    elif isinstance(source, (io.RawIOBase, io.BufferedIOBase)) or 'b' in getattr(source, 'mode', ''):
+        wrapper = io.TextIOWrapper(source, encoding='utf-8-sig')
+        try:
+            yield wrapper
+        finally:
+            wrapper.detach()
+    else:
+        yield source
+
+
+def iter_turns(source: TranscriptSource) -> Iterator[Dict[str, Any]]:
+    """Lazily yield {'timestamp', 'seconds', 'speaker', 'content'} turns from a transcript.
+
+    ``source`` is a path, an open file, or any iterable of lines; wrap a
+    transcript already in memory with ``io.StringIO``.
+    """
+    parser = TurnParser()
+    with open_lines(source) as lines:
+        for line in lines:
+            turn = parser.feed(line)
+            if turn is not None:
+                yield turn
+    turn = parser.close()
+    if turn is not None:
+        yield turn
@@ -0,0 +1,181 @@
+from array import array
+from collections.abc import Mapping, Sequence
+from typing import Any, Dict, Iterable, Iterator, List
+
+from turn_parser import format_timestamp, timestamp_seconds
+
+TURN_KEYS = ('timestamp', 'seconds', 'speaker', 'content', 'word_count', 'educational_markers')
+SPEAKERS = ('student', 'tutor')
+
+
+class Turn(Mapping):
+    """Read-only dict-compatible view of one row of a TurnTable."""
+
+    __slots__ = ('table', 'index')
+
+    def __init__(self, table: 'TurnTable', index: int):
+        self.table = table
+        self.index = index
+
+    def __getitem__(self, key: str) -> Any:
+        table, index = self.table, self.index
+        if key == 'timestamp':
+            return table.timestamp(index)
+        if key == 'seconds':
+            return table.seconds[index]
+        if key == 'speaker':
+            return table.speaker_names[table.speakers[index]]
+        if key == 'content':
+            return table.contents[index]
+        if key == 'word_count':
+            return table.word_counts[index]
+        if key == 'educational_markers':
+            return table.marker_list(table.markers[index])
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(TURN_KEYS)
+
+    def __len__(self) -> int:
+        return len(TURN_KEYS)
+
+    @property
+    def seconds(self) -> int:
+        return self.table.seconds[self.index]
+
+    @property
+    def speaker_code(self) -> int:
+        return self.table.speakers[self.index]
+
+    @property
+    def marker_flags(self) -> int:
+        return self.table.markers[self.index]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {key: self[key] for key in TURN_KEYS}
+
+    def __repr__(self) -> str:
+        return f'Turn({self.to_dict()!r})'
+
+
+class TurnTable(Sequence):
+    """Parsed turns stored as parallel arrays.
+
+    Timestamps are integer seconds, speakers small integer codes and
+    educational markers bitflags (bit i = ``marker_names[i]``); only the
+    content strings are kept as Python objects. Indexing yields Turn views
+    that read like the conversation dicts the analyzer produces.
+    """
+
+    def __init__(self, marker_names: Iterable[str], turns: Iterable[Dict[str, Any]] = ()):
+        self.marker_names = tuple(marker_names)
+        self.marker_bits = {name: 1 << bit for bit, name in enumerate(self.marker_names)}
+        self.speaker_names: List[str] = list(SPEAKERS)
+        self._speaker_codes = {name: code for code, name in enumerate(self.speaker_names)}
+
+        self.seconds = array('l')
+        self.speakers = array('B')
+        self.markers = array(_flag_typecode(len(self.marker_names)))
+        self.word_counts = array('L')
+        self.contents: List[str] = []
+        # Timestamps that format_timestamp would not reproduce (e.g. "00:05").
+        self._timestamp_text: Dict[int, str] = {}
+        self._marker_lists: Dict[int, List[str]] = {}
+
+        for turn in turns:
+            self.append(turn)
+
+    def append(self, conversation: Dict[str, Any]):
+        index = len(self.contents)
+        timestamp = conversation['timestamp']
+        seconds = conversation.get('seconds')
+        if seconds is None:
+            seconds = timestamp_seconds(timestamp)
+        if format_timestamp(seconds) != timestamp:
+            self._timestamp_text[index] = timestamp
+
+        speaker = conversation['speaker']
+        code = self._speaker_codes.get(speaker)
+        if code is None:
+            code = self._speaker_codes[speaker] = len(self.speaker_names)
+            self.speaker_names.append(speaker)
+
+        flags = 0
+        for marker in conversation['educational_markers']:
+            flags |= self.marker_bits[marker]
+
+        self.seconds.append(seconds)
+        self.speakers.append(code)
+        self.markers.append(flags)
+        self.word_counts.append(conversation['word_count'])
+        self.contents.append(conversation['content'])
+
+    def extend(self, conversations: Iterable[Dict[str, Any]]):
+        for conversation in conversations:
+            self.append(conversation)
+
+    def timestamp(self, index: int) -> str:
+        text = self._timestamp_text.get(index)
+        return text if text is not None else format_timestamp(self.seconds[index])
+
+    def marker_list(self, flags: int) -> List[str]:
+        markers = self._marker_lists.get(flags)
+        if markers is None:
+            markers = self._marker_lists[flags] = [name for name in self.marker_names if flags & self.marker_bits[name]]
+        return list(markers)
+
+    def speaker_code(self, speaker: str) -> int:
+        return self._speaker_codes[speaker]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [Turn(self, i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('turn index out of range')
+        return Turn(self, index)
+
+    def __len__(self) -> int:
+        return len(self.contents)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (TurnTable, list)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    __hash__ = None
+
+    def copy(self) -> 'TurnTable':
+        table = TurnTable(self.marker_names)
+        table.speaker_names = list(self.speaker_names)
+        table._speaker_codes = dict(self._speaker_codes)
+        table.seconds = array(self.seconds.typecode, self.seconds)
+        table.speakers = array(self.speakers.typecode, self.speakers)
+        table.markers = array(self.markers.typecode, self.markers)
+        table.word_counts = array(self.word_counts.typecode, self.word_counts)
+        table.contents = list(self.contents)
+        table._timestamp_text = dict(self._timestamp_text)
+        return table
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        return [turn.to_dict() for turn in self]
+
+    def __repr__(self) -> str:
+        return f'TurnTable({len(self)} turns)'
+
+
+def json_default(obj: Any) -> Any:
+    """``default=`` hook so json.dumps writes turn tables and other lazy mappings like plain dicts."""
+    if isinstance(obj, Mapping):
+        return dict(obj)
+    if isinstance(obj, TurnTable):
+        return list(obj)
+    raise TypeError(f'Object of type {type(obj).__name__} is not JSON serializable')
+
+
+def _flag_typecode(bits: int) -> str:
+    for typecode in ('B', 'H', 'L', 'Q'):
+        if bits <= array(typecode).itemsize * 8:
+            return typecode
+    raise ValueError(f'too many markers for bitflags: {bits}')